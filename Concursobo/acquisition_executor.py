@@ -0,0 +1,167 @@
+import itertools
+import logging
+import queue
+import threading
+from concurrent.futures import Future
+
+
+class AcquisitionLane:
+    """
+    Filas de execução das aquisições
+    """
+
+    INTERACTIVE = "interactive"  # Comandos e botões enviados pelos usuários
+    SCHEDULED = "scheduled"  # Checagens agendadas e envios para a lista de contatos
+
+
+class AcquisitionPriority:
+    """
+    Prioridades das tarefas dentro de uma fila. Tarefas de menor valor são executadas primeiro
+    """
+
+    HIGH = 0  # Aquisição de um único scraper pedida por um usuário
+    NORMAL = 1  # Checagens agendadas
+    LOW = 2  # Atualização de todos os scrapers
+
+
+class PriorityLane:
+    """
+    Fila de execução com threads próprias, que executa as tarefas por ordem de prioridade e, dentro de uma mesma
+    prioridade, por ordem de chegada
+    """
+
+    def __init__(self, max_workers, thread_name_prefix):
+        """
+            Inicialização da classe
+        Args:
+            max_workers (int): Número de threads da fila
+            thread_name_prefix (str): Prefixo do nome das threads
+        """
+        self.tasks = queue.PriorityQueue()
+        self.counter = itertools.count()
+        self.workers = [
+            threading.Thread(target=self.run, name=f"{thread_name_prefix}_{index}", daemon=True)
+            for index in range(max_workers)
+        ]
+
+        for worker in self.workers:
+            worker.start()
+
+    def submit(self, priority, fn, *args, **kwargs):
+        """
+            Adiciona uma tarefa na fila
+        Args:
+            priority (int): Prioridade da tarefa, definida em AcquisitionPriority
+            fn (callable): Tarefa a ser executada
+        Returns:
+            future (Future): Resultado da tarefa
+        """
+        future = Future()
+        self.tasks.put((priority, next(self.counter), future, fn, args, kwargs))
+
+        return future
+
+    def pending(self):
+        """
+            Retorna o número de tarefas aguardando execução
+        Returns:
+            (int): Número de tarefas na fila
+        """
+        return self.tasks.qsize()
+
+    def run(self):
+        while True:
+            _, _, future, fn, args, kwargs = self.tasks.get()
+
+            # Tarefa de encerramento da thread
+            if fn is None:
+                return
+
+            if not future.set_running_or_notify_cancel():
+                continue
+
+            try:
+                future.set_result(fn(*args, **kwargs))
+            except BaseException as error:
+                future.set_exception(error)
+
+    def shutdown(self, wait=True):
+        """
+            Encerra as threads após as tarefas já enfileiradas
+        Args:
+            wait (bool): Aguarda as tarefas em andamento terminarem
+        """
+        for _ in self.workers:
+            self.tasks.put((float("inf"), next(self.counter), None, None, None, None))
+
+        if wait:
+            for worker in self.workers:
+                worker.join()
+
+
+class AcquisitionExecutor:
+    """
+    Executa as aquisições fora das threads do dispatcher do Telegram. Cada fila possui suas próprias threads, de
+    forma que uma checagem agendada demorada não atrasa os comandos interativos, e executa as tarefas por ordem de
+    prioridade
+    """
+
+    def __init__(self, interactive_workers=2, scheduled_workers=1):
+        """
+            Inicialização da classe
+        Args:
+            interactive_workers (int): Número de threads da fila interativa
+            scheduled_workers (int): Número de threads da fila de checagens agendadas. Com zero, a fila não aceita
+                tarefas
+        """
+        self.logger = logging.getLogger(name="Concursobô")
+
+        self.lanes = {
+            AcquisitionLane.INTERACTIVE: PriorityLane(
+                max_workers=interactive_workers, thread_name_prefix="aquisicao-interativa"
+            ),
+            AcquisitionLane.SCHEDULED: PriorityLane(
+                max_workers=scheduled_workers, thread_name_prefix="aquisicao-agendada"
+            ),
+        }
+
+    def submit(self, lane, fn, *args, priority=AcquisitionPriority.NORMAL, **kwargs):
+        """
+            Envia uma tarefa para a fila informada. Exceções da tarefa são registradas no log quando ela termina
+        Args:
+            lane (str): Fila de execução, definida em AcquisitionLane
+            fn (callable): Tarefa a ser executada
+            priority (int): Prioridade da tarefa na fila, definida em AcquisitionPriority
+        Returns:
+            future (Future): Resultado da tarefa
+        """
+        if lane not in self.lanes:
+            raise Exception(f"Fila de execução \"{lane}\" desconhecida")
+
+        if not self.lanes[lane].workers:
+            raise Exception(f"Fila de execução \"{lane}\" sem threads neste processo")
+
+        future = self.lanes[lane].submit(priority, fn, *args, **kwargs)
+        future.add_done_callback(self.log_exception)
+
+        return future
+
+    def log_exception(self, future):
+        """
+            Registra no log a exceção de uma tarefa finalizada
+        Args:
+            future (Future): Tarefa finalizada
+        """
+        if not future.cancelled() and future.exception() is not None:
+            self.logger.error(
+                msg="Erro em uma tarefa de aquisição", exc_info=future.exception()
+            )
+
+    def shutdown(self, wait=True):
+        """
+            Encerra as filas de execução
+        Args:
+            wait (bool): Aguarda as tarefas em andamento terminarem
+        """
+        for executor in self.lanes.values():
+            executor.shutdown(wait=wait)
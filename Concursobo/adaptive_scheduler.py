@@ -0,0 +1,168 @@
+import logging
+import math
+from datetime import datetime, timedelta
+
+from apscheduler.triggers.interval import IntervalTrigger
+
+DAY = 24 * 3600
+
+
+def allocate_intervals(rates, budget, min_intervals, max_intervals):
+    """
+        Distribui o orçamento de checagens entre os scrapers. A frequência de cada scraper é proporcional à raiz
+        quadrada da sua taxa de atualização, o que minimiza o atraso médio na detecção das atualizações para um
+        número fixo de checagens. Os scrapers que ultrapassam os limites são fixados no limite e o restante do
+        orçamento é redistribuído entre os demais
+    Args:
+        rates (dict): Taxa de atualização, em atualizações por segundo, indexada pelo nome do scraper
+        budget (float): Número total de checagens por dia
+        min_intervals (dict): Intervalo mínimo, em segundos, indexado pelo nome do scraper
+        max_intervals (dict): Intervalo máximo, em segundos, indexado pelo nome do scraper
+    Returns:
+        intervals (dict): Intervalo entre as checagens, em segundos, indexado pelo nome do scraper
+    """
+    intervals = dict()
+    free = dict(rates)
+    remaining = budget
+
+    while free:
+        if remaining <= 0:
+            intervals.update({name: max_intervals[name] for name in free})
+            break
+
+        total = sum(math.sqrt(rate) for rate in free.values())
+        proposed = {name: DAY * total / (remaining * math.sqrt(rate)) for name, rate in free.items()}
+        bounded = {
+            name: min(max(interval, min_intervals[name]), max_intervals[name]) for name, interval in proposed.items()
+        }
+        clamped = [name for name in free if bounded[name] != proposed[name]]
+
+        if not clamped:
+            intervals.update(proposed)
+            break
+
+        for name in clamped:
+            intervals[name] = bounded[name]
+            remaining -= DAY / bounded[name]
+            del free[name]
+
+    return intervals
+
+
+class AdaptiveScheduler:
+    """
+    Agendamento das checagens com intervalos ajustados pela frequência de atualização observada em cada scraper.
+    Um orçamento diário de checagens é distribuído entre os scrapers, respeitando os intervalos mínimo e máximo de
+    cada um, e os intervalos são recalculados após cada checagem
+    """
+
+    def __init__(self, telegram_bot, scheduler, change_history, budget, min_interval, max_interval, tolerance=0.1):
+        """
+            Inicialização da classe
+        Args:
+            telegram_bot (TelegramBot): Bot usado nas checagens, com o cadastro dos scrapers
+            scheduler (BaseScheduler): Agendador do APScheduler onde as checagens são cadastradas
+            change_history (ChangeHistory): Histórico das aquisições dos scrapers
+            budget (float): Número total de checagens por dia
+            min_interval (float): Intervalo mínimo padrão, em minutos, entre as checagens de um scraper
+            max_interval (float): Intervalo máximo padrão, em minutos, entre as checagens de um scraper
+            tolerance (float): Variação relativa mínima do intervalo para que a checagem seja reagendada
+        """
+        self.telegram_bot = telegram_bot
+        self.scheduler = scheduler
+        self.change_history = change_history
+        self.budget = budget
+        self.tolerance = tolerance
+
+        self.logger = logging.getLogger(name="Concursobô")
+
+        registry = telegram_bot.scrapers
+        # Ordem dos scrapers com os servidores intercalados, usada para distribuir as primeiras checagens
+        self.scraper_names = list(registry.schedules())
+        self.min_intervals = {
+            name: 60 * registry.specs[name].polling.get("min_interval", min_interval) for name in self.scraper_names
+        }
+        self.max_intervals = {
+            name: 60 * registry.specs[name].polling.get("max_interval", max_interval) for name in self.scraper_names
+        }
+        self.intervals = dict()
+
+    def compute_intervals(self):
+        """
+            Calcula os intervalos entre as checagens a partir das taxas de atualização estimadas
+        Returns:
+            (dict): Intervalo entre as checagens, em segundos, indexado pelo nome do scraper
+        """
+        rates = {name: self.change_history.change_rate(scraper_name=name) for name in self.scraper_names}
+
+        return allocate_intervals(
+            rates=rates, budget=self.budget, min_intervals=self.min_intervals, max_intervals=self.max_intervals
+        )
+
+    def start(self):
+        """
+        Cadastra as checagens no agendador. A primeira checagem de cada scraper ocorre um intervalo após a última
+        aquisição registrada. As checagens já atrasadas são distribuídas ao longo do menor intervalo, para que uma
+        reinicialização não execute todos os scrapers ao mesmo tempo
+        """
+        self.intervals = self.compute_intervals()
+        now = datetime.now(tz=self.scheduler.timezone)
+        spacing = min(self.intervals.values(), default=0) / max(len(self.scraper_names), 1)
+
+        for slot, scraper_name in enumerate(self.scraper_names):
+            interval = self.intervals[scraper_name]
+            first_run = now + timedelta(seconds=slot * spacing)
+            last_check = self.change_history.last_check(scraper_name=scraper_name)
+
+            if last_check is not None:
+                last_run = datetime.fromtimestamp(last_check, tz=self.scheduler.timezone)
+                first_run = max(first_run, last_run + timedelta(seconds=interval))
+
+            self.scheduler.add_job(
+                func=self.check,
+                kwargs=dict(scraper_name=scraper_name),
+                trigger=IntervalTrigger(seconds=interval, start_date=first_run, timezone=self.scheduler.timezone),
+                next_run_time=first_run,
+                id=scraper_name,
+                name=scraper_name,
+            )
+            self.logger.info(
+                msg=f"Checagem de {scraper_name} a cada {interval / 60:.0f} minutos, a partir de "
+                f"{first_run:%d-%m-%Y %H:%M}"
+            )
+
+    def check(self, scraper_name):
+        """
+            Executa a checagem agendada de um scraper e ajusta os intervalos com o resultado
+        Args:
+            scraper_name (str): Nome do scraper cadastrado no Concursobô
+        """
+        try:
+            self.telegram_bot.auto_check(scraper_name=scraper_name)
+        finally:
+            self.reschedule()
+
+    def reschedule(self):
+        """
+        Recalcula os intervalos e reagenda as checagens cujo intervalo mudou além da tolerância. O instante da última
+        checagem de cada scraper é mantido
+        """
+        intervals = self.compute_intervals()
+
+        for scraper_name, interval in intervals.items():
+            current = self.intervals[scraper_name]
+
+            if abs(interval - current) <= self.tolerance * current:
+                continue
+
+            job = self.scheduler.get_job(job_id=scraper_name)
+            if job is None or job.next_run_time is None:
+                continue
+
+            last_run = job.next_run_time - timedelta(seconds=current)
+            job.reschedule(
+                trigger=IntervalTrigger(seconds=interval, start_date=last_run, timezone=self.scheduler.timezone)
+            )
+
+            self.intervals[scraper_name] = interval
+            self.logger.info(msg=f"Checagem de {scraper_name} reagendada para cada {interval / 60:.0f} minutos")
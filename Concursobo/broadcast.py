@@ -0,0 +1,209 @@
+import logging
+import threading
+import time
+
+from telegram.error import BadRequest, NetworkError, RetryAfter, TimedOut
+
+
+class TokenBucket:
+    """
+    Balde de fichas para limitar a taxa de envio de mensagens
+    """
+
+    def __init__(self, rate, capacity=1):
+        """
+            Inicialização da classe
+        Args:
+            rate (float): Fichas repostas por segundo
+            capacity (int): Número máximo de fichas acumuladas, ou seja, o tamanho máximo de uma rajada
+        """
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.last_refill = time.monotonic()
+        self.paused_until = 0.0
+        self.lock = threading.Lock()
+
+    def try_acquire(self):
+        """
+            Tenta consumir uma ficha
+        Returns:
+            wait_time (float): Zero se a ficha foi consumida, caso contrário o tempo até haver uma ficha disponível
+        """
+        with self.lock:
+            now = time.monotonic()
+
+            if now < self.paused_until:
+                return self.paused_until - now
+
+            self.tokens = min(self.capacity, self.tokens + (now - self.last_refill) * self.rate)
+            self.last_refill = now
+
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return 0.0
+
+            return (1 - self.tokens) / self.rate
+
+    def acquire(self):
+        """
+        Aguarda até consumir uma ficha
+        """
+        wait_time = self.try_acquire()
+
+        while wait_time > 0:
+            time.sleep(wait_time)
+            wait_time = self.try_acquire()
+
+    def adjust_rate(self, factor, minimum, maximum):
+        """
+            Multiplica a taxa de reposição das fichas, mantendo-a entre os limites informados
+        Args:
+            factor (float): Fator aplicado à taxa atual
+            minimum (float): Taxa mínima
+            maximum (float): Taxa máxima
+        Returns:
+            rate (float): Nova taxa
+        """
+        with self.lock:
+            self.rate = min(maximum, max(minimum, self.rate * factor))
+
+            return self.rate
+
+    def pause(self, seconds):
+        """
+            Suspende a entrega de fichas, usado quando o Telegram responde com RetryAfter
+        Args:
+            seconds (float): Tempo de suspensão
+        """
+        with self.lock:
+            self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+            self.tokens = 0
+
+
+class BroadcastEngine:
+    """
+    Envia as mensagens do bot respeitando o limite global de mensagens por segundo e o limite por chat do Telegram,
+    usado pela caixa de saída para enviar a vários chats simultaneamente. Quando o Telegram responde com
+    RetryAfter, os envios são suspensos pelo tempo pedido e a taxa global é reduzida, sendo recuperada gradualmente
+    após envios bem sucedidos
+    """
+
+    def __init__(
+        self,
+        bot,
+        global_rate=30.0,
+        chat_rate=1.0,
+        chat_burst=1,
+        max_workers=32,
+        max_retries=3,
+        recovery_interval=100,
+    ):
+        """
+            Inicialização da classe
+        Args:
+            bot (Bot): Bot do Telegram usado para os envios
+            global_rate (float): Número máximo de mensagens por segundo para todos os chats
+            chat_rate (float): Número máximo de mensagens por segundo para um mesmo chat
+            chat_burst (int): Número de mensagens que podem ser enviadas em rajada para um mesmo chat
+            max_workers (int): Número de chats atendidos simultaneamente pela caixa de saída
+            max_retries (int): Número de novas tentativas em caso de erro de rede
+            recovery_interval (int): Envios bem sucedidos necessários para aumentar a taxa global após uma redução
+        """
+        self.bot = bot
+        self.nominal_rate = global_rate
+        self.chat_rate = chat_rate
+        self.chat_burst = chat_burst
+        self.max_workers = max_workers
+        self.max_retries = max_retries
+        self.recovery_interval = recovery_interval
+
+        self.global_bucket = TokenBucket(rate=global_rate, capacity=1)
+        self.chat_buckets = dict()
+        self.chat_buckets_lock = threading.Lock()
+
+        self.successes = 0
+        self.stats_lock = threading.Lock()
+
+        self.logger = logging.getLogger(name="Concursobô")
+
+    def chat_bucket(self, chat_id):
+        """
+            Retorna o balde de fichas do chat, criando-o se necessário
+        Args:
+            chat_id (int): ID do chat
+        Returns:
+            bucket (TokenBucket): Balde de fichas do chat
+        """
+        with self.chat_buckets_lock:
+            if chat_id not in self.chat_buckets:
+                self.chat_buckets[chat_id] = TokenBucket(rate=self.chat_rate, capacity=self.chat_burst)
+
+            return self.chat_buckets[chat_id]
+
+    def on_success(self):
+        """
+        Recupera gradualmente a taxa global depois de uma redução causada por RetryAfter
+        """
+        with self.stats_lock:
+            self.successes += 1
+
+            if self.successes < self.recovery_interval:
+                return
+
+            self.successes = 0
+
+        self.global_bucket.adjust_rate(factor=1.1, minimum=self.nominal_rate / 4, maximum=self.nominal_rate)
+
+    def on_retry_after(self, retry_after):
+        """
+            Suspende os envios e reduz a taxa global
+        Args:
+            retry_after (float): Tempo de espera pedido pelo Telegram
+        """
+        with self.stats_lock:
+            self.successes = 0
+
+        rate = self.global_bucket.adjust_rate(factor=0.8, minimum=self.nominal_rate / 4, maximum=self.nominal_rate)
+        self.global_bucket.pause(seconds=retry_after)
+        self.logger.warning(
+            msg=f"Limite de envio atingido, aguardando {retry_after} s (taxa reduzida para {rate:.1f} mensagens/s)"
+        )
+
+    def send_message(self, chat_id, message, parse_mode):
+        """
+            Envia uma mensagem respeitando os limites de taxa
+        Args:
+            chat_id (int): ID do chat
+            message (str): Mensagem a ser enviada
+            parse_mode (str): Formatação da mensagem
+        Returns:
+            (bool): Se a mensagem foi enviada
+        """
+        chat_bucket = self.chat_bucket(chat_id=chat_id)
+        retries = 0
+
+        while True:
+            chat_bucket.acquire()
+            self.global_bucket.acquire()
+
+            try:
+                self.bot.send_message(chat_id=chat_id, text=message, parse_mode=parse_mode)
+            except RetryAfter as error:
+                self.on_retry_after(retry_after=error.retry_after)
+                continue
+            except BadRequest:
+                raise
+            except (TimedOut, NetworkError) as error:
+                retries += 1
+
+                if retries > self.max_retries:
+                    self.logger.warning(msg=f"Falha ao enviar mensagem para o chat {chat_id}: {error}")
+                    return False
+
+                time.sleep(2 ** (retries - 1))
+                continue
+
+            self.on_success()
+
+            return True
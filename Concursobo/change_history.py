@@ -0,0 +1,112 @@
+import sqlite3
+import threading
+import time
+
+
+class ChangeHistory:
+    """
+    Histórico das aquisições dos scrapers, usado para estimar a frequência com que cada site é atualizado. O
+    histórico é gravado em um banco SQLite compartilhado pelos processos do bot e das checagens agendadas, de forma
+    que as atualizações encontradas pelos comandos dos usuários também entram na estimativa
+    """
+
+    def __init__(self, db_path, window=30 * 24 * 3600, prior_changes=1.0, prior_period=7 * 24 * 3600):
+        """
+            Inicialização da classe
+        Args:
+            db_path (str): Caminho para o banco de dados do histórico
+            window (float): Período, em segundos, das aquisições consideradas na estimativa
+            prior_changes (float): Número de atualizações assumido para um scraper sem histórico
+            prior_period (float): Período, em segundos, em que as atualizações de prior_changes são assumidas.
+                Quanto maior, mais aquisições são necessárias para a estimativa se afastar da suposição inicial
+        """
+        self.db_path = db_path
+        self.window = window
+        self.prior_changes = prior_changes
+        self.prior_period = prior_period
+
+        self.lock = threading.Lock()
+
+        self.connection = sqlite3.connect(database=db_path, timeout=30, check_same_thread=False)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute(
+            """
+            CREATE TABLE IF NOT EXISTS checks (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                scraper TEXT NOT NULL,
+                checked_at REAL NOT NULL,
+                updated INTEGER NOT NULL
+            )
+            """
+        )
+        self.connection.execute("CREATE INDEX IF NOT EXISTS checks_scraper ON checks (scraper, checked_at)")
+        self.connection.commit()
+
+        # As aquisições de cada scraper são removidas a cada registro. As dos scrapers que não são mais checados são
+        # removidas quando o histórico é aberto
+        self.purge()
+
+    def record(self, scraper_name, updated, checked_at=None):
+        """
+            Registra uma aquisição concluída e remove as aquisições do scraper anteriores à janela da estimativa,
+            para que o histórico não cresça indefinidamente
+        Args:
+            scraper_name (str): Nome do scraper
+            updated (bool): Verdadeiro se a aquisição encontrou dados novos
+            checked_at (float): Instante da aquisição. Se não for informado, é usado o instante atual
+        """
+        now = time.time()
+
+        with self.lock, self.connection:
+            self.connection.execute(
+                "INSERT INTO checks (scraper, checked_at, updated) VALUES (?, ?, ?)",
+                (scraper_name, checked_at or now, int(updated)),
+            )
+            self.connection.execute(
+                "DELETE FROM checks WHERE scraper = ? AND checked_at < ?", (scraper_name, now - self.window)
+            )
+
+    def change_rate(self, scraper_name, now=None):
+        """
+            Estima a taxa de atualização de um scraper: atualizações encontradas dentro da janela divididas pelo
+            período observado, somadas à suposição inicial
+        Args:
+            scraper_name (str): Nome do scraper
+            now (float): Instante de referência. Se não for informado, é usado o instante atual
+        Returns:
+            (float): Taxa estimada, em atualizações por segundo
+        """
+        now = now or time.time()
+
+        with self.lock:
+            first_check, changes = self.connection.execute(
+                "SELECT MIN(checked_at), TOTAL(updated) FROM checks WHERE scraper = ? AND checked_at >= ?",
+                (scraper_name, now - self.window),
+            ).fetchone()
+
+        observed = now - first_check if first_check is not None else 0.0
+
+        return (changes + self.prior_changes) / (observed + self.prior_period)
+
+    def last_check(self, scraper_name):
+        """
+            Retorna o instante da última aquisição registrada de um scraper
+        Args:
+            scraper_name (str): Nome do scraper
+        Returns:
+            (float): Instante da última aquisição ou None se não houver aquisições registradas
+        """
+        with self.lock:
+            return self.connection.execute(
+                "SELECT MAX(checked_at) FROM checks WHERE scraper = ?", (scraper_name,)
+            ).fetchone()[0]
+
+    def purge(self, now=None):
+        """
+            Remove as aquisições anteriores à janela da estimativa, inclusive as dos scrapers que não são mais
+            checados
+        Args:
+            now (float): Instante de referência. Se não for informado, é usado o instante atual
+        """
+        with self.lock, self.connection:
+            self.connection.execute("DELETE FROM checks WHERE checked_at < ?", ((now or time.time()) - self.window,))
@@ -5,74 +5,104 @@ import sys
 sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
 
 from Concursobo import utils
-from Concursobo.scrapers.marinha_scraper import MarinhaScraper
-from Concursobo.scrapers.marinha_smv_scraper import MarinhaSMVScraper
-from Concursobo.scrapers.fundep_scraper import FundepScraper
-from Concursobo.scrapers.corridasbr_scraper import CorridasBRScraper
-from Concursobo.scrapers.pci_scraper import PCIScraper
+from Concursobo.change_history import ChangeHistory
+from Concursobo.metrics import MetricsServer, get_registry
+from Concursobo.scraper_registry import load_registry
 from Concursobo.telegram_bot import TelegramBot
 
 
-def build_bot():
+def build_registry():
+    """
+        Cadastra os scrapers do bot listados no arquivo "scrapers.json" da pasta de dados. Os módulos dos scrapers só
+        são importados quando cada scraper é usado
+    Returns:
+        registry (ScraperRegistry): Cadastro dos scrapers
+    """
+    return load_registry(
+        path=os.path.join(utils.get_data_path(), "scrapers.json"),
+        data_path=utils.get_data_path(),
+        config=utils.project_config(),
+    )
+
+
+def build_bot(remote_metrics=None, scheduled_workers=0):
     """
         Constrói a base do bot com todos os scrapers cadastrados
+    Args:
+        remote_metrics (list of str): Endereços do /metrics de outros processos, somados no comando /metricas
+        scheduled_workers (int): Threads da fila de checagens agendadas. Apenas o processo do regular_check.py
+            executa checagens agendadas; nos demais a fila não tem threads
     Returns:
         telegram_bot (TelegramBot): Classe do bot
     """
-    token = utils.get_config().get(section="telegram", option="BOT_TOKEN")
+    config = utils.project_config()
+    token = config.get(section="telegram", option="BOT_TOKEN")
     contacts_path = os.path.join(utils.get_data_path(), "contacts_list.json")
-
-    scraper_list = [
-        MarinhaScraper(
-            name="CP-CEM 2021",
-            database_path=os.path.join(utils.get_data_path(), "cem2021.json"),
-            url="https://www.inscricao.marinha.mil.br/marinha/index_concursos.jsp?id_concurso=401",
-        ),
-        MarinhaSMVScraper(
-            name="SMV 2022",
-            database_path=os.path.join(utils.get_data_path(), "smv2022.json"),
-        ),
-        FundepScraper(
-            name="Fundep",
-            database_path=os.path.join(utils.get_data_path(), "fundep.json"),
-        ),
-        CorridasBRScraper(
-            name="CorridasBR",
-            database_path=os.path.join(utils.get_data_path(), "corridasbr.json"),
-            base_url="http://www.corridasbr.com.br/MG/",
-            table_url="http://www.corridasbr.com.br/MG/por_regiao.asp?regi%E3o=Metropolitana%20de%20Belo%20Horizonte",
-            max_distance=5,
-        ),
-        PCIScraper(
-            name="PCI Concursos",
-            database_path=os.path.join(utils.get_data_path(), "pci.json"),
-            store_size=7,
-            keywords=[
-                "automacao",
-                "eletrica",
-                "eletricidade",
-                "eletronica analogica",
-                "eletronica digital",
-                "eletrotecnica",
-                "engenharia elet",
-                "engenheiro elet",
-                "marinha",
-                "telecom",
-            ],
-            ignore_words=["estagio", "estagiario", "aprendiz", "suspens"],
-        ),
-    ]
+    outbox_path = os.path.join(utils.get_data_path(), "outbox.db")
+    history_window = float(config.get(section="scheduler", option="HISTORY_WINDOW", fallback="30"))
+    change_history = ChangeHistory(
+        db_path=os.path.join(utils.get_data_path(), "change_history.db"), window=history_window * 24 * 3600
+    )
+    time_budget = float(config.get(section="scheduler", option="TIME_BUDGET", fallback="900"))
 
     telegram_bot = TelegramBot(
-        token=token, scraper_list=scraper_list, contacts_path=contacts_path
+        token=token,
+        scraper_registry=build_registry(),
+        contacts_path=contacts_path,
+        outbox_path=outbox_path,
+        change_history=change_history,
+        lock_dir=os.path.join(utils.get_data_path(), "locks"),
+        time_budget=time_budget,
+        metrics=get_registry(),
+        remote_metrics=remote_metrics,
+        scheduled_workers=scheduled_workers,
     )
 
     return telegram_bot
 
 
+def metrics_url(option):
+    """
+        Retorna o endereço local das métricas de um processo, pela porta definida na seção [metrics] do arquivo de
+        configuração
+    Args:
+        option (str): Opção com a porta do processo
+    Returns:
+        url (str): Endereço do /metrics do processo, ou None se a opção não estiver definida
+    """
+    port = utils.project_config().get(section="metrics", option=option, fallback=None)
+
+    if not port:
+        return None
+
+    return f"http://127.0.0.1:{int(port)}/metrics"
+
+
+def start_metrics_server(option):
+    """
+        Inicia o servidor local de métricas na porta definida na seção [metrics] do arquivo de configuração
+    Args:
+        option (str): Opção com a porta do processo. Se a opção não estiver definida, o servidor não é iniciado
+    Returns:
+        server (MetricsServer): Servidor iniciado, ou None
+    """
+    port = utils.project_config().get(section="metrics", option=option, fallback=None)
+
+    if not port:
+        return None
+
+    server = MetricsServer(registry=get_registry(), port=int(port))
+    server.start()
+
+    return server
+
+
 if __name__ == "__main__":
     """
     Cadastro dos scrapers, envio de uma mensagem e execução do bot para recepção de comandos
     """
-    telegram_bot = build_bot()
+    # O /metricas do bot também resume as checagens agendadas, executadas no processo do regular_check.py
+    scheduler_metrics = metrics_url(option="SCHEDULER_PORT")
+    telegram_bot = build_bot(remote_metrics=[scheduler_metrics] if scheduler_metrics else None)
+    start_metrics_server(option="BOT_PORT")
     telegram_bot.start_pooling()
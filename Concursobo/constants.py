@@ -6,6 +6,18 @@ class AcquisitionStatus:
     ERROR = 0  # Não foi possível acessar a página
     UNCHANGED = 1  # A página foi acessada, mas os dados não foram alterados
     UPDATED = 2  # Os dados foram atualizados
+    SKIPPED = 3  # A aquisição não foi executada porque outra aquisição do scraper estava em andamento
+
+    @staticmethod
+    def name(status):
+        """
+            Retorna o nome do status
+        Args:
+            status (int): Status da aquisição
+        Returns:
+            (str): Nome do status
+        """
+        return {0: "ERROR", 1: "UNCHANGED", 2: "UPDATED", 3: "SKIPPED"}.get(status, str(status))
 
 
 class BotMessages:
@@ -17,6 +29,7 @@ class BotMessages:
         "/ajuda - Como utilizar o bot\r\n"
         "/listar_sites - Lista as páginas cadastradas e permite comandos interativos\r\n"
         "/atualizar_tudo - Atualiza todas as páginas cadastradas\r\n"
+        "/metricas - Resume o tempo e o resultado das aquisições desde a inicialização do bot\r\n"
         "/cadastrar - Adiciona este chat na lista de assinantes\r\n"
         "/unsubscribe - Remove este chat da lista de assinantes\r\n"
         "/info - Informações do bot\r\n\n"
@@ -45,8 +58,13 @@ class BotMessages:
         + git_hub_url
     )
 
+    processing = "Processando…"
+
+    no_metrics = "Nenhuma aquisição registrada desde a inicialização do bot"
+    remote_metrics_unavailable = "As métricas das checagens agendadas não estão disponíveis no momento"
+
     already_subscribed = "O chat já está na lista de contatos do bot"
     subscription_success = "O chat foi adicionado na lista de contatos do bot"
 
     unsubscription_success = "O chat foi removido da lista de contatos do bot"
-    unsubscription_success = "O chat não está na lista de contatos do bot"
+    not_subscribed = "O chat não está na lista de contatos do bot"
@@ -0,0 +1,163 @@
+import atexit
+import json
+import os
+import threading
+
+
+class ContactRegistry:
+    """
+    Lista de contatos do bot mantida em memória, com consultas em tempo constante. As alterações são agrupadas e
+    gravadas no disco de forma atômica, no mesmo formato do TinyDB usado anteriormente
+    ({"_default": {"1": {"chat_id": ...}}}), e alterações feitas no arquivo por outro processo são recarregadas
+    """
+
+    def __init__(self, path, flush_delay=1.0):
+        """
+            Inicializa a classe
+        Args:
+            path (str): Caminho para o arquivo da lista de contatos
+            flush_delay (float): Tempo, em segundos, que as alterações aguardam antes de serem gravadas no disco
+        """
+        self.path = path
+        self.flush_delay = flush_delay
+
+        # ID do documento de cada contato, indexado pelo chat_id, na ordem de cadastro
+        self._doc_ids = dict()
+        self._next_id = 1
+        # Demais tabelas do arquivo, preservadas na gravação
+        self._other_tables = dict()
+        self._file_signature = None
+        self._dirty = False
+        self._timer = None
+        self._lock = threading.RLock()
+
+        self.load()
+
+        atexit.register(self.flush)
+
+    def _stat_signature(self):
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+
+        return stat.st_mtime_ns, stat.st_size
+
+    def load(self):
+        """
+        Carrega a lista de contatos do disco
+        """
+        with self._lock:
+            tables = dict()
+
+            if os.path.isfile(self.path) and os.path.getsize(self.path) > 0:
+                with open(file=self.path, mode="r") as f:
+                    tables = json.load(f)
+
+            documents = tables.pop("_default", dict())
+
+            self._doc_ids = {
+                document["chat_id"]: int(doc_id)
+                for doc_id, document in sorted(documents.items(), key=lambda item: int(item[0]))
+            }
+            self._next_id = max(self._doc_ids.values(), default=0) + 1
+            self._other_tables = tables
+            self._file_signature = self._stat_signature()
+
+    def _refresh(self):
+        # Recarrega o arquivo se ele foi alterado por outro processo e não há alterações locais pendentes
+        if not self._dirty and self._stat_signature() != self._file_signature:
+            self.load()
+
+    def __contains__(self, chat_id):
+        with self._lock:
+            self._refresh()
+            return chat_id in self._doc_ids
+
+    def __len__(self):
+        with self._lock:
+            self._refresh()
+            return len(self._doc_ids)
+
+    def chat_ids(self):
+        """
+            Retorna os chats cadastrados
+        Returns:
+            (list of int): IDs dos chats, na ordem de cadastro
+        """
+        with self._lock:
+            self._refresh()
+            return list(self._doc_ids)
+
+    def add(self, chat_id):
+        """
+            Adiciona um chat na lista de contatos
+        Args:
+            chat_id (int): ID do chat
+        Returns:
+            (bool): Verdadeiro se o chat foi adicionado, falso se ele já estava na lista
+        """
+        with self._lock:
+            self._refresh()
+
+            if chat_id in self._doc_ids:
+                return False
+
+            self._doc_ids[chat_id] = self._next_id
+            self._next_id += 1
+            self._schedule_flush()
+
+            return True
+
+    def remove(self, chat_id):
+        """
+            Remove um chat da lista de contatos
+        Args:
+            chat_id (int): ID do chat
+        Returns:
+            (bool): Verdadeiro se o chat foi removido, falso se ele não estava na lista
+        """
+        with self._lock:
+            self._refresh()
+
+            if chat_id not in self._doc_ids:
+                return False
+
+            del self._doc_ids[chat_id]
+            self._schedule_flush()
+
+            return True
+
+    def _schedule_flush(self):
+        self._dirty = True
+
+        if self._timer is None:
+            self._timer = threading.Timer(interval=self.flush_delay, function=self.flush)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def flush(self):
+        """
+        Grava as alterações pendentes no disco de forma atômica
+        """
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+
+            if not self._dirty:
+                return
+
+            tables = dict(self._other_tables)
+            tables["_default"] = {
+                str(doc_id): {"chat_id": chat_id} for chat_id, doc_id in self._doc_ids.items()
+            }
+
+            tmp_path = self.path + ".tmp"
+            with open(file=tmp_path, mode="w") as f:
+                json.dump(tables, f)
+
+            os.replace(tmp_path, self.path)
+
+            self._file_signature = self._stat_signature()
+            self._dirty = False
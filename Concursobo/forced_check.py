@@ -4,16 +4,56 @@ import sys
 # Necessário para a execução pelo pm2
 sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
 
+import argparse
+import json
+import time
+from datetime import datetime
+
 from Concursobo.concursobo import build_bot
+from Concursobo.constants import AcquisitionStatus
+
 
 if __name__ == "__main__":
     """
     Runs the pool and send method and send messages only if there is an update
     """
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--workers", type=int, default=None, help="Number of scrapers executed at the same time")
+    parser.add_argument(
+        "--scrapers", nargs="+", default=None, help="Names of the scrapers to run (default: all registered scrapers)"
+    )
+    parser.add_argument("--report", default=None, help="Path of the JSON timing report (default: stdout)")
+    args = parser.parse_args()
+
     telegram_bot = build_bot()
 
-    telegram_bot.auto_check(scraper_name="CP-CEM 2021")
-    telegram_bot.auto_check(scraper_name="SMV 2022")
-    telegram_bot.auto_check(scraper_name="Fundep")
-    telegram_bot.auto_check(scraper_name="CorridasBR")
-    telegram_bot.auto_check(scraper_name="PCI Concursos")
+    # As atualizações são gravadas na caixa de saída junto com o estado de cada scraper e enviadas ao final dele
+    def send_updates(report):
+        if report["batch_id"] is not None:
+            telegram_bot.deliver_to_contact_list(batch_id=report["batch_id"], scraper_name=report["scraper"])
+
+    started_at = datetime.now()
+    start = time.perf_counter()
+
+    reports = telegram_bot.run_all(
+        scraper_names=args.scrapers, max_workers=args.workers, on_result=send_updates, broadcast=True
+    )
+
+    timing_report = {
+        "started_at": started_at.isoformat(timespec="seconds"),
+        "total_elapsed": time.perf_counter() - start,
+        "scrapers": [
+            {
+                "scraper": report["scraper"],
+                "status": AcquisitionStatus.name(report["status"]),
+                "elapsed": report["elapsed"],
+            }
+            for report in reports
+        ],
+    }
+
+    if args.report:
+        with open(file=args.report, mode="w") as f:
+            json.dump(timing_report, f, indent=4)
+    else:
+        print(json.dumps(timing_report, indent=4))
@@ -0,0 +1,143 @@
+import importlib.util
+import threading
+import time
+from collections import defaultdict
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+
+class HttpClient:
+    """
+    Cliente HTTP compartilhado entre os scrapers. Mantém as conexões abertas entre as aquisições (keep-alive),
+    limita as conexões por host, refaz requisições com falhas temporárias e contabiliza o tráfego de cada scraper
+    """
+
+    def __init__(
+        self,
+        timeout=(10, 60),
+        retries=3,
+        backoff_factor=0.5,
+        pool_connections=10,
+        pool_maxsize=16,
+        user_agent="Concursobo",
+    ):
+        """
+            Inicializa a classe
+        Args:
+            timeout (tuple of float): Tempo máximo de conexão e de leitura de cada requisição, em segundos
+            retries (int): Quantidade máxima de novas tentativas em caso de falha de conexão ou erro do servidor
+            backoff_factor (float): Fator do tempo de espera exponencial entre as tentativas
+            pool_connections (int): Quantidade de hosts com conexões mantidas abertas
+            pool_maxsize (int): Quantidade máxima de conexões simultâneas por host
+            user_agent (str): User-Agent enviado nas requisições
+        """
+        self.timeout = timeout
+        self.retries = retries
+
+        retry = Retry(
+            total=retries,
+            backoff_factor=backoff_factor,
+            status_forcelist=(429, 500, 502, 503, 504),
+            allowed_methods=frozenset(["GET", "HEAD"]),
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(
+            pool_connections=pool_connections,
+            pool_maxsize=pool_maxsize,
+            max_retries=retry,
+            pool_block=True,
+        )
+
+        self.session = requests.Session()
+        self.session.mount(prefix="http://", adapter=adapter)
+        self.session.mount(prefix="https://", adapter=adapter)
+
+        encodings = ["gzip", "deflate"]
+        if importlib.util.find_spec("brotli") or importlib.util.find_spec("brotlicffi"):
+            encodings.append("br")
+
+        self.session.headers.update(
+            {"User-Agent": user_agent, "Accept-Encoding": ", ".join(encodings)}
+        )
+
+        self._stats = defaultdict(lambda: {"requests": 0, "errors": 0, "bytes": 0, "elapsed": 0.0})
+        self._lock = threading.Lock()
+
+    def get(self, url, source=None, **kwargs):
+        """
+            Faz uma requisição GET
+        Args:
+            url (str): URL da requisição
+            source (str): Nome de quem fez a requisição, usado na contabilização do tráfego
+            **kwargs: Argumentos repassados para requests.Session.get
+        Returns:
+            response (Response): Resposta da requisição
+        """
+        kwargs.setdefault("timeout", self.timeout)
+
+        start = time.perf_counter()
+        try:
+            response = self.session.get(url, **kwargs)
+        except requests.RequestException:
+            self._record(source=source, elapsed=time.perf_counter() - start, size=0, error=True)
+            raise
+
+        if "Content-Length" in response.headers:
+            size = int(response.headers["Content-Length"])
+        elif not kwargs.get("stream"):
+            size = len(response.content)
+        else:
+            size = 0
+
+        self._record(source=source, elapsed=time.perf_counter() - start, size=size, error=False)
+
+        return response
+
+    def _record(self, source, elapsed, size, error):
+        with self._lock:
+            stats = self._stats[source]
+            stats["requests"] += 1
+            stats["errors"] += int(error)
+            stats["bytes"] += size
+            stats["elapsed"] += elapsed
+
+    def stats(self, source=None):
+        """
+            Retorna o tráfego contabilizado
+        Args:
+            source (str): Nome de quem fez as requisições. Se não for informado, retorna o tráfego de todos
+        Returns:
+            (dict): Quantidade de requisições, de erros, de bytes recebidos e tempo total das requisições
+        """
+        with self._lock:
+            if source is not None:
+                return dict(self._stats[source])
+
+            return {name: dict(stats) for name, stats in self._stats.items()}
+
+    def close(self):
+        """
+        Fecha as conexões abertas
+        """
+        self.session.close()
+
+
+_default_client = None
+_default_client_lock = threading.Lock()
+
+
+def get_default_client():
+    """
+        Retorna o cliente HTTP compartilhado do processo, criando-o no primeiro uso
+    Returns:
+        (HttpClient): Cliente HTTP
+    """
+    global _default_client
+
+    with _default_client_lock:
+        if _default_client is None:
+            _default_client = HttpClient()
+
+        return _default_client
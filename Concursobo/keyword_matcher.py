@@ -0,0 +1,153 @@
+from collections import deque
+
+from unidecode import unidecode
+
+
+class KeywordMatcher:
+    """
+    Busca várias palavras-chave em um texto com uma única leitura, através de um autômato de Aho-Corasick.
+    O texto e as palavras-chave são convertidos para ASCII e para letras minúsculas antes da busca
+    """
+
+    # Abaixo desta quantidade de palavras-chave, um str.find por palavra (executado em C) é mais rápido que
+    # percorrer o autômato em Python. Pelo benchmarks/keyword_benchmark.py, o str.find cai de ~16 MB/s com 100
+    # palavras para ~9 MB/s com 200, enquanto o autômato se mantém em ~13-17 MB/s; as curvas se cruzam entre 100 e
+    # 120 palavras
+    FIND_THRESHOLD = 128
+
+    def __init__(self, keywords):
+        """
+            Inicializa a classe e compila o autômato
+        Args:
+            keywords (list of str): Lista de palavras-chave
+        """
+        self.keywords = list(keywords)
+        self._folded_keywords = [self.fold(keyword) for keyword in self.keywords]
+        self._use_automaton = len(self.keywords) >= self.FIND_THRESHOLD
+
+        # Cada estado do autômato tem um dicionário de transições completo, de forma que a busca não precisa
+        # seguir os links de falha
+        self._transitions = [dict()]
+        self._outputs = [set()]
+
+        for index, keyword in enumerate(self.keywords):
+            state = 0
+            for char in self._folded_keywords[index]:
+                next_state = self._transitions[state].get(char)
+                if next_state is None:
+                    next_state = len(self._transitions)
+                    self._transitions.append(dict())
+                    self._outputs.append(set())
+                    self._transitions[state][char] = next_state
+                state = next_state
+            self._outputs[state].add(index)
+
+        self._build_links()
+
+    @staticmethod
+    def fold(text):
+        """
+            Converte o texto para a forma usada na busca
+        Args:
+            text (str): Texto de entrada
+        Returns:
+            (str): Texto em ASCII e em letras minúsculas
+        """
+        return unidecode(text).lower()
+
+    def _build_links(self):
+        """
+        Calcula os links de falha em largura e completa as transições de cada estado
+        """
+        fail = [0] * len(self._transitions)
+        queue = deque(self._transitions[0].values())
+
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._transitions[state].items():
+                queue.append(next_state)
+                fallback = fail[state]
+                while fallback and char not in self._transitions[fallback]:
+                    fallback = fail[fallback]
+                link = self._transitions[fallback].get(char, 0)
+                fail[next_state] = link if link != next_state else 0
+                self._outputs[next_state] |= self._outputs[fail[next_state]]
+
+        # Completa as transições a partir dos links de falha, em ordem de profundidade
+        queue = deque([0])
+        while queue:
+            state = queue.popleft()
+            own_transitions = dict(self._transitions[state])
+            queue.extend(own_transitions.values())
+            if state:
+                for char, next_state in self._transitions[fail[state]].items():
+                    self._transitions[state].setdefault(char, next_state)
+
+        self._outputs = [frozenset(output) for output in self._outputs]
+
+    def search_folded(self, text):
+        """
+            Busca as palavras-chave em um texto já convertido por fold
+        Args:
+            text (str): Texto convertido
+        Returns:
+            (list of str): Palavras-chave encontradas, na ordem da lista de palavras-chave
+        """
+        if not self._use_automaton:
+            return [
+                keyword
+                for keyword, folded in zip(self.keywords, self._folded_keywords)
+                if text.find(folded) != -1
+            ]
+
+        transitions = self._transitions
+        outputs = self._outputs
+        remaining = len(self.keywords)
+        found = set()
+        state = 0
+
+        for char in text:
+            state = transitions[state].get(char, 0)
+            if outputs[state]:
+                new = outputs[state] - found
+                if new:
+                    found |= new
+                    remaining -= len(new)
+                    if remaining == 0:
+                        break
+
+        return [self.keywords[index] for index in sorted(found)]
+
+    def search(self, text):
+        """
+            Busca as palavras-chave em um texto
+        Args:
+            text (str): Texto de entrada
+        Returns:
+            (list of str): Palavras-chave encontradas, na ordem da lista de palavras-chave
+        """
+        return self.search_folded(text=self.fold(text))
+
+    def contains_any(self, text):
+        """
+            Verifica se o texto contém pelo menos uma das palavras-chave
+        Args:
+            text (str): Texto de entrada
+        Returns:
+            (bool): Verdadeiro se alguma palavra-chave for encontrada
+        """
+        text = self.fold(text)
+
+        if not self._use_automaton:
+            return any(text.find(folded) != -1 for folded in self._folded_keywords)
+
+        transitions = self._transitions
+        outputs = self._outputs
+        state = 0
+
+        for char in text:
+            state = transitions[state].get(char, 0)
+            if outputs[state]:
+                return True
+
+        return False
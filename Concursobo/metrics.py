@@ -0,0 +1,394 @@
+import bisect
+import contextlib
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+
+# Limites superiores, em segundos, dos intervalos dos histogramas de latência
+DEFAULT_BUCKETS = [0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 300.0]
+
+# Descrição e tipo das métricas registradas pelo bot, indexados pelo nome da métrica
+METRICS = {
+    "concursobo_phase_seconds": (
+        "histogram",
+        "Duração de cada etapa das aquisições e envios (fetch, parse, diff, persist, render, acquisition, send)",
+    ),
+    "concursobo_fetched_bytes_total": ("counter", "Bytes recebidos nas requisições dos scrapers"),
+    "concursobo_items_total": (
+        "counter",
+        "Registros processados (scraped: extraídos, changed: alterados, rendered: mensagens geradas, sent: enviadas)",
+    ),
+    "concursobo_acquisitions_total": ("counter", "Aquisições finalizadas, por status"),
+}
+
+# Amostra e rótulos de uma linha no formato de texto do Prometheus
+SAMPLE_PATTERN = re.compile(r"^([a-zA-Z_:][a-zA-Z0-9_:]*)(?:\{(.*)\})? (\S+)$")
+LABEL_PATTERN = re.compile(r'([a-zA-Z_][a-zA-Z0-9_]*)="((?:[^"\\]|\\.)*)"')
+
+
+class Histogram:
+    """
+    Histograma com intervalos fixos, no formato do Prometheus
+    """
+
+    def __init__(self, buckets):
+        """
+            Inicializa a classe
+        Args:
+            buckets (list of float): Limites superiores dos intervalos, em ordem crescente
+        """
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        """
+            Registra um valor
+        Args:
+            value (float): Valor observado
+        """
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def quantile(self, q):
+        """
+            Estima um quantil pelo limite superior do intervalo onde ele se encontra
+        Args:
+            q (float): Quantil, entre 0 e 1
+        Returns:
+            (float): Limite superior do intervalo, infinito se o quantil estiver acima do último limite
+        """
+        target = q * self.count
+        cumulative = 0
+
+        for bound, count in zip(self.buckets + [float("inf")], self.counts):
+            cumulative += count
+            if cumulative >= target:
+                return bound
+
+        return float("inf")
+
+
+class MetricsRegistry:
+    """
+    Métricas do processo mantidas em memória: histogramas de latência e contadores, identificados pelo nome da
+    métrica e pelos rótulos (scraper, etapa, status...)
+    """
+
+    def __init__(self, buckets=None):
+        """
+            Inicializa a classe
+        Args:
+            buckets (list of float): Limites dos intervalos dos histogramas. Se não for informado, é usado
+                DEFAULT_BUCKETS
+        """
+        self.buckets = buckets or DEFAULT_BUCKETS
+        self.histograms = dict()
+        self.counters = dict()
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def _key(name, labels):
+        return name, tuple(sorted(labels.items()))
+
+    def observe(self, name, value, **labels):
+        """
+            Registra um valor em um histograma
+        Args:
+            name (str): Nome da métrica
+            value (float): Valor observado
+            **labels: Rótulos da métrica
+        """
+        key = self._key(name=name, labels=labels)
+
+        with self.lock:
+            if key not in self.histograms:
+                self.histograms[key] = Histogram(buckets=self.buckets)
+
+            self.histograms[key].observe(value=value)
+
+    def increment(self, name, value=1, **labels):
+        """
+            Incrementa um contador
+        Args:
+            name (str): Nome da métrica
+            value (float): Valor do incremento
+            **labels: Rótulos da métrica
+        """
+        key = self._key(name=name, labels=labels)
+
+        with self.lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    @contextlib.contextmanager
+    def timer(self, name, **labels):
+        """
+            Mede a duração do bloco e a registra em um histograma, inclusive quando o bloco lança uma exceção
+        Args:
+            name (str): Nome da métrica
+            **labels: Rótulos da métrica
+        """
+        start = time.perf_counter()
+
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start, **labels)
+
+    def render(self):
+        """
+            Gera as métricas no formato de texto do Prometheus
+        Returns:
+            (str): Métricas no formato de exposição do Prometheus
+        """
+        with self.lock:
+            histograms = [
+                (name, labels, list(histogram.counts), histogram.sum, histogram.count)
+                for (name, labels), histogram in sorted(self.histograms.items())
+            ]
+            counters = sorted(self.counters.items())
+
+        lines = list()
+        described = set()
+
+        def describe(name):
+            if name not in described and name in METRICS:
+                metric_type, description = METRICS[name]
+                lines.append(f"# HELP {name} {description}")
+                lines.append(f"# TYPE {name} {metric_type}")
+                described.add(name)
+
+        def format_labels(labels):
+            if not labels:
+                return ""
+
+            escaped = [
+                (key, str(value).replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n"))
+                for key, value in labels
+            ]
+            return "{" + ",".join(f"{key}=\"{value}\"" for key, value in escaped) + "}"
+
+        for name, labels, counts, total, count in histograms:
+            describe(name)
+
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + [float("inf")], counts):
+                cumulative += bucket_count
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                lines.append(f"{name}_bucket{format_labels(labels + (('le', le),))} {cumulative}")
+
+            lines.append(f"{name}_sum{format_labels(labels)} {total}")
+            lines.append(f"{name}_count{format_labels(labels)} {count}")
+
+        for (name, labels), value in counters:
+            describe(name)
+            lines.append(f"{name}{format_labels(labels)} {value}")
+
+        return "\n".join(lines) + "\n"
+
+    def summary(self):
+        """
+            Resume as métricas de cada scraper
+        Returns:
+            summary (dict): Por scraper, as etapas (número de medições, média e percentil 95, em segundos), os
+                contadores de status e de registros e os bytes recebidos
+        """
+        summary = dict()
+
+        with self.lock:
+            for (name, labels), histogram in sorted(self.histograms.items()):
+                labels = dict(labels)
+                if name != "concursobo_phase_seconds" or "scraper" not in labels:
+                    continue
+
+                scraper = summary.setdefault(labels["scraper"], {"phases": dict(), "counters": dict()})
+                scraper["phases"][labels["phase"]] = {
+                    "count": histogram.count,
+                    "mean": histogram.sum / histogram.count,
+                    "p95": histogram.quantile(q=0.95),
+                }
+
+            for (name, labels), value in sorted(self.counters.items()):
+                labels = dict(labels)
+                if "scraper" not in labels:
+                    continue
+
+                scraper = summary.setdefault(labels["scraper"], {"phases": dict(), "counters": dict()})
+                if name == "concursobo_acquisitions_total":
+                    scraper["counters"][labels["status"].lower()] = value
+                elif name == "concursobo_items_total":
+                    scraper["counters"][labels["kind"]] = value
+                elif name == "concursobo_fetched_bytes_total":
+                    scraper["counters"]["bytes"] = value
+
+        return summary
+
+    def merge(self, other):
+        """
+            Soma às métricas deste registro as de outro, como as lidas do servidor de outro processo. Os dois
+            registros devem usar os mesmos intervalos nos histogramas
+        Args:
+            other (MetricsRegistry): Métricas somadas
+        """
+        with other.lock:
+            histograms = [
+                (key, list(histogram.counts), histogram.sum, histogram.count)
+                for key, histogram in other.histograms.items()
+            ]
+            counters = list(other.counters.items())
+
+        with self.lock:
+            for key, counts, total, count in histograms:
+                if key not in self.histograms:
+                    self.histograms[key] = Histogram(buckets=self.buckets)
+
+                histogram = self.histograms[key]
+                histogram.counts = [mine + theirs for mine, theirs in zip(histogram.counts, counts)]
+                histogram.sum += total
+                histogram.count += count
+
+            for key, value in counters:
+                self.counters[key] = self.counters.get(key, 0) + value
+
+    @classmethod
+    def parse(cls, text, buckets=None):
+        """
+            Lê as métricas no formato de texto do Prometheus, como geradas por render
+        Args:
+            text (str): Métricas no formato de exposição do Prometheus
+            buckets (list of float): Limites dos intervalos dos histogramas. Se não for informado, é usado
+                DEFAULT_BUCKETS
+        Returns:
+            registry (MetricsRegistry): Métricas lidas
+        """
+        registry = cls(buckets=buckets)
+        histograms = dict()
+
+        def unescape(value):
+            return re.sub(r"\\(.)", lambda match: "\n" if match.group(1) == "n" else match.group(1), value)
+
+        for line in text.splitlines():
+            match = SAMPLE_PATTERN.match(line)
+            if match is None:
+                continue
+
+            name, raw_labels, value = match.groups()
+            labels = {key: unescape(value=raw) for key, raw in LABEL_PATTERN.findall(raw_labels or "")}
+            base_name, _, suffix = name.rpartition("_")
+
+            if METRICS.get(base_name, ("",))[0] == "histogram" and suffix in ("bucket", "sum", "count"):
+                labels.pop("le", None)
+                histogram = histograms.setdefault(
+                    cls._key(name=base_name, labels=labels), {"bucket": list(), "sum": 0.0, "count": 0}
+                )
+                if suffix == "bucket":
+                    histogram["bucket"].append(int(float(value)))
+                else:
+                    histogram[suffix] = float(value)
+            else:
+                registry.counters[cls._key(name=name, labels=labels)] = int(value) if value.isdigit() else float(value)
+
+        for key, parsed in histograms.items():
+            histogram = Histogram(buckets=registry.buckets)
+            # Os intervalos do formato do Prometheus são cumulativos
+            histogram.counts = [
+                cumulative - previous
+                for cumulative, previous in zip(parsed["bucket"], [0] + parsed["bucket"][:-1])
+            ]
+            histogram.sum = parsed["sum"]
+            histogram.count = int(parsed["count"])
+            registry.histograms[key] = histogram
+
+        return registry
+
+    @classmethod
+    def fetch(cls, url, timeout=2.0):
+        """
+            Lê as métricas expostas pelo servidor de outro processo
+        Args:
+            url (str): Endereço do /metrics do processo
+            timeout (float): Tempo máximo da requisição, em segundos
+        Returns:
+            registry (MetricsRegistry): Métricas lidas
+        """
+        response = requests.get(url=url, timeout=timeout)
+        response.raise_for_status()
+
+        return cls.parse(text=response.text)
+
+
+class MetricsServer:
+    """
+    Servidor HTTP local que expõe as métricas no formato do Prometheus em /metrics
+    """
+
+    def __init__(self, registry, port, host="127.0.0.1"):
+        """
+            Inicializa a classe
+        Args:
+            registry (MetricsRegistry): Métricas expostas
+            port (int): Porta do servidor
+            host (str): Endereço do servidor. Por padrão, aceita apenas conexões locais
+        """
+        self.registry = registry
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?")[0] not in ("/", "/metrics"):
+                    self.send_error(404)
+                    return
+
+                body = registry.render().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.server = ThreadingHTTPServer((host, port), Handler)
+        self.server.daemon_threads = True
+        self.thread = threading.Thread(target=self.server.serve_forever, name="metricas", daemon=True)
+
+    @property
+    def port(self):
+        return self.server.server_address[1]
+
+    def start(self):
+        """
+        Inicia o servidor em segundo plano
+        """
+        self.thread.start()
+
+    def stop(self):
+        """
+        Encerra o servidor
+        """
+        self.server.shutdown()
+        self.server.server_close()
+
+
+_registry = None
+_registry_lock = threading.Lock()
+
+
+def get_registry():
+    """
+        Retorna as métricas compartilhadas do processo, criando-as no primeiro uso
+    Returns:
+        (MetricsRegistry): Métricas do processo
+    """
+    global _registry
+
+    with _registry_lock:
+        if _registry is None:
+            _registry = MetricsRegistry()
+
+        return _registry
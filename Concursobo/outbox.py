@@ -0,0 +1,386 @@
+import hashlib
+import logging
+import sqlite3
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from itertools import groupby
+
+from telegram import ParseMode
+from telegram.error import TelegramError, Unauthorized
+
+
+class MessageStatus:
+    """
+    Indica o status de uma mensagem na caixa de saída
+    """
+
+    PENDING = "pending"  # Aguardando envio ou uma nova tentativa
+    SENDING = "sending"  # Reservada por um processo de envio
+    SENT = "sent"  # Entregue ao Telegram
+    FAILED = "failed"  # Descartada após um erro permanente ou após esgotar as tentativas
+
+
+class Outbox:
+    """
+    Caixa de saída persistente das mensagens do bot. As mensagens são gravadas em um banco SQLite antes do envio e
+    marcadas como enviadas individualmente, de forma que um erro do Telegram ou uma queda do processo não descarta as
+    mensagens restantes de um envio
+    """
+
+    def __init__(self, db_path, broadcast_engine, max_attempts=5, backoff=30.0, lease=600.0):
+        """
+            Inicialização da classe
+        Args:
+            db_path (str): Caminho para o banco de dados da caixa de saída
+            broadcast_engine (BroadcastEngine): Motor de envio com os limites de taxa do Telegram
+            max_attempts (int): Número máximo de tentativas de envio de uma mensagem
+            backoff (float): Tempo de espera, em segundos, antes da primeira nova tentativa. Dobra a cada tentativa
+            lease (float): Tempo após o qual uma mensagem reservada por um processo interrompido volta para a fila.
+                Enquanto um envio está em andamento, a reserva das suas mensagens é renovada
+        """
+        self.db_path = db_path
+        self.broadcast_engine = broadcast_engine
+        self.max_attempts = max_attempts
+        self.backoff = backoff
+        self.lease = lease
+
+        self.logger = logging.getLogger(name="Concursobô")
+        self.lock = threading.Lock()
+        self.worker = None
+
+        self.connection = sqlite3.connect(database=db_path, timeout=30, check_same_thread=False)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute(
+            """
+            CREATE TABLE IF NOT EXISTS messages (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                idempotency_key TEXT NOT NULL UNIQUE,
+                batch_id TEXT NOT NULL,
+                chat_id INTEGER NOT NULL,
+                text TEXT NOT NULL,
+                parse_mode TEXT,
+                status TEXT NOT NULL,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                next_attempt REAL NOT NULL,
+                claimed_at REAL,
+                claim_token TEXT,
+                created_at REAL NOT NULL,
+                last_error TEXT
+            )
+            """
+        )
+        # Caixas de saída criadas antes da identificação das reservas
+        columns = [row[1] for row in self.connection.execute("PRAGMA table_info(messages)")]
+        if "claim_token" not in columns:
+            self.connection.execute("ALTER TABLE messages ADD COLUMN claim_token TEXT")
+
+        self.connection.execute(
+            "CREATE INDEX IF NOT EXISTS messages_status ON messages (status, next_attempt)"
+        )
+        self.connection.execute("CREATE INDEX IF NOT EXISTS messages_claim ON messages (claim_token)")
+        self.connection.commit()
+
+    @staticmethod
+    def idempotency_key(batch_id, chat_id, index):
+        """
+            Gera a chave que identifica uma mensagem dentro de um envio
+        Args:
+            batch_id (str): Identificador do envio
+            chat_id (int): ID do chat de destino
+            index (int): Posição da mensagem no envio
+        Returns:
+            (str): Chave da mensagem
+        """
+        return hashlib.sha1(f"{batch_id}|{chat_id}|{index}".encode("utf-8")).hexdigest()
+
+    def enqueue(self, chat_ids, message_list, parse_mode=ParseMode.HTML, batch_id=None):
+        """
+            Grava as mensagens na caixa de saída em uma única transação. Reenfileirar o mesmo envio não duplica
+            as mensagens
+        Args:
+            chat_ids (list of int): IDs dos chats de destino
+            message_list (list of str): Lista de mensagens
+            parse_mode (str): Formatação das mensagens
+            batch_id (str): Identificador do envio. Se não for informado, um novo identificador é gerado
+        Returns:
+            batch_id (str): Identificador do envio
+        """
+        batch_id = batch_id or uuid.uuid4().hex
+        now = time.time()
+
+        rows = [
+            (
+                self.idempotency_key(batch_id=batch_id, chat_id=chat_id, index=index),
+                batch_id,
+                chat_id,
+                message,
+                parse_mode,
+                MessageStatus.PENDING,
+                now,
+                now,
+            )
+            for chat_id in chat_ids
+            for index, message in enumerate(message_list)
+        ]
+
+        with self.lock, self.connection:
+            self.connection.executemany(
+                "INSERT OR IGNORE INTO messages "
+                "(idempotency_key, batch_id, chat_id, text, parse_mode, status, next_attempt, created_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+
+        return batch_id
+
+    def claim(self, batch_id=None):
+        """
+            Reserva as mensagens prontas para envio, incluindo as reservadas por um processo interrompido. A leitura e
+            a reserva são feitas na mesma transação de escrita, de forma que o bot e as checagens agendadas, que
+            esvaziam a mesma caixa de saída, nunca reservam a mesma mensagem
+        Args:
+            batch_id (str): Restringe a reserva a um envio. Se não for informado, reserva todas as mensagens
+        Returns:
+            claim_token (str): Identificador da reserva, exigido nas alterações das mensagens reservadas
+            rows (list of tuple): Mensagens reservadas (id, chat_id, text, parse_mode, attempts), em ordem
+        """
+        claim_token = uuid.uuid4().hex
+        now = time.time()
+        query = (
+            "SELECT id, chat_id, text, parse_mode, attempts FROM messages "
+            "WHERE ((status = ? AND next_attempt <= ?) OR (status = ? AND claimed_at < ?))"
+        )
+        parameters = [MessageStatus.PENDING, now, MessageStatus.SENDING, now - self.lease]
+
+        if batch_id is not None:
+            query += " AND batch_id = ?"
+            parameters.append(batch_id)
+
+        with self.lock, self.connection:
+            # Bloqueia as escritas dos outros processos desde a leitura das mensagens
+            self.connection.execute("BEGIN IMMEDIATE")
+            rows = self.connection.execute(query + " ORDER BY id", parameters).fetchall()
+            self.connection.executemany(
+                "UPDATE messages SET status = ?, claimed_at = ?, claim_token = ? WHERE id = ?",
+                [(MessageStatus.SENDING, now, claim_token, row[0]) for row in rows],
+            )
+
+        return claim_token, rows
+
+    def renew(self, claim_token):
+        """
+            Renova a reserva das mensagens que ainda não foram enviadas, para que um envio mais longo que o prazo da
+            reserva não tenha as suas mensagens reservadas e enviadas por outro processo
+        Args:
+            claim_token (str): Identificador da reserva
+        """
+        with self.lock, self.connection:
+            self.connection.execute(
+                "UPDATE messages SET claimed_at = ? WHERE claim_token = ? AND status = ?",
+                (time.time(), claim_token, MessageStatus.SENDING),
+            )
+
+    def mark_sent(self, message_id, claim_token):
+        """
+            Marca uma mensagem como enviada
+        Args:
+            message_id (int): ID da mensagem na caixa de saída
+            claim_token (str): Identificador da reserva da mensagem
+        Returns:
+            (bool): Falso se a reserva da mensagem foi perdida para outro processo
+        """
+        with self.lock, self.connection:
+            cursor = self.connection.execute(
+                "UPDATE messages SET status = ?, attempts = attempts + 1, last_error = NULL "
+                "WHERE id = ? AND claim_token = ?",
+                (MessageStatus.SENT, message_id, claim_token),
+            )
+
+        return cursor.rowcount == 1
+
+    def mark_failed(self, message_ids, claim_token, error, attempts=None):
+        """
+            Agenda uma nova tentativa para as mensagens ou as descarta se o erro for permanente ou as tentativas
+            tiverem se esgotado
+        Args:
+            message_ids (list of int): IDs das mensagens na caixa de saída
+            claim_token (str): Identificador da reserva das mensagens
+            error (str): Descrição do erro
+            attempts (int): Tentativas já feitas. Se não for informado, o erro é considerado permanente
+        """
+        if attempts is None or attempts + 1 >= self.max_attempts:
+            status, next_attempt = MessageStatus.FAILED, time.time()
+        else:
+            status, next_attempt = MessageStatus.PENDING, time.time() + self.backoff * 2 ** attempts
+
+        with self.lock, self.connection:
+            self.connection.executemany(
+                "UPDATE messages SET status = ?, attempts = attempts + 1, next_attempt = ?, last_error = ? "
+                "WHERE id = ? AND claim_token = ?",
+                [(status, next_attempt, error, message_id, claim_token) for message_id in message_ids],
+            )
+
+    def release(self, message_ids, claim_token, next_attempt):
+        """
+            Devolve mensagens reservadas para a fila, sem contar uma tentativa
+        Args:
+            message_ids (list of int): IDs das mensagens na caixa de saída
+            claim_token (str): Identificador da reserva das mensagens
+            next_attempt (float): Instante a partir do qual as mensagens podem ser enviadas
+        """
+        with self.lock, self.connection:
+            self.connection.executemany(
+                "UPDATE messages SET status = ?, next_attempt = ? WHERE id = ? AND claim_token = ?",
+                [(MessageStatus.PENDING, next_attempt, message_id, claim_token) for message_id in message_ids],
+            )
+
+    def deliver_chat(self, chat_id, rows, claim_token):
+        """
+            Envia as mensagens reservadas de um chat, em ordem. Após uma falha temporária, as mensagens seguintes
+            do chat voltam para a fila junto com a que falhou, para não serem entregues fora de ordem
+        Args:
+            chat_id (int): ID do chat de destino
+            rows (list of tuple): Mensagens reservadas do chat
+            claim_token (str): Identificador da reserva das mensagens
+        Returns:
+            sent (int): Número de mensagens enviadas
+        """
+        sent = 0
+
+        for position, (message_id, _, text, parse_mode, attempts) in enumerate(rows):
+            remaining_ids = [row[0] for row in rows[position + 1:]]
+
+            try:
+                delivered = self.broadcast_engine.send_message(
+                    chat_id=chat_id, message=text, parse_mode=parse_mode
+                )
+            except Unauthorized as error:
+                self.logger.info(msg=f"O chat {chat_id} bloqueou o bot, descartando as mensagens")
+                self.mark_failed(
+                    message_ids=[message_id] + remaining_ids, claim_token=claim_token, error=str(error)
+                )
+                break
+            except TelegramError as error:
+                self.logger.warning(msg=f"Erro ao enviar mensagem para o chat {chat_id}: {error}")
+                self.mark_failed(message_ids=[message_id], claim_token=claim_token, error=str(error))
+                continue
+
+            if not delivered:
+                self.mark_failed(
+                    message_ids=[message_id], claim_token=claim_token, error="Erro de rede", attempts=attempts
+                )
+                self.release(
+                    message_ids=remaining_ids,
+                    claim_token=claim_token,
+                    next_attempt=time.time() + self.backoff * 2 ** attempts,
+                )
+                break
+
+            sent += 1
+
+            if not self.mark_sent(message_id=message_id, claim_token=claim_token):
+                self.logger.warning(msg=f"Reserva das mensagens do chat {chat_id} perdida, interrompendo o envio")
+                break
+
+        return sent
+
+    def deliver(self, batch_id=None):
+        """
+            Envia as mensagens pendentes da caixa de saída
+        Args:
+            batch_id (str): Restringe o envio a um envio enfileirado. Se não for informado, envia todas as
+                mensagens pendentes
+        Returns:
+            report (dict): Mensagens enviadas, mensagens que continuam pendentes e tempo total do envio
+        """
+        start = time.perf_counter()
+        claim_token, rows = self.claim(batch_id=batch_id)
+
+        chats = [
+            (chat_id, list(chat_rows))
+            for chat_id, chat_rows in groupby(sorted(rows, key=lambda row: (row[1], row[0])), key=lambda row: row[1])
+        ]
+
+        finished = threading.Event()
+
+        def renew_lease():
+            while not finished.wait(timeout=self.lease / 4):
+                self.renew(claim_token=claim_token)
+
+        renewer = threading.Thread(target=renew_lease, name="outbox-lease", daemon=True)
+        renewer.start()
+
+        try:
+            with ThreadPoolExecutor(
+                max_workers=self.broadcast_engine.max_workers, thread_name_prefix="outbox"
+            ) as executor:
+                sent = sum(
+                    executor.map(
+                        lambda chat: self.deliver_chat(chat_id=chat[0], rows=chat[1], claim_token=claim_token), chats
+                    )
+                )
+        finally:
+            finished.set()
+            renewer.join()
+
+        return {
+            "sent": sent,
+            "unsent": len(rows) - sent,
+            "elapsed": time.perf_counter() - start,
+        }
+
+    def pending_count(self):
+        """
+            Retorna o número de mensagens aguardando envio
+        Returns:
+            (int): Número de mensagens pendentes
+        """
+        with self.lock:
+            return self.connection.execute(
+                "SELECT COUNT(*) FROM messages WHERE status IN (?, ?)",
+                (MessageStatus.PENDING, MessageStatus.SENDING),
+            ).fetchone()[0]
+
+    def purge(self, older_than=7 * 24 * 3600):
+        """
+            Remove as mensagens já finalizadas mais antigas que o período informado
+        Args:
+            older_than (float): Idade mínima, em segundos, das mensagens removidas
+        """
+        with self.lock, self.connection:
+            self.connection.execute(
+                "DELETE FROM messages WHERE status IN (?, ?) AND created_at < ?",
+                (MessageStatus.SENT, MessageStatus.FAILED, time.time() - older_than),
+            )
+
+    def start_worker(self, interval=60.0):
+        """
+            Inicia uma thread que envia periodicamente as mensagens pendentes, incluindo as novas tentativas e as
+            mensagens deixadas por um processo interrompido
+        Args:
+            interval (float): Intervalo, em segundos, entre as verificações da caixa de saída
+        """
+        if self.worker is not None:
+            return
+
+        def run():
+            while True:
+                try:
+                    report = self.deliver()
+
+                    if report["sent"] or report["unsent"]:
+                        self.logger.info(
+                            msg=f"Caixa de saída: {report['sent']} mensagens enviadas, "
+                            f"{report['unsent']} aguardando nova tentativa"
+                        )
+
+                    self.purge()
+                except Exception:
+                    self.logger.exception(msg="Erro ao esvaziar a caixa de saída")
+
+                time.sleep(interval)
+
+        self.worker = threading.Thread(target=run, name="outbox", daemon=True)
+        self.worker.start()
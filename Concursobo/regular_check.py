@@ -7,7 +7,8 @@ sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
 import time
 
 from Concursobo import utils
-from Concursobo.concursobo import build_bot
+from Concursobo.adaptive_scheduler import AdaptiveScheduler
+from Concursobo.concursobo import build_bot, start_metrics_server
 
 
 from apscheduler.schedulers.background import BackgroundScheduler
@@ -16,63 +17,45 @@ if __name__ == "__main__":
     """
     Runs the pool and send method and send messages only if there is an update
     """
-    telegram_bot = build_bot()
-    scheduler = BackgroundScheduler()
-
-    timezone = utils.get_config().get(section="timezone", option="PYTZ_TIMEZONE")
-    scheduler.configure(timezone=timezone)
-
-    def job_cem2021():
-        telegram_bot.auto_check(scraper_name="CP-CEM 2021")
-
-    def job_smv2022():
-        telegram_bot.auto_check(scraper_name="SMV 2022")
-
-    def job_fundep():
-        telegram_bot.auto_check(scraper_name="Fundep")
-
-    def job_corridasbr():
-        telegram_bot.auto_check(scraper_name="CorridasBR")
-
-    def job_pci():
-        telegram_bot.auto_check(scraper_name="PCI Concursos")
-
-    scheduler.add_job(
-        func=job_cem2021,
-        trigger="cron",
-        day_of_week="0-4",
-        hour="7,11,15,17",
-        minute="0",
-    )
-    scheduler.add_job(
-        func=job_smv2022,
-        trigger="cron",
-        day_of_week="0-4",
-        hour="7,11,15,17",
-        minute="1",
-    )
-    scheduler.add_job(
-        func=job_corridasbr,
-        trigger="cron",
-        day_of_week="0-4",
-        hour="8,17",
-        minute="2"
-    )
-    scheduler.add_job(
-        func=job_fundep,
-        trigger="cron",
-        day_of_week="0-4",
-        hour="8,17",
-        minute="3"
-    )
-    scheduler.add_job(
-        func=job_pci,
-        trigger="cron",
-        day_of_week="0-4",
-        hour="8,17",
-        minute="4"
+    telegram_bot = build_bot(scheduled_workers=1)
+    telegram_bot.outbox.start_worker()
+    start_metrics_server(option="SCHEDULER_PORT")
+    config = utils.project_config()
+
+    # Uma execução por scraper de cada vez; execuções perdidas são agrupadas em uma só e descartadas após o
+    # tempo de tolerância
+    scheduler = BackgroundScheduler(
+        job_defaults={
+            "max_instances": 1,
+            "coalesce": True,
+            "misfire_grace_time": int(config.get(section="scheduler", option="MISFIRE_GRACE_TIME", fallback="900")),
+        },
+        timezone=config.timezone,
     )
 
+    mode = config.get(section="scheduler", option="MODE", fallback="cron")
+
+    if mode == "adaptive":
+        adaptive_scheduler = AdaptiveScheduler(
+            telegram_bot=telegram_bot,
+            scheduler=scheduler,
+            change_history=telegram_bot.change_history,
+            budget=float(config.get(section="scheduler", option="DAILY_BUDGET", fallback="14")),
+            min_interval=float(config.get(section="scheduler", option="MIN_INTERVAL", fallback="60")),
+            max_interval=float(config.get(section="scheduler", option="MAX_INTERVAL", fallback="1440")),
+        )
+        adaptive_scheduler.start()
+    else:
+        for scraper_name, schedule in telegram_bot.scrapers.schedules().items():
+            scheduler.add_job(
+                func=telegram_bot.auto_check,
+                kwargs=dict(scraper_name=scraper_name),
+                trigger="cron",
+                id=scraper_name,
+                name=scraper_name,
+                **schedule,
+            )
+
     scheduler.start()
 
     while True:
@@ -0,0 +1,87 @@
+import os
+import re
+import threading
+import time
+
+try:
+    import fcntl
+except ImportError:
+    # Sem fcntl (Windows), a trava vale apenas para as threads do processo
+    fcntl = None
+
+
+class ScraperLock:
+    """
+    Trava que garante uma única aquisição de um scraper por vez. Vale entre as threads do processo e, com um arquivo
+    de trava, entre os processos do bot e das checagens agendadas, que gravam no mesmo estado do scraper
+    """
+
+    def __init__(self, scraper_name, lock_dir=None, poll_interval=0.5):
+        """
+            Inicialização da classe
+        Args:
+            scraper_name (str): Nome do scraper
+            lock_dir (str): Pasta dos arquivos de trava. Se não for informada, a trava vale apenas para o processo
+            poll_interval (float): Intervalo, em segundos, entre as tentativas de obter a trava de outro processo
+        """
+        self.scraper_name = scraper_name
+        self.poll_interval = poll_interval
+        self.path = None
+
+        if lock_dir is not None and fcntl is not None:
+            os.makedirs(lock_dir, exist_ok=True)
+            file_name = re.sub(pattern=r"[^\w.-]+", repl="_", string=scraper_name)
+            self.path = os.path.join(lock_dir, f"{file_name}.lock")
+
+        self._thread_lock = threading.Lock()
+        self._file = None
+
+    def acquire(self, timeout=None):
+        """
+            Obtém a trava
+        Args:
+            timeout (float): Tempo máximo de espera, em segundos. Zero não espera e None espera indefinidamente
+        Returns:
+            (bool): Verdadeiro se a trava foi obtida
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+
+        if not self._thread_lock.acquire(timeout=-1 if timeout is None else timeout):
+            return False
+
+        if self.path is None:
+            return True
+
+        self._file = open(file=self.path, mode="a")
+
+        while True:
+            try:
+                fcntl.flock(self._file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                return True
+            except BlockingIOError:
+                if deadline is not None and time.monotonic() >= deadline:
+                    self._file.close()
+                    self._file = None
+                    self._thread_lock.release()
+                    return False
+
+                time.sleep(self.poll_interval)
+
+    def release(self):
+        """
+        Libera a trava
+        """
+        if self._file is not None:
+            fcntl.flock(self._file, fcntl.LOCK_UN)
+            self._file.close()
+            self._file = None
+
+        self._thread_lock.release()
+
+    def locked(self):
+        """
+            Verifica se a trava está em uso por uma thread do processo
+        Returns:
+            (bool): Verdadeiro se a trava está em uso
+        """
+        return self._thread_lock.locked()
@@ -0,0 +1,191 @@
+import importlib
+import json
+import os
+import threading
+from collections import namedtuple
+from itertools import chain, zip_longest
+from urllib.parse import urlparse
+
+# Referência a um scraper cadastrado, no formato "modulo:Classe", os argumentos usados para criá-lo, o servidor
+# consultado, os campos do agendamento cron (sem o minuto, distribuído automaticamente se não for informado) e os
+# limites do agendamento adaptativo
+ScraperSpec = namedtuple("ScraperSpec", ["entry_point", "kwargs", "host", "schedule", "polling"])
+
+
+def load_entry_point(entry_point):
+    """
+        Importa a classe referenciada por um entry point
+    Args:
+        entry_point (str): Referência no formato "modulo:Classe"
+    Returns:
+        (type): Classe referenciada
+    """
+    module_name, _, attribute = entry_point.partition(":")
+
+    if not module_name or not attribute:
+        raise Exception(f"Entry point \"{entry_point}\" inválido, utilize o formato modulo:Classe")
+
+    return getattr(importlib.import_module(module_name), attribute)
+
+
+class ScraperRegistry:
+    """
+    Cadastro dos scrapers do bot. Os scrapers são registrados pela referência à classe e o módulo só é importado,
+    e o scraper criado, no primeiro acesso. Assim o bot começa a responder comandos sem carregar os scrapers e um
+    processo que usa um único scraper não paga o custo de importar os demais
+    """
+
+    def __init__(self):
+        """
+        Inicializa a classe
+        """
+        self.specs = dict()
+        self.instances = dict()
+        self.lock = threading.Lock()
+
+    def register(self, name, entry_point, arguments=None, host=None, schedule=None, polling=None):
+        """
+            Cadastra um scraper sem importá-lo
+        Args:
+            name (str): Nome do scraper, também repassado para o construtor
+            entry_point (str): Classe do scraper no formato "modulo:Classe"
+            arguments (dict): Argumentos repassados para o construtor do scraper
+            host (str): Servidor consultado pelo scraper. Se não for informado, é obtido do primeiro argumento com
+                uma URL
+            schedule (dict): Campos do agendamento cron do scraper (day_of_week, hour, minute...). Se não for
+                informado, o scraper não é executado automaticamente
+            polling (dict): Intervalos mínimo e máximo, em minutos, entre as checagens do agendamento adaptativo
+                (min_interval, max_interval). Os limites não informados usam os valores do arquivo de configuração
+        """
+        arguments = arguments or dict()
+
+        if host is None:
+            urls = [value for key, value in arguments.items() if key.endswith("url")]
+            host = urlparse(urls[0]).netloc if urls else name
+
+        with self.lock:
+            self.specs[name] = ScraperSpec(
+                entry_point=entry_point, kwargs=arguments, host=host, schedule=schedule, polling=polling or dict()
+            )
+            self.instances.pop(name, None)
+
+    def add(self, scraper):
+        """
+            Cadastra um scraper já criado
+        Args:
+            scraper (BaseScraper): Scraper a ser cadastrado
+        """
+        with self.lock:
+            self.specs[scraper.name] = None
+            self.instances[scraper.name] = scraper
+
+    def __getitem__(self, name):
+        """
+            Retorna o scraper, importando e criando o scraper no primeiro acesso
+        Args:
+            name (str): Nome do scraper
+        Returns:
+            (BaseScraper): Scraper
+        """
+        with self.lock:
+            if name not in self.instances:
+                spec = self.specs[name]
+                scraper_class = load_entry_point(entry_point=spec.entry_point)
+                self.instances[name] = scraper_class(name=name, **spec.kwargs)
+
+            return self.instances[name]
+
+    def __contains__(self, name):
+        return name in self.specs
+
+    def __iter__(self):
+        return iter(list(self.specs))
+
+    def __len__(self):
+        return len(self.specs)
+
+    def items(self):
+        """
+            Retorna os nomes e os scrapers cadastrados, criando todos os scrapers
+        Returns:
+            (list of tuple): Tuplas (nome, scraper)
+        """
+        return [(name, self[name]) for name in self]
+
+    def schedules(self, period=60):
+        """
+            Gera o agendamento cron dos scrapers. Os scrapers sem minuto definido são distribuídos de forma uniforme
+            ao longo do período, alternando entre os servidores, de forma que scrapers de um mesmo servidor fiquem o
+            mais afastados possível
+        Args:
+            period (int): Período, em minutos, no qual os inícios são distribuídos
+        Returns:
+            schedules (dict): Campos do agendamento cron, indexados pelo nome do scraper
+        """
+        with self.lock:
+            scheduled = [(name, spec) for name, spec in self.specs.items() if spec is not None and spec.schedule]
+
+        hosts = dict()
+        for name, spec in scheduled:
+            hosts.setdefault(spec.host, list()).append(name)
+
+        # Intercala os scrapers dos servidores: primeiro scraper de cada servidor, depois o segundo...
+        order = [name for name in chain.from_iterable(zip_longest(*hosts.values())) if name is not None]
+        specs = dict(scheduled)
+
+        schedules = dict()
+        for slot, name in enumerate(order):
+            schedule = dict(specs[name].schedule)
+            schedule.setdefault("minute", str(slot * period // len(order)))
+            schedules[name] = schedule
+
+        return schedules
+
+    def is_loaded(self, name):
+        """
+            Verifica se o scraper já foi criado
+        Args:
+            name (str): Nome do scraper
+        Returns:
+            (bool): Verdadeiro se o scraper já foi criado
+        """
+        return name in self.instances
+
+
+def load_registry(path, data_path, **common_arguments):
+    """
+        Cria o cadastro de scrapers a partir de um arquivo JSON no formato
+        {"scrapers": [{"name": ..., "entry_point": ..., "host": ..., "schedule": {...}, "polling": {...},
+        "arguments": {...}}]}.
+        Os argumentos terminados em "_path" com caminhos relativos são resolvidos a partir da pasta de dados
+    Args:
+        path (str): Caminho para o arquivo com o cadastro
+        data_path (str): Pasta de dados do projeto
+        **common_arguments: Argumentos repassados para o construtor de todos os scrapers
+    Returns:
+        registry (ScraperRegistry): Cadastro dos scrapers
+    """
+    with open(file=path, mode="r") as f:
+        entries = json.load(f)["scrapers"]
+
+    registry = ScraperRegistry()
+
+    for entry in entries:
+        arguments = dict(common_arguments)
+
+        for key, value in entry.get("arguments", dict()).items():
+            if key.endswith("_path") and not os.path.isabs(value):
+                value = os.path.join(data_path, value)
+
+            arguments[key] = value
+
+        registry.register(
+            name=entry["name"],
+            entry_point=entry["entry_point"],
+            arguments=arguments,
+            host=entry.get("host"),
+            schedule=entry.get("schedule"),
+            polling=entry.get("polling"),
+        )
+
+    return registry
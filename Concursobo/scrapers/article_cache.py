@@ -0,0 +1,142 @@
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+
+class ArticleCache:
+    """
+    Cache em disco do resultado da classificação das notícias, indexado pela URL canônica da notícia. As entradas
+    expiram após um tempo de vida e as menos usadas são descartadas quando o cache atinge o tamanho máximo
+    """
+
+    def __init__(self, cache_path, ttl=14 * 24 * 3600, max_entries=5000):
+        """
+            Inicializa a classe
+        Args:
+            cache_path (str): Caminho para o arquivo do cache
+            ttl (float): Tempo de vida de cada entrada, em segundos
+            max_entries (int): Quantidade máxima de entradas armazenadas
+        """
+        self.cache_path = cache_path
+        self.ttl = ttl
+        self.max_entries = max_entries
+
+        self.hits = 0
+        self.misses = 0
+
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+        self.load()
+
+    @staticmethod
+    def canonical_url(url):
+        """
+            Normaliza a URL para que variações da mesma notícia usem a mesma chave
+        Args:
+            url (str): URL da notícia
+        Returns:
+            (str): URL canônica
+        """
+        parts = urlsplit(url.strip())
+        scheme = parts.scheme.lower()
+        netloc = parts.netloc.lower()
+
+        if (scheme == "http" and netloc.endswith(":80")) or (scheme == "https" and netloc.endswith(":443")):
+            netloc = netloc.rsplit(":", 1)[0]
+
+        path = parts.path.rstrip("/") or "/"
+        query = urlencode(
+            sorted((k, v) for k, v in parse_qsl(parts.query) if not k.lower().startswith("utm_"))
+        )
+
+        return urlunsplit((scheme, netloc, path, query, ""))
+
+    def get(self, url, signature):
+        """
+            Busca o resultado salvo de uma notícia
+        Args:
+            url (str): URL da notícia
+            signature (str): Assinatura das palavras-chave usadas na classificação
+        Returns:
+            (list of str): Palavras-chave encontradas na notícia, ou None se não houver entrada válida no cache
+        """
+        key = self.canonical_url(url)
+
+        with self._lock:
+            entry = self._entries.get(key)
+
+            if entry is None or entry["signature"] != signature or self._expired(entry):
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+
+            return list(entry["keywords"])
+
+    def put(self, url, signature, keywords):
+        """
+            Salva o resultado da classificação de uma notícia
+        Args:
+            url (str): URL da notícia
+            signature (str): Assinatura das palavras-chave usadas na classificação
+            keywords (list of str): Palavras-chave encontradas na notícia
+        """
+        key = self.canonical_url(url)
+
+        with self._lock:
+            self._entries[key] = {
+                "signature": signature,
+                "keywords": list(keywords),
+                "timestamp": time.time(),
+            }
+            self._entries.move_to_end(key)
+
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def _expired(self, entry):
+        return time.time() - entry["timestamp"] > self.ttl
+
+    def load(self):
+        """
+        Carrega o cache do disco, descartando as entradas expiradas
+        """
+        if not os.path.isfile(self.cache_path):
+            return
+
+        with open(file=self.cache_path, mode="r") as f:
+            entries = json.load(f)
+
+        with self._lock:
+            self._entries = OrderedDict(
+                (key, entry) for key, entry in entries.items() if not self._expired(entry)
+            )
+
+    def save(self):
+        """
+        Salva o cache no disco de forma atômica
+        """
+        with self._lock:
+            entries = dict(self._entries)
+
+        tmp_path = self.cache_path + ".tmp"
+        with open(file=tmp_path, mode="w") as f:
+            json.dump(entries, f)
+
+        os.replace(tmp_path, self.cache_path)
+
+    def reset_counters(self):
+        """
+        Zera os contadores de acertos e falhas
+        """
+        with self._lock:
+            self.hits = 0
+            self.misses = 0
+
+    def __len__(self):
+        return len(self._entries)
@@ -0,0 +1,105 @@
+from html.parser import HTMLParser
+
+
+class ArticleBodyParser(HTMLParser):
+    """
+    Extrai o texto do elemento div[itemprop=articleBody] de uma página sem montar a árvore do documento.
+    A leitura pode ser interrompida assim que o elemento é fechado
+    """
+
+    # Assim como no BeautifulSoup, o conteúdo destes elementos não faz parte do texto
+    ignored_tags = {"script", "style", "template"}
+
+    def __init__(self):
+        """
+        Inicializa a classe
+        """
+        super().__init__(convert_charrefs=True)
+
+        self.depth = 0
+        self.ignored_depth = 0
+        self.done = False
+        self._parts = list()
+
+    def handle_starttag(self, tag, attrs):
+        if self.done:
+            return
+
+        if self.depth and tag in self.ignored_tags:
+            self.ignored_depth += 1
+            return
+
+        if tag != "div":
+            return
+
+        if self.depth:
+            self.depth += 1
+        elif ("itemprop", "articleBody") in attrs:
+            self.depth = 1
+
+    def handle_startendtag(self, tag, attrs):
+        # Uma div auto-fechada não altera a profundidade
+        pass
+
+    def handle_endtag(self, tag):
+        if self.ignored_depth and tag in self.ignored_tags:
+            self.ignored_depth -= 1
+        elif self.depth and tag == "div":
+            self.depth -= 1
+            if self.depth == 0:
+                self.done = True
+
+    def handle_data(self, data):
+        if self.depth and not self.ignored_depth:
+            self._parts.append(data)
+
+    @property
+    def found(self):
+        """
+        Indica se o corpo da notícia foi encontrado
+        """
+        return self.done or self.depth > 0
+
+    @property
+    def text(self):
+        """
+        Texto do corpo da notícia
+        """
+        return "".join(self._parts)
+
+
+def extract_article_body(response, chunk_size=8192, drain_limit=65536):
+    """
+        Lê a resposta em partes e retorna o texto do corpo da notícia, parando de processar a página assim que o
+        corpo é fechado. O restante da resposta é descartado, sendo lido apenas se for pequeno para que a conexão
+        possa ser reaproveitada
+    Args:
+        response (Response): Resposta da requisição, feita com stream=True
+        chunk_size (int): Tamanho de cada parte lida da resposta
+        drain_limit (int): Quantidade máxima de caracteres lidos após o fim do corpo da notícia
+    Returns:
+        (str): Texto do corpo da notícia, ou None se ele não for encontrado
+    """
+    if response.encoding is None:
+        response.encoding = "utf-8"
+
+    parser = ArticleBodyParser()
+    chunks = response.iter_content(chunk_size=chunk_size, decode_unicode=True)
+
+    for chunk in chunks:
+        parser.feed(chunk)
+        if parser.done:
+            break
+
+    drained = 0
+    for chunk in chunks:
+        drained += len(chunk)
+        if drained > drain_limit:
+            break
+
+    response.close()
+
+    if not parser.found:
+        return None
+
+    return parser.text
@@ -1,4 +1,52 @@
+import contextlib
+import functools
+import logging
+import re
+import time
 from abc import ABC, abstractmethod
+from collections import Counter
+
+from bs4 import BeautifulSoup
+
+from Concursobo import utils
+from Concursobo.http_client import get_default_client
+from Concursobo.metrics import get_registry
+from Concursobo.scrapers.state_store import open_state_store
+
+
+def cached_view(method):
+    """
+        Armazena as mensagens geradas por um método de visualização do scraper, que são geradas novamente apenas
+        quando o estado do scraper é alterado
+    Args:
+        method (callable): Método do scraper que retorna uma lista de mensagens
+    Returns:
+        (callable): Método com as mensagens armazenadas
+    """
+
+    @functools.wraps(method)
+    def wrapper(self):
+        # Atualiza o estado antes de ler a versão, caso o arquivo tenha sido alterado por outro processo
+        self.state.snapshot()
+        version = self.state.version
+
+        cached = self.view_cache.get(method.__name__)
+        if cached is None or cached[0] != version:
+            with self.phase(name="render"):
+                cached = (version, method(self))
+
+            self.view_cache[method.__name__] = cached
+            self.record_items(kind="rendered", count=len(cached[1]))
+
+        return list(cached[1])
+
+    return wrapper
+
+
+class AcquisitionTimeout(TimeoutError):
+    """
+    Erro lançado quando uma aquisição ultrapassa o tempo máximo definido para ela
+    """
 
 
 class BaseScraper(ABC):
@@ -6,6 +54,240 @@ class BaseScraper(ABC):
     Classe de base para os scrapers implementados no código
     """
 
+    # Trechos da página que mudam a cada acesso e não fazem parte dos dados extraídos, removidos antes do cálculo
+    # da assinatura do conteúdo. Scripts e comentários nunca são lidos pelos scrapers
+    volatile_patterns = [r"<script\b.*?</script>", r"<!--.*?-->"]
+
+    # Campos do estado com listas de registros, armazenados em tabelas próprias pelo backend SQLite
+    record_fields = dict()
+
+    # Campos que identificam um registro entre as aquisições. Um registro com a mesma identificação e conteúdo
+    # diferente é considerado editado: é salvo, mas não é notificado como novo
+    id_fields = None
+
+    def __init__(self, name, database_path, parser=None, http_client=None, config=None):
+        """
+            Inicializa a classe
+        Args:
+            name (str): Nome do scraper
+            database_path (str): Caminho para o arquivo onde estão salvos os dados
+            parser (str): Backend do BeautifulSoup usado pelo scraper ("html.parser", "lxml" ou "html5lib"). Se não
+                for informado, é usado o backend definido no arquivo de configuração
+            http_client (HttpClient): Cliente HTTP usado nas requisições. Se não for informado, é usado o cliente
+                compartilhado do processo
+            config (ProjectConfig): Configuração do projeto. Se não for informada, é usada a configuração
+                compartilhada do processo
+        """
+        self.name = name
+        self.db_path = database_path
+        self.config = config or utils.project_config()
+        self.state = open_state_store(source=name, path=database_path, record_fields=self.record_fields)
+        # Mensagens geradas pelos métodos de visualização, indexadas pelo nome do método
+        self.view_cache = dict()
+        self.parser = utils.get_parser_backend(parser=parser)
+        self.http_client = http_client or get_default_client()
+
+        logging.basicConfig(
+            format="%(asctime)s - %(name)s - %(message)s",
+            level=logging.INFO,
+            datefmt="%d-%m-%Y %H:%M:%S",
+        )
+
+        self.logger = logging.getLogger(name=name)
+
+        # Contadores das requisições feitas pelo scraper
+        self.counters = Counter()
+
+        # Instante (time.monotonic) em que a aquisição em andamento deve ser interrompida
+        self.deadline = None
+
+        self.metrics = get_registry()
+
+        self.volatile_regex = re.compile(
+            "|".join(f"(?:{pattern})" for pattern in self.volatile_patterns), flags=re.IGNORECASE | re.DOTALL
+        )
+
+    def make_soup(self, markup):
+        """
+            Monta a árvore do documento com o backend do scraper
+        Args:
+            markup (str): Conteúdo HTML
+        Returns:
+            (BeautifulSoup): Árvore do documento
+        """
+        return BeautifulSoup(markup=markup, features=self.parser)
+
+    def phase(self, name):
+        """
+            Mede a duração de uma etapa da aquisição (fetch, parse, diff, persist, render) nas métricas do scraper
+        Args:
+            name (str): Nome da etapa
+        Returns:
+            (contextmanager): Bloco cuja duração é medida
+        """
+        return self.metrics.timer("concursobo_phase_seconds", scraper=self.name, phase=name)
+
+    def record_items(self, kind, count):
+        """
+            Contabiliza registros processados nas métricas do scraper
+        Args:
+            kind (str): Tipo dos registros (scraped: extraídos da página, changed: alterados, rendered: mensagens
+                geradas)
+            count (int): Número de registros
+        """
+        self.metrics.increment("concursobo_items_total", count, scraper=self.name, kind=kind)
+
+    @contextlib.contextmanager
+    def acquisition_deadline(self, seconds):
+        """
+            Limita o tempo das aquisições executadas dentro do bloco. O limite é verificado a cada requisição, que
+            lança AcquisitionTimeout quando o tempo se esgota, e o tempo de espera das requisições é reduzido para
+            que todas as tentativas caibam no tempo restante
+        Args:
+            seconds (float): Tempo máximo, em segundos. Se for None, o tempo não é limitado
+        """
+        self.deadline = None if seconds is None else time.monotonic() + seconds
+
+        try:
+            yield
+        finally:
+            self.deadline = None
+
+    def diff_records(self, current, stored):
+        """
+            Compara os registros atuais com os armazenados, pareando os registros editados pelos campos de
+            identificação do scraper
+        Args:
+            current (list of dict): Registros da aquisição atual
+            stored (list of dict): Registros armazenados
+        Returns:
+            (DiffResult): Registros adicionados, removidos e editados
+        """
+        diff = utils.diff_records(list_A=current, list_B=stored, id_fields=self.id_fields)
+
+        if diff.changed:
+            self.logger.info(msg=f"{len(diff.changed)} registros editados, salvos sem notificação")
+
+        return diff
+
+    def fetch(self, url, **kwargs):
+        """
+            Faz uma requisição GET pelo cliente HTTP, contabilizando o tráfego no nome do scraper
+        Args:
+            url (str): URL da requisição
+            **kwargs: Argumentos repassados para a requisição
+        Returns:
+            (Response): Resposta da requisição
+        """
+        if self.deadline is not None:
+            remaining = self.deadline - time.monotonic()
+
+            if remaining <= 0:
+                raise AcquisitionTimeout(f"Tempo máximo da aquisição de {self.name} esgotado")
+
+            # O tempo restante é dividido entre as tentativas da requisição
+            attempt_timeout = remaining / (getattr(self.http_client, "retries", 0) + 1)
+            timeout = kwargs.get("timeout", self.http_client.timeout)
+
+            if isinstance(timeout, tuple):
+                kwargs["timeout"] = tuple(min(value, attempt_timeout) for value in timeout)
+            else:
+                kwargs["timeout"] = min(timeout, attempt_timeout)
+
+        with self.phase(name="fetch"):
+            response = self.http_client.get(url=url, source=self.name, **kwargs)
+
+        if "Content-Length" in response.headers:
+            size = int(response.headers["Content-Length"])
+        else:
+            size = 0 if kwargs.get("stream") else len(response.content)
+
+        self.metrics.increment("concursobo_fetched_bytes_total", size, scraper=self.name)
+
+        return response
+
+    def conditional_get(self, url, validators=None):
+        """
+            Faz uma requisição condicional à página, enviando os validadores (ETag / Last-Modified) da última
+            aquisição. Se a página não foi modificada, o servidor responde com o código 304
+        Args:
+            url (str): URL da página
+            validators (dict): Validadores salvos na última aquisição
+        Returns:
+            webpage (Response): Resposta da requisição
+        """
+        headers = dict()
+        validators = validators or dict()
+
+        if validators.get("etag"):
+            headers["If-None-Match"] = validators["etag"]
+        if validators.get("last_modified"):
+            headers["If-Modified-Since"] = validators["last_modified"]
+
+        webpage = self.fetch(url=url, headers=headers)
+
+        self.counters["requests"] += 1
+        if webpage.status_code == 304:
+            self.counters["not_modified"] += 1
+            self.logger.info(
+                msg=f"Página não modificada ({self.counters['not_modified']} de "
+                f"{self.counters['requests']} requisições respondidas com 304)"
+            )
+
+        return webpage
+
+    def content_fingerprint(self, markup):
+        """
+            Calcula a assinatura do conteúdo da página, ignorando os trechos voláteis
+        Args:
+            markup (str): Conteúdo HTML da página
+        Returns:
+            (str): Assinatura do conteúdo
+        """
+        return utils.content_fingerprint(text=markup, volatile_regex=self.volatile_regex)
+
+    def unchanged_content(self, fingerprint, stored_data):
+        """
+            Verifica se a assinatura do conteúdo é igual à da última aquisição
+        Args:
+            fingerprint (str): Assinatura do conteúdo atual
+            stored_data (dict): Dados armazenados
+        Returns:
+            (bool): Verdadeiro se o conteúdo não foi alterado
+        """
+        if fingerprint != stored_data.get("fingerprint"):
+            return False
+
+        self.counters["same_fingerprint"] += 1
+        self.logger.info(msg="Conteúdo idêntico ao da última aquisição")
+
+        return True
+
+    def refresh_acquisition_date(self, stored_data):
+        """
+            Atualiza a data da aquisição quando a página não foi alterada (resposta 304 ou mesma assinatura), sem
+            processar a página, para que os dados salvos informem a data da última checagem
+        Args:
+            stored_data (dict): Dados armazenados
+        """
+        self.state.replace(
+            state={**stored_data, "acquisition_date": self.config.now().strftime("%d/%m/%Y %H:%M:%S")}
+        )
+
+    @staticmethod
+    def response_validators(webpage):
+        """
+            Retorna os validadores de cache da resposta, para serem enviados na próxima aquisição
+        Args:
+            webpage (Response): Resposta da requisição
+        Returns:
+            (dict): ETag e Last-Modified da resposta
+        """
+        return {
+            "etag": webpage.headers.get("ETag"),
+            "last_modified": webpage.headers.get("Last-Modified"),
+        }
+
     @abstractmethod
     def scrape_page(self):
         """
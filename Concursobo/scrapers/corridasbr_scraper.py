@@ -1,13 +1,8 @@
-import json
-import logging
 import os
 from datetime import datetime
 
-import pytz
-import requests
-from bs4 import BeautifulSoup
-
-from Concursobo.scrapers.base_scraper import BaseScraper
+from Concursobo.scrapers.base_scraper import BaseScraper, cached_view
+from Concursobo.scrapers.state_store import RecordField
 from Concursobo import utils
 from Concursobo.constants import AcquisitionStatus
 
@@ -17,7 +12,13 @@ class CorridasBRScraper(BaseScraper):
         Extrai os dados da página do CorridasBR
     """
 
-    def __init__(self, name, database_path, base_url, table_url, max_distance):
+    record_fields = {"all_races": RecordField(table="races", path=["cities", "races_list"])}
+
+    id_fields = ["url"]
+
+    def __init__(
+        self, name, database_path, base_url, table_url, max_distance, parser=None, http_client=None, config=None
+    ):
         """
             Inicializa a classe
         Args:
@@ -26,22 +27,19 @@ class CorridasBRScraper(BaseScraper):
             base_url (str): URL base para os links da tabela do site CorridasBR
             table_url (str): URL da página do calendário de corridas do site CorridasBR
             max_distance (int): Distância máxima para filtrar as corridas
+            parser (str): Backend do BeautifulSoup usado pelo scraper
+            http_client (HttpClient): Cliente HTTP usado nas requisições
+            config (ProjectConfig): Configuração do projeto
         """
 
-        self.name = name
-        self.db_path = database_path
+        super().__init__(
+            name=name, database_path=database_path, parser=parser, http_client=http_client, config=config
+        )
+
         self.base_url = base_url
         self.table_url = table_url
         self.max_distance = max_distance
 
-        logging.basicConfig(
-            format="%(asctime)s - %(name)s - %(message)s",
-            level=logging.INFO,
-            datefmt="%d-%m-%Y %H:%M:%S",
-        )
-
-        self.logger = logging.getLogger(name=name)
-
     def check_distance(self, race_distances):
         """
             Checa se a distância da corrida é
@@ -118,42 +116,39 @@ class CorridasBRScraper(BaseScraper):
         return grouped_races
 
     @staticmethod
-    def compare_new_with_old(current_data, stored_data):
+    def compare_new_with_old(current_data, stored_data, id_fields=None):
         """
             Compara os dados novos com os antigos e retorna a diferença entre as duas listas de entrada
         Args:
             current_data (list of dict): Dados capturados para serem comparados com os dados antigos
             stored_data (list of dict): Dados armazenados
+            id_fields (list of str): Campos que identificam um registro; registros editados não entram na diferença
         Returns:
             difference (list of dict): Lista com os dados diferentes entre as listas
         """
         difference = list()
 
+        stored_by_month = {s_month["month"]: s_month for s_month in reversed(stored_data)}
+
         for c_data in current_data:
-            query_month = (
-                s_month
-                for s_month in stored_data
-                if s_month["month"] == c_data["month"]
-            )
-            query_month = next(query_month, None)
+            query_month = stored_by_month.get(c_data["month"])
 
             if query_month is not None:
                 month_data = {"month": c_data["month"], "cities": list()}
+                stored_by_city = {
+                    s_city["city"]: s_city for s_city in reversed(query_month["cities"])
+                }
                 # Se há correspondência de mês, cada cidade será visualizada para ver
                 # se existem novas corridas por cidade neste mês
                 for city_races in c_data["cities"]:
-                    query_city = (
-                        s_city
-                        for s_city in query_month["cities"]
-                        if s_city["city"] == city_races["city"]
-                    )
-                    query_city = next(query_city, None)
+                    query_city = stored_by_city.get(city_races["city"])
 
                     if query_city is not None:
-                        races_diff, _ = utils.list_difference(
+                        races_diff = utils.diff_records(
                             list_A=city_races["races_list"],
                             list_B=query_city["races_list"],
-                        )
+                            id_fields=id_fields,
+                        ).added
                         if races_diff:
                             month_data["cities"].append(
                                 {"city": city_races["city"], "races_list": races_diff}
@@ -170,22 +165,15 @@ class CorridasBRScraper(BaseScraper):
 
         return difference
 
-    def scrape_page(self):
+    def extract_data(self, markup):
         """
-            Coleta os dados da página do concurso da Marinha
+            Extrai os dados do conteúdo HTML do calendário de corridas
+        Args:
+            markup (str): Conteúdo HTML da página
         Returns:
-            (AcquisitionStatus): Indica o status da aquisição, se houve sucesso e / ou atualização dos dados
+            (dict): Título da página e lista de corridas filtradas pela distância
         """
-        self.logger.info(msg="Acessando a página...")
-        webpage = requests.get(url=self.table_url)
-
-        if webpage.status_code != 200:
-            self.logger.info(msg="Não foi possível acessar a página")
-            return AcquisitionStatus.ERROR
-
-        self.logger.info(msg="Página acessada, obtendo os dados...")
-
-        soup = BeautifulSoup(markup=webpage.text, features="html.parser")
+        soup = self.make_soup(markup=markup)
 
         tables_soup = soup.find_all(name="table", attrs={"width": "700"})
 
@@ -226,24 +214,54 @@ class CorridasBRScraper(BaseScraper):
 
             races_list.append(race_data)
 
+        return {"title": title, "races": races_list}
+
+    def scrape_page(self):
+        """
+            Coleta os dados da página do concurso da Marinha
+        Returns:
+            (AcquisitionStatus): Indica o status da aquisição, se houve sucesso e / ou atualização dos dados
+        """
+        stored_data = self.state.snapshot()
+
+        self.logger.info(msg="Acessando a página...")
+        webpage = self.conditional_get(url=self.table_url, validators=stored_data.get("validators"))
+
+        if webpage.status_code == 304:
+            self.refresh_acquisition_date(stored_data=stored_data)
+            return AcquisitionStatus.UNCHANGED
+
+        if webpage.status_code != 200:
+            self.logger.info(msg="Não foi possível acessar a página")
+            return AcquisitionStatus.ERROR
+
+        fingerprint = self.content_fingerprint(markup=webpage.text)
+        if self.unchanged_content(fingerprint=fingerprint, stored_data=stored_data):
+            self.refresh_acquisition_date(stored_data=stored_data)
+            return AcquisitionStatus.UNCHANGED
+
+        self.logger.info(msg="Página acessada, obtendo os dados...")
+
+        with self.phase(name="parse"):
+            page_data = self.extract_data(markup=webpage.text)
+        title = page_data["title"]
+        races_list = page_data["races"]
+
         self.logger.info(msg=f"{len(races_list)} corridas capturadas")
+        self.record_items(kind="scraped", count=len(races_list))
 
-        timezone = pytz.timezone(
-            zone=utils.get_config().get(section="timezone", option="PYTZ_TIMEZONE")
-        )
-        current_time = datetime.now(tz=timezone)
+        current_time = self.config.now()
 
         grouped_races = self.group_races(races_list=races_list)
 
-        with open(file=self.db_path, mode="r") as f:
-            stored_data = json.load(f)
-
         output_data = {
             "title": title,
             "url": self.table_url,
             "acquisition_date": current_time.strftime("%d/%m/%Y %H:%M:%S"),
             "all_races": grouped_races,
             "last_update": stored_data["last_update"],
+            "validators": self.response_validators(webpage=webpage),
+            "fingerprint": fingerprint,
         }
 
         self.logger.info(
@@ -252,25 +270,30 @@ class CorridasBRScraper(BaseScraper):
             + "..."
         )
 
-        updated_races = self.compare_new_with_old(
-            current_data=grouped_races, stored_data=stored_data["all_races"]
-        )
+        with self.phase(name="diff"):
+            updated_races = self.compare_new_with_old(
+                current_data=grouped_races, stored_data=stored_data["all_races"], id_fields=self.id_fields
+            )
 
         if len(updated_races) == 0:
             self.logger.info(msg="Nenhuma alteração encontrada")
 
-            with open(file=self.db_path, mode="w") as f:
-                json.dump(output_data, f, indent=4)
+            self.state.replace(state=output_data)
 
             return AcquisitionStatus.UNCHANGED
 
         self.logger.info(msg=f"Alterações encontradas!")
+        self.record_items(
+            kind="changed",
+            count=sum(len(city["races_list"]) for month in updated_races for city in month["cities"]),
+        )
 
-        output_data["last_update"]["date"] = current_time.strftime("%d/%m/%Y %H:%M:%S")
-        output_data["last_update"]["races_added"] = updated_races
+        output_data["last_update"] = {
+            "date": current_time.strftime("%d/%m/%Y %H:%M:%S"),
+            "races_added": updated_races,
+        }
 
-        with open(file=self.db_path, mode="w") as f:
-            json.dump(output_data, f, indent=4)
+        self.state.replace(state=output_data)
 
         return AcquisitionStatus.UPDATED
 
@@ -319,14 +342,14 @@ class CorridasBRScraper(BaseScraper):
 
         return output_message_list
 
+    @cached_view
     def updated_data(self):
         """
             Retorna os dados que foram atualizados
         Returns:
             output_message_list (list of str): Lista com as mensagens de saída
         """
-        with open(file=self.db_path, mode="r") as f:
-            stored_data = json.load(f)
+        stored_data = self.state.snapshot()
 
         output_message_list = list()
 
@@ -341,6 +364,7 @@ class CorridasBRScraper(BaseScraper):
 
         return output_message_list
 
+    @cached_view
     def short_data(self):
         """
             Retorna os dados da página de forma resumida
@@ -348,8 +372,7 @@ class CorridasBRScraper(BaseScraper):
             output_message_list (list of str): Lista com as mensagens de saída
         """
 
-        with open(file=self.db_path, mode="r") as f:
-            stored_data = json.load(f)
+        stored_data = self.state.snapshot()
 
         output_message_list = [
             ("<a href=\"" + stored_data["url"] + "\">" + stored_data["title"] + "</a>")
@@ -365,14 +388,14 @@ class CorridasBRScraper(BaseScraper):
 
         return output_message_list
 
+    @cached_view
     def complete_data(self):
         """
             Retorna todos os dados salvos da página
         Returns:
             output_message_list (list of str): Lista com as mensagens de saída
         """
-        with open(file=self.db_path, mode="r") as f:
-            stored_data = json.load(f)
+        stored_data = self.state.snapshot()
 
         output_message_list = [
             ("<a href=\"" + stored_data["url"] + "\">" + stored_data["title"] + "</a>")
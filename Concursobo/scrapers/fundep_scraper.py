@@ -1,15 +1,9 @@
-import json
-import logging
 import os
-from datetime import datetime
-
-import pytz
-import requests
-from bs4 import BeautifulSoup
 
 from Concursobo import utils
 from Concursobo.constants import AcquisitionStatus
-from Concursobo.scrapers.base_scraper import BaseScraper
+from Concursobo.scrapers.base_scraper import BaseScraper, cached_view
+from Concursobo.scrapers.state_store import RecordField
 
 
 class FundepScraper(BaseScraper):
@@ -17,40 +11,38 @@ class FundepScraper(BaseScraper):
     Extrai os dados da página de vagas da FUNDEP
     """
 
-    def __init__(self, name, database_path):
+    volatile_patterns = BaseScraper.volatile_patterns + [r"_wpnonce=[0-9a-f]+", r'name="_wpnonce" value="[^"]*"']
+
+    record_fields = {"all_jobs": RecordField(table="jobs", path=[])}
+
+    id_fields = ["url"]
+
+    def __init__(self, name, database_path, parser=None, http_client=None, config=None):
         """
             Inicializa a classe
         Args:
             name (str): Nome do scraper
             database_path (str): Caminho para o arquivo onde estão salvos os dados
+            parser (str): Backend do BeautifulSoup usado pelo scraper
+            http_client (HttpClient): Cliente HTTP usado nas requisições
+            config (ProjectConfig): Configuração do projeto
         """
 
-        self.name = name
-        self.db_path = database_path
-        self.url = "https://www.fundep.ufmg.br/vagas/vagas-projetos/"
-
-        logging.basicConfig(
-            format="%(asctime)s - %(name)s - %(message)s",
-            level=logging.INFO,
-            datefmt="%d-%m-%Y %H:%M:%S",
+        super().__init__(
+            name=name, database_path=database_path, parser=parser, http_client=http_client, config=config
         )
 
-        self.logger = logging.getLogger(name=name)
+        self.url = "https://www.fundep.ufmg.br/vagas/vagas-projetos/"
 
-    def scrape_page(self):
+    def extract_data(self, markup):
         """
-        Coleta os dados da página da Fundep
+            Extrai os dados do conteúdo HTML da página de vagas
+        Args:
+            markup (str): Conteúdo HTML da página
+        Returns:
+            (dict): Lista de vagas
         """
-        self.logger.info(msg="Acessando a página...")
-        webpage = requests.get(url=self.url)
-
-        if webpage.status_code != 200:
-            self.logger.info(msg="Não foi possível acessar a página")
-            return AcquisitionStatus.ERROR
-
-        self.logger.info(msg="Página acessada, obtendo os dados...")
-
-        soup = BeautifulSoup(markup=webpage.text, features="html.parser")
+        soup = self.make_soup(markup=markup)
 
         jobs_info = soup.find_all("li", {"class": "column column-block"})
 
@@ -73,21 +65,47 @@ class FundepScraper(BaseScraper):
             }
             all_jobs.append(job_data)
 
-        self.logger.info(msg=f"{len(all_jobs)} vagas capturadas")
+        return {"all_jobs": all_jobs}
 
-        timezone = pytz.timezone(
-            zone=utils.get_config().get(section="timezone", option="PYTZ_TIMEZONE")
-        )
-        current_time = datetime.now(tz=timezone)
+    def scrape_page(self):
+        """
+        Coleta os dados da página da Fundep
+        """
+        stored_data = self.state.snapshot()
+
+        self.logger.info(msg="Acessando a página...")
+        webpage = self.conditional_get(url=self.url, validators=stored_data.get("validators"))
 
-        with open(file=self.db_path, mode="r") as f:
-            stored_data = json.load(f)
+        if webpage.status_code == 304:
+            self.refresh_acquisition_date(stored_data=stored_data)
+            return AcquisitionStatus.UNCHANGED
+
+        if webpage.status_code != 200:
+            self.logger.info(msg="Não foi possível acessar a página")
+            return AcquisitionStatus.ERROR
+
+        fingerprint = self.content_fingerprint(markup=webpage.text)
+        if self.unchanged_content(fingerprint=fingerprint, stored_data=stored_data):
+            self.refresh_acquisition_date(stored_data=stored_data)
+            return AcquisitionStatus.UNCHANGED
+
+        self.logger.info(msg="Página acessada, obtendo os dados...")
+
+        with self.phase(name="parse"):
+            all_jobs = self.extract_data(markup=webpage.text)["all_jobs"]
+
+        self.logger.info(msg=f"{len(all_jobs)} vagas capturadas")
+        self.record_items(kind="scraped", count=len(all_jobs))
+
+        current_time = self.config.now()
 
         output_data = {
             "url": self.url,
             "acquisition_date": current_time.strftime("%d/%m/%Y %H:%M:%S"),
             "all_jobs": all_jobs,
             "last_update": stored_data["last_update"],
+            "validators": self.response_validators(webpage=webpage),
+            "fingerprint": fingerprint,
         }
 
         self.logger.info(
@@ -96,15 +114,14 @@ class FundepScraper(BaseScraper):
             + "..."
         )
 
-        update_added, update_removed = utils.list_difference(
-            list_A=all_jobs, list_B=stored_data["all_jobs"]
-        )
+        with self.phase(name="diff"):
+            diff = self.diff_records(current=all_jobs, stored=stored_data["all_jobs"])
+            update_added, update_removed = diff.added, diff.removed
 
         if len(update_added) == 0 and len(update_removed) == 0:
             self.logger.info(msg="Nenhuma alteração encontrada")
 
-            with open(file=self.db_path, mode="w") as f:
-                json.dump(output_data, f, indent=4)
+            self.state.replace(state=output_data)
 
             return AcquisitionStatus.UNCHANGED
 
@@ -114,6 +131,8 @@ class FundepScraper(BaseScraper):
         if update_added:
             self.logger.info(msg=f"{len(update_removed)} vagas removidas!")
 
+        self.record_items(kind="changed", count=len(update_added) + len(update_removed))
+
         last_update = {
             "date": current_time.strftime("%d/%m/%Y %H:%M:%S"),
             "jobs_added": update_added,
@@ -122,8 +141,7 @@ class FundepScraper(BaseScraper):
 
         output_data["last_update"] = last_update
 
-        with open(file=self.db_path, mode="w") as f:
-            json.dump(output_data, f, indent=4)
+        self.state.replace(state=output_data)
 
         return AcquisitionStatus.UPDATED
 
@@ -149,14 +167,14 @@ class FundepScraper(BaseScraper):
 
         return output_message_list
 
+    @cached_view
     def updated_data(self):
         """
             Retorna os dados que foram atualizados
         Returns:
             output_message_list (list of str): Lista com a mensagem de saída
         """
-        with open(file=self.db_path, mode="r") as f:
-            stored_data = json.load(f)
+        stored_data = self.state.snapshot()
 
         output_message_list = [
             "<a href=\"" + stored_data["url"] + "\">" + self.name + ":</a>"
@@ -190,14 +208,14 @@ class FundepScraper(BaseScraper):
 
         return output_message_list
 
+    @cached_view
     def short_data(self):
         """
             Retorna os dados da página de forma resumida
         Returns:
             output_message_list (list of str): Lista com a mensagem de saída
         """
-        with open(file=self.db_path, mode="r") as f:
-            stored_data = json.load(f)
+        stored_data = self.state.snapshot()
 
         output_message_list = [
             (
@@ -222,14 +240,14 @@ class FundepScraper(BaseScraper):
 
         return output_message_list
 
+    @cached_view
     def complete_data(self):
         """
            Retorna todos os dados salvos da página
         Returns:
             output_message_list (list of str): Lista com a mensagem de saída
         """
-        with open(file=self.db_path, mode="r") as f:
-            stored_data = json.load(f)
+        stored_data = self.state.snapshot()
 
         output_message_list = [
             (
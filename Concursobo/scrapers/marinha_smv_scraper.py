@@ -1,14 +1,8 @@
-import json
-import logging
 import os
 import re
-from datetime import datetime
 
-import pytz
-import requests
-from bs4 import BeautifulSoup
-
-from Concursobo.scrapers.base_scraper import BaseScraper
+from Concursobo.scrapers.base_scraper import BaseScraper, cached_view
+from Concursobo.scrapers.state_store import RecordField
 from Concursobo import utils
 from Concursobo.constants import AcquisitionStatus
 
@@ -18,42 +12,41 @@ class MarinhaSMVScraper(BaseScraper):
         Extrai os dados da página do concurso SMV do 1o distrito da Marinha do Brasil
     """
 
-    def __init__(self, name, database_path):
+    volatile_patterns = BaseScraper.volatile_patterns + [
+        r'name="form_build_id" value="[^"]*"',
+        r'name="form_token" value="[^"]*"',
+    ]
+
+    record_fields = {"messages": RecordField(table="messages", path=[])}
+
+    id_fields = ["url"]
+
+    def __init__(self, name, database_path, parser=None, http_client=None, config=None):
         """
             Inicializa a classe
         Args:
             name (str): Nome do scraper
             database_path (str): Caminho para o arquivo onde estão salvos os dados
+            parser (str): Backend do BeautifulSoup usado pelo scraper
+            http_client (HttpClient): Cliente HTTP usado nas requisições
+            config (ProjectConfig): Configuração do projeto
         """
 
-        self.name = name
-        self.db_path = database_path
-        self.url = "https://www.marinha.mil.br/com1dn/smv/smv-sup-areas-av-conv"
-
-        logging.basicConfig(
-            format="%(asctime)s - %(name)s - %(message)s",
-            level=logging.INFO,
-            datefmt="%d-%m-%Y %H:%M:%S",
+        super().__init__(
+            name=name, database_path=database_path, parser=parser, http_client=http_client, config=config
         )
 
-        self.logger = logging.getLogger(name=name)
+        self.url = "https://www.marinha.mil.br/com1dn/smv/smv-sup-areas-av-conv"
 
-    def scrape_page(self):
+    def extract_data(self, markup):
         """
-            Coleta os dados da página do concurso da Marinha
+            Extrai os dados do conteúdo HTML da página do concurso
+        Args:
+            markup (str): Conteúdo HTML da página
         Returns:
-            (AcquisitionStatus): Indica o status da aquisição, se houve sucesso e / ou atualização dos dados
+            (dict): Título da página e lista de mensagens
         """
-        self.logger.info(msg="Acessando a página...")
-        webpage = requests.get(url=self.url)
-
-        if webpage.status_code != 200:
-            self.logger.info(msg="Não foi possível acessar a página")
-            return AcquisitionStatus.ERROR
-
-        self.logger.info(msg="Página acessada, obtendo os dados...")
-
-        soup = BeautifulSoup(markup=webpage.text, features="html.parser")
+        soup = self.make_soup(markup=markup)
 
         # Título da página
         title = soup.find_all(name="h1", class_="page-header")[0].text
@@ -78,15 +71,43 @@ class MarinhaSMVScraper(BaseScraper):
                 }
                 message_list.append(msg_data)
 
-        self.logger.info(msg=f"{len(message_list)} mensagens capturadas")
+        return {"title": title, "messages": message_list}
 
-        timezone = pytz.timezone(
-            zone=utils.get_config().get(section="timezone", option="PYTZ_TIMEZONE")
-        )
-        current_time = datetime.now(tz=timezone)
+    def scrape_page(self):
+        """
+            Coleta os dados da página do concurso da Marinha
+        Returns:
+            (AcquisitionStatus): Indica o status da aquisição, se houve sucesso e / ou atualização dos dados
+        """
+        stored_data = self.state.snapshot()
 
-        with open(file=self.db_path, mode="r") as f:
-            stored_data = json.load(f)
+        self.logger.info(msg="Acessando a página...")
+        webpage = self.conditional_get(url=self.url, validators=stored_data.get("validators"))
+
+        if webpage.status_code == 304:
+            self.refresh_acquisition_date(stored_data=stored_data)
+            return AcquisitionStatus.UNCHANGED
+
+        if webpage.status_code != 200:
+            self.logger.info(msg="Não foi possível acessar a página")
+            return AcquisitionStatus.ERROR
+
+        fingerprint = self.content_fingerprint(markup=webpage.text)
+        if self.unchanged_content(fingerprint=fingerprint, stored_data=stored_data):
+            self.refresh_acquisition_date(stored_data=stored_data)
+            return AcquisitionStatus.UNCHANGED
+
+        self.logger.info(msg="Página acessada, obtendo os dados...")
+
+        with self.phase(name="parse"):
+            page_data = self.extract_data(markup=webpage.text)
+        title = page_data["title"]
+        message_list = page_data["messages"]
+
+        self.logger.info(msg=f"{len(message_list)} mensagens capturadas")
+        self.record_items(kind="scraped", count=len(message_list))
+
+        current_time = self.config.now()
 
         output_data = {
             "title": title,
@@ -94,6 +115,8 @@ class MarinhaSMVScraper(BaseScraper):
             "acquisition_date": current_time.strftime("%d/%m/%Y %H:%M:%S"),
             "messages": message_list,
             "last_update": stored_data["last_update"],
+            "validators": self.response_validators(webpage=webpage),
+            "fingerprint": fingerprint,
             "last_update_date": stored_data["last_update_date"],
         }
 
@@ -103,25 +126,23 @@ class MarinhaSMVScraper(BaseScraper):
             + "..."
         )
 
-        updated_messages, _ = utils.list_difference(
-            list_A=message_list, list_B=stored_data["messages"]
-        )
+        with self.phase(name="diff"):
+            updated_messages = self.diff_records(current=message_list, stored=stored_data["messages"]).added
 
         if len(updated_messages) == 0:
             self.logger.info(msg="Nenhuma alteração encontrada")
 
-            with open(file=self.db_path, mode="w") as f:
-                json.dump(output_data, f, indent=4)
+            self.state.replace(state=output_data)
 
             return AcquisitionStatus.UNCHANGED
 
         self.logger.info(msg=f"{len(updated_messages)} alterações encontradas!")
+        self.record_items(kind="changed", count=len(updated_messages))
 
         output_data["last_update"] = updated_messages
         output_data["last_update_date"] = current_time.strftime("%d/%m/%Y %H:%M:%S")
 
-        with open(file=self.db_path, mode="w") as f:
-            json.dump(output_data, f, indent=4)
+        self.state.replace(state=output_data)
 
         return AcquisitionStatus.UPDATED
 
@@ -148,14 +169,14 @@ class MarinhaSMVScraper(BaseScraper):
 
         return output_message_list
 
+    @cached_view
     def updated_data(self):
         """
             Retorna os dados que foram atualizados
         Returns:
             output_message_list (list of str): Lista com as mensagens de saída
         """
-        with open(file=self.db_path, mode="r") as f:
-            stored_data = json.load(f)
+        stored_data = self.state.snapshot()
 
         output_message_list = list()
 
@@ -185,6 +206,7 @@ class MarinhaSMVScraper(BaseScraper):
 
         return output_message_list
 
+    @cached_view
     def short_data(self):
         """
             Retorna os dados da página de forma resumida
@@ -192,8 +214,7 @@ class MarinhaSMVScraper(BaseScraper):
             output_message_list (list of str): Lista com as mensagens de saída
         """
 
-        with open(file=self.db_path, mode="r") as f:
-            stored_data = json.load(f)
+        stored_data = self.state.snapshot()
 
         output_message_list = [
             ("<a href=\"" + stored_data["url"] + "\">" + stored_data["title"] + "</a>")
@@ -209,14 +230,14 @@ class MarinhaSMVScraper(BaseScraper):
 
         return output_message_list
 
+    @cached_view
     def complete_data(self):
         """
             Retorna todos os dados salvos da página
         Returns:
             output_message_list (list of str): Lista com as mensagens de saída
         """
-        with open(file=self.db_path, mode="r") as f:
-            stored_data = json.load(f)
+        stored_data = self.state.snapshot()
 
         output_message_list = [
             ("<a href=\"" + stored_data["url"] + "\">" + stored_data["title"] + "</a>")
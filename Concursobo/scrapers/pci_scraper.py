@@ -1,16 +1,16 @@
-import json
-import logging
+import hashlib
 import os
 import re
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 
-import pytz
-import requests
-from bs4 import BeautifulSoup
-from unidecode import unidecode
-
-from Concursobo.scrapers.base_scraper import BaseScraper
+from Concursobo.scrapers.article_cache import ArticleCache
+from Concursobo.scrapers.article_parser import extract_article_body
+from Concursobo.scrapers.base_scraper import BaseScraper, cached_view
+from Concursobo.scrapers.state_store import RecordField
 from Concursobo import utils
+from Concursobo.keyword_matcher import KeywordMatcher
 from Concursobo.constants import AcquisitionStatus
 
 
@@ -19,7 +19,26 @@ class PCIScraper(BaseScraper):
     Extrai os dados da página de notícias do site PCI concursos
     """
 
-    def __init__(self, name, database_path, store_size, keywords, ignore_words):
+    record_fields = {"all_jobs": RecordField(table="news", path=["jobs_list"])}
+
+    id_fields = ["url"]
+
+    def __init__(
+        self,
+        name,
+        database_path,
+        store_size,
+        keywords,
+        ignore_words,
+        max_workers=8,
+        cache_path=None,
+        incremental=True,
+        max_pages=20,
+        time_budget=600,
+        parser=None,
+        http_client=None,
+        config=None,
+    ):
         """
             Inicializa a classe
         Args:
@@ -28,56 +47,106 @@ class PCIScraper(BaseScraper):
             store_size (int): Quantidade de dias armazenados no banco de dados
             keywords (list of str): Lista de palavras que a notícia deve conter pelo menos uma
             ignore_words (list of str): Lista de palavras para descartar uma notícia
+            max_workers (int): Número máximo de notícias acessadas simultaneamente
+            cache_path (str): Caminho para o arquivo de cache das notícias já classificadas. Se não for informado,
+                todas as notícias são acessadas em cada aquisição
+            incremental (bool): Se verdadeiro, a busca termina ao chegar em dias já registrados por completo
+            max_pages (int): Quantidade máxima de páginas de notícias acessadas em uma aquisição
+            time_budget (float): Tempo máximo em segundos para percorrer as páginas de notícias
+            parser (str): Backend do BeautifulSoup usado pelo scraper
+            http_client (HttpClient): Cliente HTTP usado nas requisições
+            config (ProjectConfig): Configuração do projeto
         """
 
-        self.name = name
-        self.db_path = database_path
+        super().__init__(
+            name=name, database_path=database_path, parser=parser, http_client=http_client, config=config
+        )
+
         self.store_size = store_size
         self.url = "https://www.pciconcursos.com.br/noticias/"
         self.keywords = keywords
         self.ignore_words = ignore_words
-
-        logging.basicConfig(
-            format="%(asctime)s - %(name)s - %(message)s",
-            level=logging.INFO,
-            datefmt="%d-%m-%Y %H:%M:%S",
-        )
-
-        self.logger = logging.getLogger(name=name)
-
-    def job_scrape(self, job, saved_jobs, session):
+        self.keyword_matcher = KeywordMatcher(keywords=keywords)
+        self.ignore_matcher = KeywordMatcher(keywords=ignore_words)
+        self.max_workers = max(1, max_workers)
+        self.incremental = incremental
+        self.max_pages = max_pages
+        self.time_budget = time_budget
+
+        self.cache = ArticleCache(cache_path=cache_path) if cache_path else None
+        self.keywords_signature = hashlib.sha1(
+            "|".join(sorted(keyword.lower() for keyword in keywords)).encode("utf-8")
+        ).hexdigest()
+
+    def job_scrape(self, job):
         """
-            Raises
+            Acessa a notícia e verifica se ela contém alguma das palavras-chave
         Args:
-            job (Tag): Tag do BeautifulSoup descrevendo um concurso encontrado
-            saved_jobs (list of dict): Lista que contém os concursos salvos
-            session (Session): Sessão de acesso ao site
+            job (dict): Título e URL da notícia, conforme extraídos da página de notícias
+        Returns:
+            job_data (dict): Dados da notícia ou None caso ela seja descartada
         """
-        job_website = session.get(job.attrs["href"]).text
+        if self.ignore_matcher.contains_any(text=job["title"]):
+            return None
 
-        job_title = unidecode(job["title"])
-        for word in self.ignore_words:
-            if job_title.lower().find(word.lower()) != -1:
-                return
+        matched_keywords = None
+        if self.cache is not None:
+            matched_keywords = self.cache.get(url=job["url"], signature=self.keywords_signature)
 
-        soup = BeautifulSoup(job_website, "html.parser")
-        page_data = soup.find_all("div", {"itemprop": "articleBody"})
+        if matched_keywords is None:
+            matched_keywords = self.match_article(url=job["url"])
 
-        article = unidecode(page_data[0].text.lower())
+            if matched_keywords is None:
+                return None
 
-        matched_keywords = list()
-        for keyword in self.keywords:
-            if article.find(keyword.lower()) != -1:
-                matched_keywords.append(keyword)
+            if self.cache is not None:
+                self.cache.put(
+                    url=job["url"], signature=self.keywords_signature, keywords=matched_keywords
+                )
 
         if matched_keywords or len(self.keywords) == 0:
-            job_data = {
-                "title": job.attrs["title"],
-                "url": job.attrs["href"],
+            return {
+                "title": job["title"],
+                "url": job["url"],
                 "keywords": matched_keywords,
             }
 
-            saved_jobs.append(job_data)
+        return None
+
+    def match_article(self, url):
+        """
+            Acessa a notícia e retorna as palavras-chave encontradas no seu conteúdo
+        Args:
+            url (str): URL da notícia
+        Returns:
+            matched_keywords (list of str): Palavras-chave encontradas na notícia, ou None caso não seja
+                possível ler o corpo da notícia
+        """
+        response = self.fetch(url=url, stream=True)
+
+        # O corpo da notícia é lido aos poucos e a leitura termina ao encontrar o fim do artigo, então o tempo de
+        # download do corpo entra na etapa de extração
+        with self.phase(name="parse"):
+            article = extract_article_body(response=response)
+
+        if article is None:
+            self.logger.info(msg=f"Corpo da notícia não encontrado em {url}")
+            return None
+
+        return self.keyword_matcher.search(text=article)
+
+    def scrape_jobs(self, jobs, executor):
+        """
+            Processa as notícias de um dia em paralelo, mantendo a ordem em que aparecem na página
+        Args:
+            jobs (list of dict): Notícias do dia
+            executor (ThreadPoolExecutor): Executor que acessa as notícias
+        Returns:
+            saved_jobs (list of dict): Notícias que contém alguma das palavras-chave
+        """
+        results = executor.map(lambda job: self.job_scrape(job=job), jobs)
+
+        return [job_data for job_data in results if job_data is not None]
 
     @staticmethod
     def process_saved_data(saved_data):
@@ -98,28 +167,27 @@ class PCIScraper(BaseScraper):
         return output_data
 
     @staticmethod
-    def compare_new_with_old(current_data, stored_data):
+    def compare_new_with_old(current_data, stored_data, id_fields=None):
         """
             Compara os dados novos com os antigos e retorna a diferença entre as duas listas de entrada
         Args:
             current_data (list of dict): Dados capturados para serem comparados com os dados antigos
             stored_data (list of dict): Dados armazenados
+            id_fields (list of str): Campos que identificam um registro; registros editados não entram na diferença
         Returns:
             difference (list of dict): Lista com os dados diferentes entre as listas
         """
         difference = list()
+        stored_by_date = {s_data["date"]: s_data for s_data in reversed(stored_data)}
 
         for c_data in current_data:
-            query_date = (
-                s_data for s_data in stored_data if s_data["date"] == c_data["date"]
-            )
-            query_match = next(query_date, None)
+            query_match = stored_by_date.get(c_data["date"])
 
             if query_match is not None:
                 # Se há correspondência de datas, será capturada a diferença entre elas
-                jobs_diff, _ = utils.list_difference(
-                    list_A=c_data["jobs_list"], list_B=query_match["jobs_list"]
-                )
+                jobs_diff = utils.diff_records(
+                    list_A=c_data["jobs_list"], list_B=query_match["jobs_list"], id_fields=id_fields
+                ).added
                 if jobs_diff:
                     difference.append({"date": c_data["date"], "jobs_list": jobs_diff})
             else:
@@ -129,81 +197,204 @@ class PCIScraper(BaseScraper):
 
         return difference
 
-    def scrape_page(self):
+    def extract_listing(self, markup):
         """
-            Coleta os dados da página de notícias do PCI Concursos
+            Extrai as notícias de uma página de notícias, agrupadas por dia
+        Args:
+            markup (str): Conteúdo HTML da página de notícias
         Returns:
-            (AcquisitionStatus): Indica o status da aquisição, se houve sucesso e / ou atualização dos dados
+            listing (list of tuple): Lista de tuplas (data, notícias), onde a data é um datetime e as notícias
+                são dicionários com o título e a URL, na ordem em que aparecem na página
+        """
+        soup = self.make_soup(markup=markup)
+
+        page_data = soup.find_all(["h2", "ul"])
+
+        listing = list()
+        news_date = None
+        for data in page_data:
+            date_match = re.match(
+                pattern=r"[0-9]{2}/[0-9]{2}/[0-9]{2}", string=data.text
+            )
+
+            if "principal" in data.attrs.get("class", list()) and date_match:
+                news_date = datetime.strptime(date_match.string, "%d/%m/%Y")
+
+            if "noticias" in data.attrs.get("class", list()) and (
+                news_date is not None
+            ):
+                jobs = [
+                    {"title": job.attrs["title"], "url": job.attrs["href"]}
+                    for job in data.find_all("a")
+                ]
+                listing.append((news_date, jobs))
+
+        return listing
+
+    def recorded_days(self, stored_jobs):
         """
-        session = requests.Session()
+            Retorna os dias já registrados por completo na aquisição anterior. O dia mais recente não é considerado
+            completo, pois ainda podem ser publicadas notícias nele
+        Args:
+            stored_jobs (list of dict): Lista "all_jobs" dos dados armazenados
+        Returns:
+            recorded_days (dict): Dicionário com a data (datetime) como chave e a lista de notícias como valor,
+                ordenado da data mais recente para a mais antiga
+        """
+        if not self.incremental or not stored_jobs:
+            return dict()
 
+        stored_days = {
+            datetime.strptime(day["date"], "%d/%m/%Y"): day["jobs_list"] for day in stored_jobs
+        }
+        newest_day = max(stored_days)
+
+        return {
+            date: stored_days[date]
+            for date in sorted(stored_days, reverse=True)
+            if date < newest_day
+        }
+
+    def scrape_news(self, executor, stored_jobs, first_page):
+        """
+            Percorre as páginas de notícias até obter a quantidade de dias definida em store_size. No modo
+            incremental, a busca termina ao chegar em dias que já estão registrados por completo nos dados salvos
+        Args:
+            executor (ThreadPoolExecutor): Executor que acessa as notícias
+            stored_jobs (list of dict): Lista "all_jobs" dos dados armazenados
+            first_page (Response): Resposta da primeira página de notícias, já acessada
+        Returns:
+            saved_data (dict): Notícias encontradas organizadas por dia, ou None caso não seja possível
+                acessar alguma página
+        """
+        recorded_days = self.recorded_days(stored_jobs=stored_jobs)
+        reused_days = set()
+
+        start_time = time.monotonic()
         current_page = 1
         saved_data = dict()
 
         while len(saved_data) < self.store_size:
-            self.logger.info(msg=f"Acessando a página {current_page}...")
-            webpage = session.get(url=self.url + str(current_page))
+            if current_page > self.max_pages:
+                self.logger.info(msg=f"Limite de {self.max_pages} páginas atingido")
+                break
+
+            if time.monotonic() - start_time > self.time_budget:
+                self.logger.info(msg=f"Limite de {self.time_budget} segundos atingido")
+                break
+
+            if current_page == 1:
+                webpage = first_page
+            else:
+                self.logger.info(msg=f"Acessando a página {current_page}...")
+                webpage = self.fetch(url=self.url + str(current_page))
+
             if webpage.status_code != 200:
                 self.logger.info(msg="Não foi possível acessar a página")
-                return AcquisitionStatus.ERROR
+                return None
 
             self.logger.info(msg=f"Página {current_page} acessada, obtendo os dados...")
 
-            soup = BeautifulSoup(markup=webpage.text, features="html.parser")
+            with self.phase(name="parse"):
+                listing = self.extract_listing(markup=webpage.text)
 
-            page_data = soup.find_all(["h2", "ul"])
+            for news_date, jobs in listing:
+                if news_date in reused_days:
+                    continue
 
-            news_date = None
-            saved_jobs = list()
-            for data in page_data:
-                date_match = re.match(
-                    pattern=r"[0-9]{2}/[0-9]{2}/[0-9]{2}", string=data.text
-                )
-
-                if "principal" in data.attrs.get("class", list()) and date_match:
-                    news_date = datetime.strptime(date_match.string, "%d/%m/%Y")
-                    saved_jobs = list()
-
-                if "noticias" in data.attrs.get("class", list()) and (
-                    news_date is not None
-                ):
-                    jobs = data.find_all("a")
-                    self.logger.info(
-                        f"Processando o dia {str(news_date.date())} ("
-                        + str(len(jobs))
-                        + " notícias)..."
-                    )
-                    for job in jobs:
-                        self.job_scrape(job=job, saved_jobs=saved_jobs, session=session)
-
-                    if saved_jobs:
-                        self.logger.info(f"{len(saved_jobs)} notícias encontradas!")
-
-                    if news_date in saved_data:
-                        saved_data[news_date].extend(saved_jobs)
-                    else:
-                        saved_data[news_date] = saved_jobs
+                if news_date in recorded_days:
+                    # A partir deste dia as notícias já foram registradas, então os dias restantes são
+                    # preenchidos com os dados salvos
+                    self.logger.info(f"Dia {str(news_date.date())} já registrado, reaproveitando os dados salvos")
+                    for date, jobs_list in recorded_days.items():
+                        if len(saved_data) >= self.store_size:
+                            break
+                        if date <= news_date and date not in saved_data:
+                            saved_data[date] = list(jobs_list)
+                            reused_days.add(date)
 
                     if len(saved_data) >= self.store_size:
                         break
 
+                    continue
+
+                self.logger.info(
+                    f"Processando o dia {str(news_date.date())} ("
+                    + str(len(jobs))
+                    + " notícias)..."
+                )
+                saved_jobs = self.scrape_jobs(jobs=jobs, executor=executor)
+
+                if saved_jobs:
+                    self.logger.info(f"{len(saved_jobs)} notícias encontradas!")
+
+                if news_date in saved_data:
+                    saved_data[news_date].extend(saved_jobs)
+                else:
+                    saved_data[news_date] = saved_jobs
+
+                if len(saved_data) >= self.store_size:
+                    break
+
             current_page += 1
 
-        timezone = pytz.timezone(
-            zone=utils.get_config().get(section="timezone", option="PYTZ_TIMEZONE")
-        )
-        current_time = datetime.now(tz=timezone)
+        if not saved_data:
+            return None
+
+        return dict(sorted(saved_data.items(), reverse=True)[:self.store_size])
+
+    def scrape_page(self):
+        """
+            Coleta os dados da página de notícias do PCI Concursos
+        Returns:
+            (AcquisitionStatus): Indica o status da aquisição, se houve sucesso e / ou atualização dos dados
+        """
+        stored_data = self.state.snapshot()
+
+        self.logger.info(msg="Acessando a página 1...")
+        first_page = self.fetch(url=self.url + "1")
 
-        with open(file=self.db_path, mode="r") as f:
-            stored_data = json.load(f)
+        if first_page.status_code != 200:
+            self.logger.info(msg="Não foi possível acessar a página")
+            return AcquisitionStatus.ERROR
+
+        # Se a primeira página não mudou, nenhuma notícia nova foi publicada
+        fingerprint = self.content_fingerprint(markup=first_page.text)
+        if self.unchanged_content(fingerprint=fingerprint, stored_data=stored_data):
+            self.refresh_acquisition_date(stored_data=stored_data)
+            return AcquisitionStatus.UNCHANGED
+
+        if self.cache is not None:
+            self.cache.reset_counters()
+
+        try:
+            with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                saved_data = self.scrape_news(
+                    executor=executor,
+                    stored_jobs=stored_data["all_jobs"],
+                    first_page=first_page,
+                )
+        finally:
+            if self.cache is not None:
+                self.cache.save()
+                self.logger.info(
+                    msg=f"Cache de notícias: {self.cache.hits} acertos, {self.cache.misses} falhas"
+                )
+
+        if saved_data is None:
+            return AcquisitionStatus.ERROR
+
+        current_time = self.config.now()
 
         all_jobs = self.process_saved_data(saved_data=saved_data)
+        self.record_items(kind="scraped", count=sum(len(day["jobs_list"]) for day in all_jobs))
 
         output_data = {
             "url": self.url,
             "acquisition_date": current_time.strftime("%d/%m/%Y %H:%M:%S"),
             "all_jobs": all_jobs,
             "last_update": stored_data["last_update"],
+            "fingerprint": fingerprint,
         }
 
         self.logger.info(
@@ -212,27 +403,27 @@ class PCIScraper(BaseScraper):
             + "..."
         )
 
-        updated_data = self.compare_new_with_old(
-            current_data=all_jobs, stored_data=stored_data["all_jobs"]
-        )
+        with self.phase(name="diff"):
+            updated_data = self.compare_new_with_old(
+                current_data=all_jobs, stored_data=stored_data["all_jobs"], id_fields=self.id_fields
+            )
 
         if len(updated_data) == 0:
             self.logger.info(msg="Nenhuma alteração encontrada")
 
-            with open(file=self.db_path, mode="w") as f:
-                json.dump(output_data, f, indent=4)
+            self.state.replace(state=output_data)
 
             return AcquisitionStatus.UNCHANGED
 
         self.logger.info(msg=f"{len(updated_data)} alterações encontradas!")
+        self.record_items(kind="changed", count=sum(len(day["jobs_list"]) for day in updated_data))
 
         output_data["last_update"] = {
             "date": current_time.strftime("%d/%m/%Y %H:%M:%S"),
             "updated_data": updated_data,
         }
 
-        with open(file=self.db_path, mode="w") as f:
-            json.dump(output_data, f, indent=4)
+        self.state.replace(state=output_data)
 
         return AcquisitionStatus.UPDATED
 
@@ -264,14 +455,14 @@ class PCIScraper(BaseScraper):
 
         return output_message_list
 
+    @cached_view
     def updated_data(self):
         """
             Retorna os dados que foram atualizados
         Returns:
             output_message_list (list of str): Lista com as mensagens de saída
         """
-        with open(file=self.db_path, mode="r") as f:
-            stored_data = json.load(f)
+        stored_data = self.state.snapshot()
 
         output_message_list = list()
 
@@ -303,6 +494,7 @@ class PCIScraper(BaseScraper):
 
         return output_message_list
 
+    @cached_view
     def short_data(self):
         """
             Retorna os dados da página de forma resumida
@@ -310,8 +502,7 @@ class PCIScraper(BaseScraper):
             output_message_list (list of str): Lista com as mensagens de saída
         """
 
-        with open(file=self.db_path, mode="r") as f:
-            stored_data = json.load(f)
+        stored_data = self.state.snapshot()
 
         output_message_list = [
             ('<a href="' + stored_data["url"] + '">' + self.name + "</a>")
@@ -331,14 +522,14 @@ class PCIScraper(BaseScraper):
 
         return output_message_list
 
+    @cached_view
     def complete_data(self):
         """
             Retorna todos os dados salvos da página
         Returns:
             output_message_list (list of str): Lista com as mensagens de saída
         """
-        with open(file=self.db_path, mode="r") as f:
-            stored_data = json.load(f)
+        stored_data = self.state.snapshot()
 
         output_message_list = [
             ('<a href="' + stored_data["url"] + '">' + self.name + "</a>")
@@ -392,6 +583,7 @@ if __name__ == "__main__":
         store_size=store_size,
         keywords=keywords,
         ignore_words=ignore_words,
+        max_workers=8,
     )
 
     status = pci.scrape_page()
@@ -0,0 +1,418 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+from collections import Counter
+from datetime import datetime
+
+from Concursobo.scrapers.state_store import StateStore
+
+# Conexões com cada banco, compartilhadas pelos scrapers do processo
+_connections = dict()
+_connections_lock = threading.Lock()
+
+
+def connect(db_path):
+    """
+        Retorna a conexão do processo com o banco, criando as tabelas de aquisições se necessário
+    Args:
+        db_path (str): Caminho para o banco de dados
+    Returns:
+        connection (Connection): Conexão com o banco
+        lock (Lock): Trava que protege o uso da conexão
+    """
+    with _connections_lock:
+        if db_path not in _connections:
+            connection = sqlite3.connect(database=db_path, timeout=30, check_same_thread=False)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA temp_store=MEMORY")
+            connection.execute(
+                """
+                CREATE TABLE IF NOT EXISTS acquisitions (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    source TEXT NOT NULL,
+                    acquired_at TEXT NOT NULL,
+                    document TEXT NOT NULL,
+                    fields TEXT NOT NULL,
+                    added INTEGER NOT NULL,
+                    removed INTEGER NOT NULL
+                )
+                """
+            )
+            connection.execute(
+                "CREATE INDEX IF NOT EXISTS acquisitions_source ON acquisitions (source, id)"
+            )
+            connection.commit()
+
+            _connections[db_path] = (connection, threading.Lock())
+
+        return _connections[db_path]
+
+
+def flatten_records(items, path, grouping=()):
+    """
+        Percorre as listas aninhadas de um campo do estado até os registros
+    Args:
+        items (list): Lista do campo do estado
+        path (list of str): Chaves das listas aninhadas até os registros
+        grouping (tuple of dict): Grupos percorridos até a lista atual
+    Returns:
+        (generator): Tuplas (grupos, registro). Grupos sem registros geram uma tupla com o registro None, para que
+            sejam preservados
+    """
+    if not path:
+        for item in items:
+            yield grouping, item
+        return
+
+    key = path[0]
+
+    for group in items:
+        context = {k: v for k, v in group.items() if k != key}
+        children = group.get(key) or list()
+
+        if children:
+            yield from flatten_records(items=children, path=path[1:], grouping=grouping + (context,))
+        else:
+            yield grouping + (context,), None
+
+
+def unflatten_records(rows, path):
+    """
+        Reconstrói as listas aninhadas de um campo do estado a partir dos registros, na ordem em que foram gravados
+    Args:
+        rows (list of tuple): Tuplas (grupos, registro)
+        path (list of str): Chaves das listas aninhadas até os registros
+    Returns:
+        result (list): Lista do campo do estado
+    """
+    result = list()
+
+    for grouping, record in rows:
+        container = result
+
+        for group, key in zip(grouping, path):
+            last = container[-1] if container else None
+
+            if last is None or {k: v for k, v in last.items() if k != key} != group:
+                last = dict(group)
+                last[key] = list()
+                container.append(last)
+
+            container = last[key]
+
+        if record is not None:
+            container.append(record)
+
+    return result
+
+
+def assign_positions(keys, old_positions):
+    """
+        Define a posição de cada registro alterando o mínimo possível as posições já gravadas. Registros que mantêm
+        a ordem relativa preservam a posição e os novos recebem posições intermediárias
+    Args:
+        keys (list of str): Chaves dos registros na ordem atual
+        old_positions (dict): Posições gravadas, indexadas pela chave do registro
+    Returns:
+        positions (list of float): Posição de cada registro
+    """
+    positions = [None] * len(keys)
+    last_kept = None
+
+    for index, key in enumerate(keys):
+        position = old_positions.get(key)
+
+        if position is not None and (last_kept is None or position > last_kept):
+            positions[index] = position
+            last_kept = position
+
+    index = 0
+    while index < len(keys):
+        if positions[index] is not None:
+            index += 1
+            continue
+
+        end = index
+        while end < len(keys) and positions[end] is None:
+            end += 1
+
+        low = positions[index - 1] if index > 0 else None
+        high = positions[end] if end < len(keys) else None
+        count = end - index
+
+        for offset in range(count):
+            if low is None and high is None:
+                positions[index + offset] = float(offset)
+            elif low is None:
+                positions[index + offset] = high - count + offset
+            elif high is None:
+                positions[index + offset] = low + offset + 1
+            else:
+                positions[index + offset] = low + (high - low) * (offset + 1) / (count + 1)
+
+        index = end
+
+    return positions
+
+
+class SQLiteStateStore(StateStore):
+    """
+    Estado de um scraper armazenado em um banco SQLite. Os registros de cada campo ficam em uma tabela por tipo de
+    registro, indexada por fonte, data e URL, e o restante do estado fica na última linha do scraper na tabela de
+    aquisições, cujo ID marca a aquisição em que cada registro foi visto pela primeira vez ou removido.
+    As gravações inserem apenas os registros novos e marcam os removidos, de forma que o histórico dos registros é
+    preservado e a escrita é proporcional à alteração, não ao tamanho dos dados
+    """
+
+    def __init__(self, db_path, source, record_fields, json_path=None):
+        """
+            Inicializa a classe
+        Args:
+            db_path (str): Caminho para o banco de dados
+            source (str): Nome do scraper, que identifica os seus registros no banco
+            record_fields (dict): Campos do estado com listas de registros (RecordField), indexados pelo nome
+            json_path (str): Arquivo JSON do scraper, migrado para o banco se o scraper ainda não tiver aquisições
+        """
+        super().__init__(source=source)
+
+        self.db_path = db_path
+        self.record_fields = record_fields
+        self.json_path = json_path
+
+        self.connection, self.db_lock = connect(db_path=db_path)
+        self._positions = {field: dict() for field in record_fields}
+        self._last_acquisition = None
+        self._data_version = None
+
+        with self.db_lock, self.connection:
+            for table in {record_field.table for record_field in record_fields.values()}:
+                self.create_table(table=table)
+
+    def create_table(self, table):
+        """
+            Cria a tabela de um tipo de registro
+        Args:
+            table (str): Nome da tabela
+        """
+        self.connection.execute(
+            f"""
+            CREATE TABLE IF NOT EXISTS {table} (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                source TEXT NOT NULL,
+                field TEXT NOT NULL,
+                record_key TEXT NOT NULL,
+                position REAL NOT NULL,
+                grouping TEXT NOT NULL,
+                date TEXT,
+                url TEXT,
+                data TEXT,
+                first_seen INTEGER NOT NULL,
+                removed_in INTEGER
+            )
+            """
+        )
+        self.connection.execute(
+            f"CREATE UNIQUE INDEX IF NOT EXISTS {table}_current ON {table} (source, field, record_key) "
+            "WHERE removed_in IS NULL"
+        )
+        self.connection.execute(f"CREATE INDEX IF NOT EXISTS {table}_date ON {table} (source, date)")
+        self.connection.execute(f"CREATE INDEX IF NOT EXISTS {table}_url ON {table} (url)")
+
+    def latest_acquisition(self):
+        """
+            Retorna a última aquisição do scraper gravada no banco
+        Returns:
+            (tuple): ID, documento e campos da aquisição, ou None se não houver aquisições
+        """
+        return self.connection.execute(
+            "SELECT id, document, fields FROM acquisitions WHERE source = ? ORDER BY id DESC LIMIT 1",
+            (self.source,),
+        ).fetchone()
+
+    def _read(self):
+        with self.db_lock:
+            acquisition = self.latest_acquisition()
+
+        if acquisition is None:
+            return self.migrate_json()
+
+        acquisition_id, document, fields = acquisition
+        state = json.loads(document)
+
+        with self.db_lock:
+            for field in json.loads(fields):
+                record_field = self.record_fields[field]
+                rows = self.connection.execute(
+                    f"SELECT record_key, position, grouping, data FROM {record_field.table} "
+                    "WHERE source = ? AND field = ? AND removed_in IS NULL ORDER BY position",
+                    (self.source, field),
+                ).fetchall()
+
+                self._positions[field] = {record_key: position for record_key, position, _, _ in rows}
+                state[field] = unflatten_records(
+                    rows=[
+                        (json.loads(grouping), json.loads(data) if data is not None else None)
+                        for _, _, grouping, data in rows
+                    ],
+                    path=record_field.path,
+                )
+
+            self._last_acquisition = acquisition_id
+            self._data_version = self.connection.execute("PRAGMA data_version").fetchone()[0]
+
+        return state
+
+    def migrate_json(self):
+        """
+            Migra o arquivo JSON do scraper para o banco, como a primeira aquisição
+        Returns:
+            state (dict): Estado migrado
+        """
+        if self.json_path is None or not os.path.isfile(self.json_path):
+            raise Exception(f"Não há dados de {self.source} no banco {self.db_path}")
+
+        with open(file=self.json_path, mode="r") as f:
+            state = json.load(f)
+
+        self._persist(state=state)
+
+        return state
+
+    @staticmethod
+    def row_values(grouping, record):
+        """
+            Retorna a data e a URL de um registro, usadas nos índices da tabela
+        Args:
+            grouping (tuple of dict): Grupos do registro
+            record (dict): Registro
+        Returns:
+            date (str): Data do registro ou do grupo mais interno que possui uma data
+            url (str): URL do registro
+        """
+        date = None
+        url = None
+
+        if isinstance(record, dict):
+            date = record.get("date")
+            url = record.get("url")
+
+        for group in reversed(grouping):
+            if date is not None:
+                break
+            date = group.get("date") or group.get("month")
+
+        return date, url
+
+    def _persist(self, state):
+        document = {key: value for key, value in state.items() if key not in self.record_fields}
+        fields = [field for field in self.record_fields if field in state]
+        acquired_at = datetime.now().isoformat(timespec="seconds")
+
+        with self.db_lock, self.connection:
+            cursor = self.connection.execute(
+                "INSERT INTO acquisitions (source, acquired_at, document, fields, added, removed) "
+                "VALUES (?, ?, ?, ?, 0, 0)",
+                (self.source, acquired_at, json.dumps(document), json.dumps(fields)),
+            )
+            acquisition_id = cursor.lastrowid
+            added = 0
+            removed = 0
+
+            for field in fields:
+                field_added, field_removed = self.persist_field(
+                    field=field, items=state[field], acquisition_id=acquisition_id
+                )
+                added += field_added
+                removed += field_removed
+
+            self.connection.execute(
+                "UPDATE acquisitions SET added = ?, removed = ? WHERE id = ?",
+                (added, removed, acquisition_id),
+            )
+            # Apenas a última aquisição é lida. Os IDs não são reutilizados (AUTOINCREMENT), então as
+            # referências dos registros às aquisições removidas continuam ordenadas
+            self.connection.execute(
+                "DELETE FROM acquisitions WHERE source = ? AND id < ?", (self.source, acquisition_id)
+            )
+
+            self._last_acquisition = acquisition_id
+            self._data_version = self.connection.execute("PRAGMA data_version").fetchone()[0]
+
+    def persist_field(self, field, items, acquisition_id):
+        """
+            Grava os registros de um campo por meio de consultas de conjunto contra os registros atuais
+        Args:
+            field (str): Nome do campo no estado
+            items (list): Lista do campo do estado
+            acquisition_id (int): ID da aquisição
+        Returns:
+            added (int): Número de registros inseridos
+            removed (int): Número de registros removidos
+        """
+        table = self.record_fields[field].table
+        rows = list(flatten_records(items=items, path=self.record_fields[field].path))
+
+        # A chave usa o conteúdo exato do registro, sem normalização, para que qualquer alteração gere um novo
+        # registro. Registros repetidos no mesmo grupo recebem um sufixo com a ocorrência
+        occurrences = Counter()
+        keys = list()
+        for grouping, record in rows:
+            content = json.dumps([grouping, record], sort_keys=True, ensure_ascii=False)
+            key = hashlib.blake2b(content.encode("utf-8"), digest_size=16).hexdigest()
+            occurrences[key] += 1
+            keys.append(f"{key}#{occurrences[key]}")
+
+        positions = assign_positions(keys=keys, old_positions=self._positions[field])
+
+        self.connection.execute(
+            "CREATE TEMP TABLE IF NOT EXISTS incoming (record_key TEXT PRIMARY KEY, position REAL, grouping TEXT, "
+            "date TEXT, url TEXT, data TEXT)"
+        )
+        self.connection.execute("DELETE FROM incoming")
+        self.connection.executemany(
+            "INSERT INTO incoming VALUES (?, ?, ?, ?, ?, ?)",
+            [
+                (key, position, json.dumps(grouping), *self.row_values(grouping=grouping, record=record),
+                 json.dumps(record) if record is not None else None)
+                for key, position, (grouping, record) in zip(keys, positions, rows)
+            ],
+        )
+
+        removed = self.connection.execute(
+            f"UPDATE {table} SET removed_in = ? WHERE source = ? AND field = ? AND removed_in IS NULL "
+            "AND record_key NOT IN (SELECT record_key FROM incoming)",
+            (acquisition_id, self.source, field),
+        ).rowcount
+        self.connection.execute(
+            f"UPDATE {table} SET position = (SELECT position FROM incoming WHERE record_key = {table}.record_key) "
+            "WHERE source = ? AND field = ? AND removed_in IS NULL AND position != "
+            f"(SELECT position FROM incoming WHERE record_key = {table}.record_key)",
+            (self.source, field),
+        )
+        added = self.connection.execute(
+            f"INSERT INTO {table} (source, field, record_key, position, grouping, date, url, data, first_seen) "
+            "SELECT ?, ?, record_key, position, grouping, date, url, data, ? FROM incoming "
+            f"WHERE record_key NOT IN (SELECT record_key FROM {table} "
+            "WHERE source = ? AND field = ? AND removed_in IS NULL)",
+            (self.source, field, acquisition_id, self.source, field),
+        ).rowcount
+
+        self._positions[field] = dict(zip(keys, positions))
+
+        return added, removed
+
+    def _changed_externally(self):
+        with self.db_lock:
+            data_version = self.connection.execute("PRAGMA data_version").fetchone()[0]
+
+            if data_version == self._data_version:
+                return False
+
+            self._data_version = data_version
+            acquisition = self.connection.execute(
+                "SELECT MAX(id) FROM acquisitions WHERE source = ?", (self.source,)
+            ).fetchone()
+
+        return acquisition[0] != self._last_acquisition
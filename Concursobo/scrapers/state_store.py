@@ -0,0 +1,243 @@
+import contextlib
+import json
+import os
+import threading
+from abc import ABC, abstractmethod
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+from Concursobo import utils
+from Concursobo.metrics import get_registry
+
+# Thread única que grava os estados no disco, compartilhada por todos os scrapers do processo. As gravações pendentes
+# são concluídas quando o interpretador é encerrado
+_writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="state-writer")
+
+# Campo do estado que contém uma lista de registros, armazenado em uma tabela própria pelo backend SQLite.
+# table: nome da tabela; path: chaves das listas aninhadas até os registros (vazio se a lista já contém os registros)
+RecordField = namedtuple("RecordField", ["table", "path"])
+
+STORAGE_BACKENDS = ["json", "sqlite"]
+
+
+class StateStore(ABC):
+    """
+    Estado de um scraper mantido em memória. Cada alteração substitui o snapshot inteiro (copy-on-write), de forma
+    que os leitores nunca veem um estado parcialmente alterado. A gravação é feita em segundo plano e apenas quando
+    o estado muda. Alterações feitas por outro processo são recarregadas
+    """
+
+    def __init__(self, source=None):
+        """
+            Inicializa a classe
+        Args:
+            source (str): Nome do scraper, usado nas métricas das gravações
+        """
+        self.source = source
+        self.version = 0
+
+        self._snapshot = None
+        # Estado a ser gravado, que difere do snapshot enquanto as gravações estão adiadas
+        self._pending = None
+        self._deferred = False
+        self._write_scheduled = False
+        self._last_write = None
+        self._lock = threading.Lock()
+
+    @abstractmethod
+    def _read(self):
+        """
+            Lê o estado armazenado
+        Returns:
+            (dict): Estado do scraper
+        """
+        pass
+
+    @abstractmethod
+    def _persist(self, state):
+        """
+            Grava o estado
+        Args:
+            state (dict): Estado do scraper
+        """
+        pass
+
+    @abstractmethod
+    def _changed_externally(self):
+        """
+            Verifica se o estado armazenado foi alterado por outro processo
+        Returns:
+            (bool): Verdadeiro se o estado deve ser recarregado
+        """
+        pass
+
+    def snapshot(self):
+        """
+            Retorna o estado atual. O dicionário retornado é compartilhado e não deve ser alterado
+        Returns:
+            (dict): Estado do scraper
+        """
+        with self._lock:
+            if self._snapshot is None or (not self._writing() and self._changed_externally()):
+                self._snapshot = self._read()
+                self.version += 1
+
+            return self._snapshot
+
+    def replace(self, state):
+        """
+            Substitui o estado atual e agenda a gravação, exceto dentro de deferred_write. Se o estado for igual ao
+            atual, nada é feito
+        Args:
+            state (dict): Novo estado do scraper. Não deve ser alterado após a chamada
+        Returns:
+            (bool): Verdadeiro se o estado foi alterado
+        """
+        with self._lock:
+            if state == self._snapshot:
+                return False
+
+            self._snapshot = state
+            self.version += 1
+
+            if not self._deferred:
+                self._schedule_write()
+
+        return True
+
+    @contextlib.contextmanager
+    def deferred_write(self):
+        """
+            Adia a gravação das alterações feitas dentro do bloco para o seu término. As alterações ficam
+            visíveis em memória, mas só chegam ao disco depois que o bloco termina sem erros, o que permite
+            registrar as consequências de uma alteração (por exemplo, as mensagens na caixa de saída) antes de
+            gravá-la. Se o bloco lançar uma exceção, o estado anterior é restaurado e nada é gravado
+        """
+        with self._lock:
+            previous = self._snapshot
+            self._deferred = True
+
+        try:
+            yield
+        except BaseException:
+            with self._lock:
+                self._deferred = False
+                if self._snapshot is not previous:
+                    self._snapshot = previous
+                    self.version += 1
+            raise
+
+        with self._lock:
+            self._deferred = False
+            if self._snapshot is not previous:
+                self._schedule_write()
+
+    def _schedule_write(self):
+        # Chamado com self._lock adquirido
+        self._pending = self._snapshot
+
+        if not self._write_scheduled:
+            self._write_scheduled = True
+            self._last_write = _writer.submit(self._write)
+
+    def _write(self):
+        with self._lock:
+            state = self._pending
+            # Alterações feitas durante a gravação agendam uma nova gravação
+            self._write_scheduled = False
+
+        with get_registry().timer("concursobo_phase_seconds", scraper=self.source, phase="persist"):
+            self._persist(state=state)
+
+    def _writing(self):
+        return self._last_write is not None and not self._last_write.done()
+
+    def flush(self):
+        """
+        Aguarda a gravação pendente do estado
+        """
+        with self._lock:
+            last_write = self._last_write
+
+        if last_write is not None:
+            last_write.result()
+
+
+class JsonStateStore(StateStore):
+    """
+    Estado de um scraper armazenado em um arquivo JSON, regravado de forma atômica a cada alteração
+    """
+
+    def __init__(self, path, source=None):
+        """
+            Inicializa a classe
+        Args:
+            path (str): Caminho para o arquivo JSON com o estado
+            source (str): Nome do scraper, usado nas métricas das gravações
+        """
+        super().__init__(source=source)
+
+        self.path = path
+        self._file_signature = None
+
+    def _stat_signature(self):
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+
+        return stat.st_mtime_ns, stat.st_size
+
+    def _read(self):
+        with open(file=self.path, mode="r") as f:
+            state = json.load(f)
+
+        self._file_signature = self._stat_signature()
+
+        return state
+
+    def _persist(self, state):
+        tmp_path = self.path + ".tmp"
+        with open(file=tmp_path, mode="w") as f:
+            json.dump(state, f, indent=4)
+
+        os.replace(tmp_path, self.path)
+
+        self._file_signature = self._stat_signature()
+
+    def _changed_externally(self):
+        return self._stat_signature() != self._file_signature
+
+
+def open_state_store(source, path, record_fields=None, backend=None):
+    """
+        Cria o armazenamento do estado de um scraper com o backend escolhido
+    Args:
+        source (str): Nome do scraper
+        path (str): Caminho para o arquivo JSON do scraper. No backend SQLite, é usado para migrar os dados antigos
+        record_fields (dict): Campos do estado com listas de registros (RecordField), indexados pelo nome do campo
+        backend (str): Backend de armazenamento ("json" ou "sqlite"). Se não for informado, é usado o backend
+            definido no arquivo de configuração
+    Returns:
+        (StateStore): Armazenamento do estado
+    """
+    config = utils.get_config()
+
+    if backend is None:
+        backend = config.get(section="storage", option="BACKEND", fallback="json")
+
+    if backend not in STORAGE_BACKENDS:
+        raise Exception(f"Backend {backend} não suportado, utilize um entre {', '.join(STORAGE_BACKENDS)}")
+
+    if backend == "json":
+        return JsonStateStore(path=path, source=source)
+
+    from Concursobo.scrapers.sqlite_store import SQLiteStateStore
+
+    db_path = os.path.join(
+        utils.get_data_path(), config.get(section="storage", option="DATABASE", fallback="concursobo.db")
+    )
+
+    return SQLiteStateStore(
+        db_path=db_path, source=source, record_fields=record_fields or dict(), json_path=path
+    )
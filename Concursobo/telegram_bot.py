@@ -2,12 +2,21 @@ import re
 import logging
 import time
 import utils
+from contextlib import nullcontext
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
 import telegram.ext as tgm
 from telegram import Bot, InlineKeyboardButton, InlineKeyboardMarkup, ParseMode
-
+from telegram.utils.request import Request
+
+from acquisition_executor import AcquisitionExecutor, AcquisitionLane, AcquisitionPriority
+from broadcast import BroadcastEngine
+from contacts import ContactRegistry
+from metrics import MetricsRegistry
+from scraper_lock import ScraperLock
+from scraper_registry import ScraperRegistry
+from outbox import Outbox
 from constants import BotMessages, AcquisitionStatus
-from tinydb import TinyDB, Query
 
 
 class TelegramBot:
@@ -15,13 +24,44 @@ class TelegramBot:
     Base do bot para o Telegram
     """
 
-    def __init__(self, token: str, scraper_list: list, contacts_path: str):
+    def __init__(
+        self,
+        token: str,
+        scraper_registry: ScraperRegistry,
+        contacts_path: str,
+        outbox_path: str,
+        run_all_workers: int = 4,
+        interactive_workers: int = 2,
+        scheduled_workers: int = 1,
+        broadcast_workers: int = 32,
+        change_history=None,
+        lock_dir: str = None,
+        time_budget: float = None,
+        metrics=None,
+        remote_metrics=None,
+    ):
         """
             Inicialiação da classe
         Args:
             token (str): Token para acessar o bot.
-            scraper_list (list of BaseScraper): Lista contendo os scrapers utilizados no bot
+            scraper_registry (ScraperRegistry): Cadastro dos scrapers utilizados no bot, criados no primeiro uso
             contacts_path (str): Caminho para o arquivo com a lista de contatos do bot
+            outbox_path (str): Caminho para o banco de dados da caixa de saída de mensagens
+            run_all_workers (int): Número máximo de scrapers executados simultaneamente ao atualizar todos
+            interactive_workers (int): Número de aquisições pedidas pelos usuários executadas simultaneamente
+            scheduled_workers (int): Número de checagens agendadas executadas simultaneamente. Com zero, o processo
+                não executa checagens agendadas
+            broadcast_workers (int): Número de envios simultâneos para a lista de contatos
+            change_history (ChangeHistory): Histórico onde as aquisições concluídas são registradas, usado pelo
+                agendamento adaptativo. Se não for informado, as aquisições não são registradas
+            lock_dir (str): Pasta dos arquivos de trava que impedem aquisições simultâneas de um scraper entre
+                processos. Se não for informada, as aquisições são exclusivas apenas dentro do processo
+            time_budget (float): Tempo máximo, em segundos, de uma aquisição. Se não for informado, o tempo não é
+                limitado
+            metrics (MetricsRegistry): Métricas onde são registrados a duração e o status das aquisições e dos
+                envios, resumidas pelo comando /metricas. Deve ser a mesma instância usada pelos scrapers
+            remote_metrics (list of str): Endereços do /metrics de outros processos do bot, como o das checagens
+                agendadas, somados às métricas deste processo no comando /metricas
         """
 
         logging.basicConfig(
@@ -36,15 +76,28 @@ class TelegramBot:
 
         self.updater = tgm.Updater(token=token, use_context=True)
         self.dispatcher = self.updater.dispatcher
-        self.messenger_bot = Bot(token=token)
-
-        self.scrapers = dict()
-        self.contacts_list = TinyDB(contacts_path)
+        self.messenger_bot = Bot(token=token, request=Request(con_pool_size=broadcast_workers))
+        self.broadcast_engine = BroadcastEngine(bot=self.messenger_bot, max_workers=broadcast_workers)
+        self.outbox = Outbox(db_path=outbox_path, broadcast_engine=self.broadcast_engine)
+
+        self.scrapers = scraper_registry
+        self.lock_dir = lock_dir
+        self.time_budget = time_budget
+        self.scraper_locks = {
+            scraper_name: ScraperLock(scraper_name=scraper_name, lock_dir=lock_dir)
+            for scraper_name in scraper_registry
+        }
+        self.run_all_workers = run_all_workers
+        self.acquisition_executor = AcquisitionExecutor(
+            interactive_workers=interactive_workers, scheduled_workers=scheduled_workers
+        )
+        self.contacts_list = ContactRegistry(path=contacts_path)
+        self.change_history = change_history
+        self.metrics = metrics
+        self.remote_metrics = remote_metrics or list()
 
         self.setup_handlers()
 
-        self.add_scrapers(scraper_list=scraper_list)
-
     def add_scrapers(self, scraper_list):
         """
             Adiciona um scraper no bot
@@ -54,7 +107,8 @@ class TelegramBot:
 
         for scraper in scraper_list:
             self.logger.info(msg=f"Adicionando scraper \"{scraper.name}\" no bot")
-            self.scrapers[scraper.name] = scraper
+            self.scrapers.add(scraper=scraper)
+            self.scraper_locks[scraper.name] = ScraperLock(scraper_name=scraper.name, lock_dir=self.lock_dir)
 
     def setup_handlers(self):
         """
@@ -91,6 +145,10 @@ class TelegramBot:
         self.dispatcher.add_handler(
             tgm.CommandHandler(command="atualizar_tudo", callback=self.update_all)
         )
+        # Métricas
+        self.dispatcher.add_handler(
+            tgm.CommandHandler(command="metricas", callback=self.metrics_handler)
+        )
         # Comandos concurso
         self.dispatcher.add_handler(
             tgm.CallbackQueryHandler(callback=self.button_actions)
@@ -159,16 +217,13 @@ class TelegramBot:
 
         chat_id = update.message.chat_id
 
-        find_contacts = Query()
-
-        if self.contacts_list.contains(find_contacts.chat_id == chat_id):
+        if self.contacts_list.add(chat_id=chat_id):
             update.message.reply_text(
-                text=BotMessages.already_subscribed, parse_mode=ParseMode.HTML
+                text=BotMessages.subscription_success, parse_mode=ParseMode.HTML
             )
         else:
-            self.contacts_list.insert({"chat_id": chat_id})
             update.message.reply_text(
-                text=BotMessages.subscription_success, parse_mode=ParseMode.HTML
+                text=BotMessages.already_subscribed, parse_mode=ParseMode.HTML
             )
 
     def unsubscribe_handler(self, update, context):
@@ -180,11 +235,7 @@ class TelegramBot:
         """
         chat_id = update.message.chat_id
 
-        find_contacts = Query()
-
-        if self.contacts_list.contains(find_contacts.chat_id == chat_id):
-            contact = self.contacts_list.get(find_contacts.chat_id == chat_id)
-            self.contacts_list.remove(doc_ids=[contact.doc_id])
+        if self.contacts_list.remove(chat_id=chat_id):
             update.message.reply_text(
                 text=BotMessages.unsubscription_success, parse_mode=ParseMode.HTML
             )
@@ -214,6 +265,106 @@ class TelegramBot:
             "Concursos cadastrados no bot:", reply_markup=reply_markup
         )
 
+    def metrics_handler(self, update, context):
+        """
+            Retorna um resumo das métricas das aquisições e dos envios de cada scraper
+        Args:
+            update (Update): Objeto com os dados do chat e do usuário.
+            context (CallbackContext): Objeto de contexto.
+        """
+        summary, unavailable = self.metrics_summary()
+        message_list = list()
+
+        for scraper_name, scraper_metrics in summary.items():
+            if not scraper_name:
+                continue
+
+            counters = scraper_metrics["counters"]
+            lines = [f"<b>{scraper_name}</b>"]
+
+            statuses = [
+                f"{int(counters[AcquisitionStatus.name(status).lower()])} {label}"
+                for status, label in [
+                    (AcquisitionStatus.UPDATED, "com atualização"),
+                    (AcquisitionStatus.UNCHANGED, "sem alteração"),
+                    (AcquisitionStatus.ERROR, "com erro"),
+                    (AcquisitionStatus.SKIPPED, "descartadas"),
+                ]
+                if AcquisitionStatus.name(status).lower() in counters
+            ]
+            if statuses:
+                lines.append("Aquisições: " + ", ".join(statuses))
+
+            for phase, phase_metrics in scraper_metrics["phases"].items():
+                lines.append(
+                    f"{phase}: {phase_metrics['count']}× média {phase_metrics['mean']:.3f} s, "
+                    f"p95 ≤ {phase_metrics['p95']:g} s"
+                )
+
+            items = [
+                f"{int(counters[kind])} {label}"
+                for kind, label in [
+                    ("scraped", "extraídos"),
+                    ("changed", "alterados"),
+                    ("rendered", "mensagens geradas"),
+                    ("sent", "mensagens enviadas"),
+                ]
+                if kind in counters
+            ]
+            if items:
+                lines.append("Registros: " + ", ".join(items))
+
+            if "bytes" in counters:
+                lines.append(f"Recebido: {counters['bytes'] / 1024:.1f} KiB")
+
+            message_list.append("\r\n".join(lines))
+
+        if not message_list:
+            message_list = [BotMessages.no_metrics]
+
+        if unavailable:
+            message_list.append(BotMessages.remote_metrics_unavailable)
+
+        self.return_messages(
+            chat_id=self.get_chat_id(update=update, context=context), message_list=message_list
+        )
+
+    def metrics_summary(self):
+        """
+            Resume as métricas deste processo somadas às dos processos em remote_metrics
+        Returns:
+            summary (dict): Resumo das métricas por scraper, como em MetricsRegistry.summary
+            unavailable (list of str): Endereços cujas métricas não puderam ser lidas
+        """
+        registry = MetricsRegistry()
+        unavailable = list()
+
+        if self.metrics is not None:
+            registry.merge(other=self.metrics)
+
+        for url in self.remote_metrics:
+            try:
+                registry.merge(other=MetricsRegistry.fetch(url=url))
+            except Exception as error:
+                self.logger.warning(msg=f"Não foi possível ler as métricas de {url}: {error}")
+                unavailable.append(url)
+
+        return registry.summary(), unavailable
+
+    def measure(self, phase, scraper_name):
+        """
+            Mede a duração de uma etapa nas métricas do bot, se houver
+        Args:
+            phase (str): Nome da etapa
+            scraper_name (str): Nome do scraper
+        Returns:
+            (contextmanager): Bloco cuja duração é medida
+        """
+        if self.metrics is None:
+            return nullcontext()
+
+        return self.metrics.timer("concursobo_phase_seconds", scraper=scraper_name, phase=phase)
+
     @staticmethod
     def force_acquisition(scraper):
         """
@@ -226,6 +377,12 @@ class TelegramBot:
         """
         scraper_status = scraper.scrape_page()
 
+        traffic = scraper.http_client.stats(source=scraper.name)
+        logging.getLogger(name=scraper.name).info(
+            msg=f"Tráfego acumulado: {traffic['requests']} requisições, {traffic['bytes'] / 1024:.1f} KiB, "
+            f"{traffic['elapsed']:.2f} s"
+        )
+
         if scraper_status == AcquisitionStatus.ERROR:
             output_message_list = [
                 f"Não foi possível fazer a aquisição para {scraper.name}"
@@ -237,28 +394,183 @@ class TelegramBot:
 
         return output_message_list, scraper_status
 
+    def timed_acquisition(self, scraper_name, wait=True, broadcast=False):
+        """
+            Força a aquisição de um scraper, medindo o tempo de execução. Erros na aquisição são registrados
+            no log e retornados como AcquisitionStatus.ERROR, para não interromper os demais scrapers. Um mesmo
+            scraper não é executado simultaneamente pelas filas interativa e agendada nem por outro processo, e a
+            aquisição é interrompida ao ultrapassar o tempo máximo
+        Args:
+            scraper_name (str): Nome do scraper cadastrado no Concursobô
+            wait (bool): Aguarda o término de uma aquisição do scraper já em andamento. Caso contrário, a
+                aquisição é descartada e retornada como AcquisitionStatus.SKIPPED
+            broadcast (bool): Se verdadeiro, as mensagens de uma atualização são gravadas na caixa de saída para a
+                lista de contatos antes da gravação do novo estado do scraper, de forma que uma queda do processo
+                não perde a atualização. O envio é feito com deliver_to_contact_list
+        Returns:
+            report (dict): Nome do scraper, status, tempo de execução, mensagens de saída e, se as mensagens foram
+                gravadas na caixa de saída, o identificador do envio (batch_id)
+        """
+        start = time.perf_counter()
+        scraper_lock = self.scraper_locks[scraper_name]
+
+        if not scraper_lock.acquire(timeout=None if wait else 0):
+            self.logger.info(msg=f"Aquisição de {scraper_name} já em andamento, checagem descartada")
+
+            if self.metrics is not None:
+                self.metrics.increment(
+                    "concursobo_acquisitions_total",
+                    scraper=scraper_name,
+                    status=AcquisitionStatus.name(AcquisitionStatus.SKIPPED),
+                )
+
+            return {
+                "scraper": scraper_name,
+                "status": AcquisitionStatus.SKIPPED,
+                "elapsed": time.perf_counter() - start,
+                "message_list": [f"A aquisição de {scraper_name} já está em andamento"],
+                "batch_id": None,
+            }
+
+        batch_id = None
+
+        try:
+            scraper = self.scrapers[scraper_name]
+
+            with scraper.acquisition_deadline(seconds=self.time_budget), self.measure(
+                phase="acquisition", scraper_name=scraper_name
+            ), scraper.state.deferred_write():
+                message_list, scraper_status = self.force_acquisition(scraper=scraper)
+
+                if broadcast and scraper_status == AcquisitionStatus.UPDATED:
+                    batch_id = self.enqueue_to_contact_list(message_list=message_list)
+        except TimeoutError:
+            self.logger.warning(msg=f"Aquisição de {scraper_name} interrompida por exceder o tempo máximo")
+            message_list = [f"Não foi possível fazer a aquisição para {scraper_name}"]
+            scraper_status = AcquisitionStatus.ERROR
+        except Exception:
+            self.logger.exception(msg=f"Erro na aquisição de {scraper_name}")
+            message_list = [f"Não foi possível fazer a aquisição para {scraper_name}"]
+            scraper_status = AcquisitionStatus.ERROR
+        finally:
+            scraper_lock.release()
+
+        if self.metrics is not None:
+            self.metrics.increment(
+                "concursobo_acquisitions_total",
+                scraper=scraper_name,
+                status=AcquisitionStatus.name(scraper_status),
+            )
+
+        if self.change_history is not None and scraper_status != AcquisitionStatus.ERROR:
+            self.change_history.record(
+                scraper_name=scraper_name, updated=scraper_status == AcquisitionStatus.UPDATED
+            )
+
+        return {
+            "scraper": scraper_name,
+            "status": scraper_status,
+            "elapsed": time.perf_counter() - start,
+            "message_list": message_list,
+            "batch_id": batch_id,
+        }
+
+    def run_all(self, scraper_names=None, max_workers=None, on_result=None, broadcast=False):
+        """
+            Executa as aquisições dos scrapers em paralelo. Cada resultado é repassado para on_result assim que
+            o scraper termina, de forma que o tempo total é limitado pelo scraper mais lento
+        Args:
+            scraper_names (list of str): Scrapers a serem executados. Se não for informado, executa todos
+            max_workers (int): Número máximo de scrapers executados simultaneamente
+            on_result (callable): Função chamada com o relatório de cada scraper, na ordem em que terminam
+            broadcast (bool): Grava as atualizações na caixa de saída para a lista de contatos, como em
+                timed_acquisition
+        Returns:
+            reports (list of dict): Relatórios de cada scraper, na ordem em que terminaram
+        """
+        scraper_names = list(scraper_names or self.scrapers)
+        max_workers = max_workers or self.run_all_workers
+        reports = list()
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = [
+                executor.submit(self.timed_acquisition, scraper_name=scraper_name, broadcast=broadcast)
+                for scraper_name in scraper_names
+            ]
+
+            for future in as_completed(futures):
+                report = future.result()
+                reports.append(report)
+
+                if on_result is not None:
+                    on_result(report)
+
+        return reports
+
     def update_all(self, update, context):
         """
-            Atualiza todos os scrapers cadastrados
+            Atualiza todos os scrapers cadastrados. A aquisição é executada na fila interativa e os resultados são
+            enviados ao chat conforme cada scraper termina
         Args:
             update (Update): Objeto com os dados do chat e do usuário.
             context (CallbackContext): Objeto de contexto.
         """
-        for _, scraper in self.scrapers.items():
-            message_list, _ = self.force_acquisition(scraper=scraper)
-            self.return_messages(chat_id=self.get_chat_id(update=update, context=context), message_list=message_list)
+        chat_id = self.get_chat_id(update=update, context=context)
+        progress_message = update.message.reply_text(
+            text=BotMessages.processing, parse_mode=ParseMode.HTML
+        )
+
+        self.acquisition_executor.submit(
+            AcquisitionLane.INTERACTIVE,
+            self.interactive_update_all,
+            priority=AcquisitionPriority.LOW,
+            chat_id=chat_id,
+            progress_message=progress_message,
+        )
+
+    def interactive_update_all(self, chat_id, progress_message):
+        """
+            Executa a atualização de todos os scrapers e edita a mensagem de progresso ao final
+        Args:
+            chat_id (int): ID do chat para enviar a mensagem
+            progress_message (Message): Mensagem enviada no início do processamento
+        """
+        start = time.perf_counter()
+
+        reports = self.run_all(
+            on_result=lambda report: self.return_messages(
+                chat_id=chat_id, message_list=report["message_list"]
+            )
+        )
+
+        progress_message.edit_text(
+            text=f"Atualização concluída: {len(reports)} páginas em {time.perf_counter() - start:.1f} s",
+            parse_mode=ParseMode.HTML,
+        )
+
+    def interactive_acquisition(self, scraper_name, chat_id, progress_message):
+        """
+            Força a aquisição de um scraper e substitui a mensagem de progresso pelo resultado
+        Args:
+            scraper_name (str): Nome do scraper cadastrado no Concursobô
+            chat_id (int): ID do chat para enviar a mensagem
+            progress_message (Message): Mensagem enviada no início do processamento
+        """
+        message_list = self.timed_acquisition(scraper_name=scraper_name)["message_list"]
+
+        progress_message.edit_text(text=message_list[0], parse_mode=ParseMode.HTML)
+        self.return_messages(chat_id=chat_id, message_list=message_list[1:])
 
     def return_messages(self, chat_id, message_list):
         """
-            Envia mensagens para
+            Envia mensagens para um chat através da caixa de saída. Mensagens que falharem são reenviadas pela
+            thread da caixa de saída
         Args:
             chat_id (int): ID do chat para enviar a mensagem
             message_list (list of str): Lista contendo as mensagens a serem enviadas
         """
-        for message in message_list:
-            self.messenger_bot.sendMessage(
-                chat_id=chat_id, text=message, parse_mode=ParseMode.HTML
-            )
+        batch_id = self.outbox.enqueue(chat_ids=[chat_id], message_list=message_list)
+        self.outbox.deliver(batch_id=batch_id)
 
     def button_actions(self, update, context):
         """
@@ -319,11 +631,18 @@ class TelegramBot:
                 self.return_messages(chat_id=chat_id, message_list=message_list)
 
             elif selected_action == "force_acquisition":
-                message_list, _ = self.force_acquisition(
-                    scraper=self.scrapers[selected_scraper]
+                progress_message = update.callback_query.message.reply_text(
+                    text=BotMessages.processing, parse_mode=ParseMode.HTML
                 )
 
-                self.return_messages(chat_id=chat_id, message_list=message_list)
+                self.acquisition_executor.submit(
+                    AcquisitionLane.INTERACTIVE,
+                    self.interactive_acquisition,
+                    priority=AcquisitionPriority.HIGH,
+                    scraper_name=selected_scraper,
+                    chat_id=chat_id,
+                    progress_message=progress_message,
+                )
 
             return
 
@@ -337,26 +656,49 @@ class TelegramBot:
 
         self.logger.warning("Update \"%s\" causou o erro \"%s\"", update, context.error)
 
-    def send_to_contact_list(self, message_list, messages_per_minute=50):
+    def enqueue_to_contact_list(self, message_list):
         """
-            Envia uma mensagem para a lista de contatos
+            Grava as mensagens na caixa de saída para todos os contatos da lista, sem enviá-las
         Args:
             message_list (list of str): Lista de mensagens a serem enviadas
-            messages_per_minute (int): Número de mensagens para serem enviadas por minuto (limite do Telegram)
+        Returns:
+            batch_id (str): Identificador do envio
+        """
+        chat_ids = self.contacts_list.chat_ids()
+
+        self.logger.info(msg=f"Mensagens gravadas na caixa de saída para {len(chat_ids)} contatos")
+
+        return self.outbox.enqueue(chat_ids=chat_ids, message_list=message_list)
+
+    def deliver_to_contact_list(self, batch_id, scraper_name=""):
         """
+            Envia as mensagens de um envio gravado na caixa de saída, respeitando os limites de envio do Telegram.
+            Mensagens que falharem são reenviadas pela thread da caixa de saída
+        Args:
+            batch_id (str): Identificador do envio
+            scraper_name (str): Nome do scraper que gerou as mensagens, usado nas métricas do envio
+        """
+        with self.measure(phase="send", scraper_name=scraper_name):
+            report = self.outbox.deliver(batch_id=batch_id)
+
+        if self.metrics is not None:
+            self.metrics.increment("concursobo_items_total", report["sent"], scraper=scraper_name, kind="sent")
+
         self.logger.info(
-            msg=f"Enviando mensagens para {str(len(self.contacts_list.all()))} contatos"
+            msg=f"Envio concluído: {report['sent']} mensagens enviadas, {report['unsent']} não enviadas, "
+            f"{report['elapsed']:.1f} s"
         )
 
-        time_interval = messages_per_minute / 60
-
-        for data in self.contacts_list.all():
-            chat_id = data["chat_id"]
-            for message in message_list:
-                self.messenger_bot.sendMessage(
-                    chat_id=chat_id, text=message, parse_mode=ParseMode.HTML
-                )
-                time.sleep(time_interval)
+    def send_to_contact_list(self, message_list, scraper_name=""):
+        """
+            Envia uma mensagem para a lista de contatos. As mensagens são gravadas na caixa de saída antes do envio,
+            de forma que uma falha não descarta o restante do envio
+        Args:
+            message_list (list of str): Lista de mensagens a serem enviadas
+            scraper_name (str): Nome do scraper que gerou as mensagens, usado nas métricas do envio
+        """
+        batch_id = self.enqueue_to_contact_list(message_list=message_list)
+        self.deliver_to_contact_list(batch_id=batch_id, scraper_name=scraper_name)
 
     def start_pooling(self):
         """
@@ -364,17 +706,38 @@ class TelegramBot:
         """
 
         self.logger.info(msg="Iniciando o recebimento de comandos")
+        self.outbox.start_worker()
         self.updater.start_polling()
 
-    def auto_check(self, scraper_name):
+    def auto_check(self, scraper_name, priority=AcquisitionPriority.NORMAL):
         """
-            Coleta de dados e envio de mensagens para os assinantes da lista
+            Coleta de dados e envio de mensagens para os assinantes da lista. A checagem é executada na fila
+            agendada, separada dos comandos interativos, e o método aguarda o seu término
         Args:
             scraper_name (str): Nome do scraper cadastrado no Concursobô
+            priority (int): Prioridade da checagem na fila agendada, definida em AcquisitionPriority
+        Returns:
+            report (dict): Resultado da aquisição, como em timed_acquisition
         """
-        message_list, scraper_status = self.force_acquisition(
-            scraper=self.scrapers[scraper_name]
+        future = self.acquisition_executor.submit(
+            AcquisitionLane.SCHEDULED, self.scheduled_check, priority=priority, scraper_name=scraper_name
         )
+        return future.result()
+
+    def scheduled_check(self, scraper_name):
+        """
+            Executa a aquisição de um scraper e envia as atualizações para a lista de contatos. As mensagens são
+            gravadas na caixa de saída antes do novo estado do scraper, então uma queda do processo entre a
+            aquisição e o envio não perde a atualização. Se outra aquisição do scraper estiver em andamento, a
+            checagem é descartada em vez de aguardar
+        Args:
+            scraper_name (str): Nome do scraper cadastrado no Concursobô
+        Returns:
+            report (dict): Resultado da aquisição, como em timed_acquisition
+        """
+        report = self.timed_acquisition(scraper_name=scraper_name, wait=False, broadcast=True)
+
+        if report["batch_id"] is not None:
+            self.deliver_to_contact_list(batch_id=report["batch_id"], scraper_name=scraper_name)
 
-        if scraper_status == AcquisitionStatus.UPDATED:
-            self.send_to_contact_list(message_list=message_list)
+        return report
@@ -1,8 +1,30 @@
+import hashlib
+import importlib.util
+import json
+import logging
 import os
+import threading
+import time
+import unicodedata
+from collections import namedtuple
+from datetime import datetime
+
+import pytz
+
 import Concursobo
 from configparser import ConfigParser
 
 
+DiffResult = namedtuple("DiffResult", ["added", "removed", "changed"])
+
+# Backends do BeautifulSoup suportados e o módulo necessário para cada um
+PARSER_BACKENDS = {
+    "html.parser": None,
+    "lxml": "lxml",
+    "html5lib": "html5lib",
+}
+
+
 def get_data_path():
     """
         Retorna o caminho da pasta "data" do projeto
@@ -15,22 +37,141 @@ def get_data_path():
     return data_path
 
 
+class ProjectConfig:
+    """
+    Configuração do projeto, lida uma única vez e recarregada apenas quando o arquivo é alterado. A data de
+    modificação do arquivo é verificada no máximo uma vez a cada check_interval segundos
+    """
+
+    def __init__(self, config_path, check_interval=5.0):
+        """
+            Inicializa a classe
+        Args:
+            config_path (str): Caminho para o arquivo de configuração
+            check_interval (float): Intervalo mínimo, em segundos, entre as verificações do arquivo
+        """
+        self.config_path = config_path
+        self.check_interval = check_interval
+
+        self._parser = None
+        self._timezone = None
+        self._mtime = None
+        self._next_check = 0.0
+        self._lock = threading.Lock()
+
+    def _refresh(self):
+        now = time.monotonic()
+
+        with self._lock:
+            if self._parser is not None and now < self._next_check:
+                return
+
+            self._next_check = now + self.check_interval
+
+            if os.path.isfile(self.config_path) is False:
+                raise Exception(f"Arquivo {self.config_path} não encontrado!")
+
+            mtime = os.stat(self.config_path).st_mtime_ns
+            if mtime == self._mtime:
+                return
+
+            cfg_parser = ConfigParser()
+            cfg_parser.read(filenames=self.config_path)
+
+            self._timezone = pytz.timezone(
+                zone=cfg_parser.get(section="timezone", option="PYTZ_TIMEZONE", fallback="UTC")
+            )
+            self._parser = cfg_parser
+            self._mtime = mtime
+
+    @property
+    def parser(self):
+        """
+        ConfigParser com os dados de configuração
+        """
+        self._refresh()
+        return self._parser
+
+    @property
+    def timezone(self):
+        """
+        Fuso horário do projeto, já resolvido pelo pytz
+        """
+        self._refresh()
+        return self._timezone
+
+    def get(self, section, option, **kwargs):
+        """
+            Retorna uma opção do arquivo de configuração
+        Args:
+            section (str): Seção do arquivo
+            option (str): Nome da opção
+            **kwargs: Argumentos repassados para o ConfigParser, como o fallback
+        Returns:
+            (str): Valor da opção
+        """
+        return self.parser.get(section=section, option=option, **kwargs)
+
+    def now(self):
+        """
+            Retorna a data e hora atual no fuso horário do projeto
+        Returns:
+            (datetime): Data e hora atual
+        """
+        return datetime.now(tz=self.timezone)
+
+
+_project_config = None
+_project_config_lock = threading.Lock()
+
+
+def project_config():
+    """
+        Retorna a configuração do projeto, compartilhada por todo o processo
+    Returns:
+        (ProjectConfig): Configuração do projeto
+    """
+    global _project_config
+
+    with _project_config_lock:
+        if _project_config is None:
+            _project_config = ProjectConfig(config_path=os.path.join(get_data_path(), "config.cfg"))
+
+        return _project_config
+
+
 def get_config():
     """
         Obtém o arquivo de configuração do projeto
     Returns:
         cfg_parser (ConfigParser): Arquivo do ConfigParser com os dados de configuração
     """
-    package_folder = os.path.dirname(Concursobo.__file__)
-    config_path = os.path.join(package_folder, "data/config.cfg")
+    return project_config().parser
 
-    if os.path.isfile(config_path) is False:
-        raise Exception(f"Arquivo {config_path} não encontrado!")
 
-    cfg_parser = ConfigParser()
-    cfg_parser.read(filenames=config_path)
+def get_parser_backend(parser=None):
+    """
+        Retorna o backend do BeautifulSoup a ser usado. Se o módulo do backend não estiver instalado, é usado o
+        "html.parser"
+    Args:
+        parser (str): Backend escolhido. Se não for informado, é usado o backend do arquivo de configuração
+    Returns:
+        parser (str): Backend disponível
+    """
+    if parser is None:
+        parser = get_config().get(section="scraping", option="PARSER_BACKEND", fallback="html.parser")
+
+    if parser not in PARSER_BACKENDS:
+        raise Exception(f"Backend {parser} não suportado, utilize um entre {', '.join(PARSER_BACKENDS)}")
 
-    return cfg_parser
+    module = PARSER_BACKENDS[parser]
+    if module is not None and importlib.util.find_spec(module) is None:
+        logging.getLogger(name="Concursobô").warning(
+            msg=f"Backend {parser} não instalado, utilizando html.parser"
+        )
+        parser = "html.parser"
+
+    return parser
 
 
 def split_list(input_list, size):
@@ -56,6 +197,103 @@ def split_list(input_list, size):
     return output_list
 
 
+def normalize_text(text):
+    """
+        Normaliza um texto para comparação, removendo diferenças cosméticas como espaços repetidos,
+        espaços não separáveis (NBSP) e formas diferentes de representar o mesmo caractere unicode
+    Args:
+        text (str): Texto a ser normalizado
+    Returns:
+        (str): Texto normalizado
+    """
+    return " ".join(unicodedata.normalize("NFKC", text).split())
+
+
+def canonical_record(record):
+    """
+        Retorna uma cópia do registro com todos os textos normalizados
+    Args:
+        record (dict, list or str): Registro a ser normalizado
+    Returns:
+        Registro normalizado
+    """
+    if isinstance(record, str):
+        return normalize_text(record)
+    if isinstance(record, dict):
+        return {key: canonical_record(value) for key, value in record.items()}
+    if isinstance(record, (list, tuple)):
+        return [canonical_record(value) for value in record]
+
+    return record
+
+
+def record_key(record, fields=None):
+    """
+        Gera uma chave de hash a partir do conteúdo normalizado do registro
+    Args:
+        record (dict): Registro
+        fields (list of str): Campos usados para gerar a chave. Se não for informado, todo o registro é usado
+    Returns:
+        (str): Chave do registro
+    """
+    if fields is not None:
+        record = {field: record.get(field) for field in fields}
+
+    canonical = json.dumps(canonical_record(record), sort_keys=True, ensure_ascii=False, default=str)
+
+    return hashlib.blake2b(canonical.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def diff_records(list_A, list_B, id_fields=None):
+    """
+        Compara duas listas de registros em tempo linear, usando chaves de hash do conteúdo normalizado
+    Args:
+        list_A (list of dict): Registros novos
+        list_B (list of dict): Registros antigos
+        id_fields (list of str): Campos que identificam um registro (ex: ["url"]). Se informado, registros
+            com a mesma identificação e conteúdo diferente são retornados em "changed" e não em "added" e
+            "removed". Registros sem nenhum dos campos de identificação nunca são pareados
+    Returns:
+        (DiffResult): Registros adicionados (presentes só em A), removidos (presentes só em B) e alterados
+            (lista de tuplas (novo, antigo)), na ordem das listas de entrada
+    """
+    keys_A = [record_key(record) for record in list_A]
+    keys_B = [record_key(record) for record in list_B]
+
+    set_A = set(keys_A)
+    set_B = set(keys_B)
+
+    added = [record for record, key in zip(list_A, keys_A) if key not in set_B]
+    removed = [record for record, key in zip(list_B, keys_B) if key not in set_A]
+    changed = list()
+
+    if id_fields is not None and added and removed:
+        def identity(record):
+            if all(record.get(field) is None for field in id_fields):
+                return None
+            return record_key(record, fields=id_fields)
+
+        removed_by_id = dict()
+        for index, record in enumerate(removed):
+            removed_by_id.setdefault(identity(record), index)
+        removed_by_id.pop(None, None)
+        matched = set()
+        still_added = list()
+
+        for record in added:
+            index = removed_by_id.pop(identity(record), None)
+            if index is not None:
+                changed.append((record, removed[index]))
+                matched.add(index)
+            else:
+                still_added.append(record)
+
+        added = still_added
+        removed = [record for index, record in enumerate(removed) if index not in matched]
+
+    return DiffResult(added=added, removed=removed, changed=changed)
+
+
 def list_difference(list_A, list_B):
     """
         Retorna a diferença do conteúdo de duas listas
@@ -67,18 +305,27 @@ def list_difference(list_A, list_B):
         diff_ab (list): Lista com a diferença da lista A com a lista B
         diff_ba (list): Lista com a diferença da lista B com a lista A
     """
-    diff_ab = list()
-    diff_ba = list()
+    diff = diff_records(list_A=list_A, list_B=list_B)
+
+    return diff.added, diff.removed
+
 
-    for element in list_A:
-        if element not in list_B:
-            diff_ab.append(element)
+def content_fingerprint(text, volatile_regex=None):
+    """
+        Calcula uma assinatura do conteúdo de uma página, removendo trechos que mudam a cada acesso e
+        normalizando os espaços em branco
+    Args:
+        text (str): Conteúdo da página
+        volatile_regex (Pattern): Expressão regular compilada com os trechos voláteis a serem removidos
+    Returns:
+        (str): Assinatura do conteúdo
+    """
+    if volatile_regex is not None:
+        text = volatile_regex.sub("", text)
 
-    for element in list_B:
-        if element not in list_A:
-            diff_ba.append(element)
+    text = " ".join(text.split())
 
-    return diff_ab, diff_ba
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=16).hexdigest()
 
 
 def group_messages(message_list):
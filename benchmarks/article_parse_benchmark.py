@@ -0,0 +1,96 @@
+import os
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+import argparse
+import random
+import time
+import tracemalloc
+
+from bs4 import BeautifulSoup, SoupStrainer
+
+from Concursobo.scrapers.article_parser import ArticleBodyParser
+
+from pci_fixtures import article_page
+
+
+def full_parse(html):
+    """
+    Extração anterior: monta a árvore completa da página
+    """
+    soup = BeautifulSoup(html, "html.parser")
+    return soup.find_all("div", {"itemprop": "articleBody"})[0].text
+
+
+def strainer_parse(html):
+    """
+    Monta apenas a subárvore do corpo da notícia com um SoupStrainer
+    """
+    strainer = SoupStrainer("div", attrs={"itemprop": "articleBody"})
+    soup = BeautifulSoup(html, "html.parser", parse_only=strainer)
+    return soup.find_all("div", {"itemprop": "articleBody"})[0].text
+
+
+def streaming_parse(html, chunk_size=8192):
+    """
+    Extração atual: lê a página em partes e para ao fim do corpo da notícia
+    """
+    parser = ArticleBodyParser()
+    for start in range(0, len(html), chunk_size):
+        parser.feed(html[start:start + chunk_size])
+        if parser.done:
+            break
+    return parser.text
+
+
+def measure(func, articles):
+    """
+        Mede o tempo de CPU e o pico de memória médios por notícia
+    Returns:
+        cpu_ms (float): Tempo de CPU médio por notícia, em milissegundos
+        peak_kib (float): Pico de memória médio por notícia, em KiB
+        texts (list of str): Textos extraídos
+    """
+    texts = list()
+    peaks = list()
+    cpu = 0.0
+
+    for html in articles:
+        tracemalloc.start()
+        start = time.process_time()
+        texts.append(func(html))
+        cpu += time.process_time() - start
+        peaks.append(tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+
+    # O tracemalloc deixa a execução mais lenta, então o tempo de CPU é medido novamente sem ele
+    start = time.process_time()
+    for html in articles:
+        func(html)
+    cpu = time.process_time() - start
+
+    return cpu / len(articles) * 1000, sum(peaks) / len(peaks) / 1024, texts
+
+
+if __name__ == "__main__":
+    """
+    Compara o tempo de CPU e o pico de memória por notícia entre a árvore completa, o SoupStrainer e a leitura
+    em partes do corpo da notícia
+    """
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--articles", type=int, default=100)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    articles = [article_page(index=index, rng=rng) for index in range(args.articles)]
+    average_size = sum(len(html) for html in articles) / len(articles) / 1024
+
+    print(f"{args.articles} notícias, {average_size:.0f} KiB em média")
+    print(f"{'extração':>12} {'CPU (ms)':>9} {'pico (KiB)':>11} {'mesmo texto':>12}")
+
+    _, _, reference = measure(full_parse, articles)
+
+    for name, func in [("completa", full_parse), ("strainer", strainer_parse), ("em partes", streaming_parse)]:
+        cpu_ms, peak_kib, texts = measure(func, articles)
+        print(f"{name:>12} {cpu_ms:>9.2f} {peak_kib:>11.0f} {str(texts == reference):>12}")
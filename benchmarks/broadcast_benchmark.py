@@ -0,0 +1,89 @@
+import os
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+import argparse
+import logging
+import tempfile
+import time
+
+from telegram import Bot, ParseMode
+from telegram.utils.request import Request
+
+from Concursobo.broadcast import BroadcastEngine
+from Concursobo.outbox import Outbox
+
+from fake_bot_api import FakeBotAPI
+
+TOKEN = "123456:benchmark"
+
+
+def legacy_broadcast(bot, chat_ids, message_list, messages_per_minute=50):
+    """
+        Reproduz o envio sequencial antigo do send_to_contact_list
+    Args:
+        bot (Bot): Bot do Telegram
+        chat_ids (list of int): IDs dos chats
+        message_list (list of str): Lista de mensagens
+        messages_per_minute (int): Parâmetro do método antigo
+    Returns:
+        elapsed (float): Tempo de execução em segundos
+    """
+    start = time.perf_counter()
+
+    for chat_id in chat_ids:
+        for message in message_list:
+            bot.send_message(chat_id=chat_id, text=message, parse_mode=ParseMode.HTML)
+            time.sleep(messages_per_minute / 60)
+
+    return time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    """
+    Mede o tempo de envio de mensagens para a lista de contatos contra uma Bot API local, pela caixa de saída usada
+    pelo bot. Os limites padrão são os do Telegram (30 mensagens/s e 1 mensagem/s por chat); para execuções
+    rápidas, aumente --global-rate e --chat-rate, que são aplicados tanto ao servidor quanto ao BroadcastEngine
+    """
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--chats", type=int, default=10000)
+    parser.add_argument("--chunks", type=int, default=5)
+    parser.add_argument("--global-rate", type=float, default=30.0)
+    parser.add_argument("--chat-rate", type=float, default=1.0)
+    parser.add_argument("--workers", type=int, default=32)
+    parser.add_argument("--latency", type=float, default=0.03, help="Latência simulada por requisição (s)")
+    parser.add_argument("--legacy-chats", type=int, default=2, help="Chats usados para estimar o método antigo")
+    args = parser.parse_args()
+
+    logging.disable(logging.WARNING)
+
+    message_list = [f"Mensagem {index + 1} de {args.chunks}" for index in range(args.chunks)]
+    total_messages = args.chats * args.chunks
+
+    with tempfile.TemporaryDirectory() as tmp_dir, FakeBotAPI(
+        global_rate=args.global_rate, chat_rate=args.chat_rate, latency=args.latency
+    ) as server:
+        bot = Bot(token=TOKEN, base_url=server.base_url, request=Request(con_pool_size=args.workers))
+
+        legacy_elapsed = legacy_broadcast(
+            bot=bot, chat_ids=range(-args.legacy_chats, 0), message_list=message_list
+        )
+        legacy_estimate = legacy_elapsed / args.legacy_chats * args.chats
+        server.rejected = 0
+
+        engine = BroadcastEngine(
+            bot=bot, global_rate=args.global_rate, chat_rate=args.chat_rate, max_workers=args.workers
+        )
+        outbox = Outbox(db_path=os.path.join(tmp_dir, "outbox.db"), broadcast_engine=engine)
+        batch_id = outbox.enqueue(chat_ids=range(args.chats), message_list=message_list)
+        report = outbox.deliver(batch_id=batch_id)
+
+    lower_bound = max(total_messages / args.global_rate, (args.chunks - 1) / args.chat_rate)
+
+    print(f"{args.chats} chats x {args.chunks} mensagens = {total_messages} mensagens")
+    print(f"{'Método':<28}{'Tempo (s)':>12}{'Mensagens/s':>14}")
+    print(f"{'Sequencial (estimado)':<28}{legacy_estimate:>12.1f}{total_messages / legacy_estimate:>14.1f}")
+    print(f"{'Outbox + BroadcastEngine':<28}{report['elapsed']:>12.1f}{total_messages / report['elapsed']:>14.1f}")
+    print(f"{'Limite teórico':<28}{lower_bound:>12.1f}{total_messages / lower_bound:>14.1f}")
+    print(f"Enviadas: {report['sent']}, não enviadas: {report['unsent']}, respostas 429: {server.rejected}")
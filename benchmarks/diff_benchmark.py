@@ -0,0 +1,76 @@
+import os
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+import argparse
+import random
+import time
+
+from Concursobo import utils
+
+
+def legacy_list_difference(list_A, list_B):
+    """
+    Implementação anterior de utils.list_difference, mantida para comparação
+    """
+    diff_ab = [element for element in list_A if element not in list_B]
+    diff_ba = [element for element in list_B if element not in list_A]
+
+    return diff_ab, diff_ba
+
+
+def build_records(size, seed=0):
+    """
+        Gera duas listas de mensagens no formato dos scrapers, com 1% de registros novos e 1% removidos
+    Args:
+        size (int): Quantidade de registros
+        seed (int): Semente do gerador de números aleatórios
+    Returns:
+        new_records (list of dict): Registros novos
+        old_records (list of dict): Registros antigos
+    """
+    rng = random.Random(seed)
+    records = [
+        {
+            "date": f"{rng.randint(1, 28):02d}/{rng.randint(1, 12):02d}/2022",
+            "message": f"Mensagem número {index} sobre o concurso",
+            "url": f"https://www.example.com/mensagem/{index}",
+        }
+        for index in range(size + size // 100)
+    ]
+
+    new_records = records[size // 100:]
+    old_records = records[:size]
+
+    return new_records, old_records
+
+
+def measure(func, new_records, old_records):
+    start = time.perf_counter()
+    func(new_records, old_records)
+    return time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    """
+    Compara o tempo da diferença entre listas com a implementação anterior (quadrática) e com chaves de hash
+    """
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000, 10000, 100000])
+    parser.add_argument("--legacy-limit", type=int, default=10000, help="Maior tamanho medido na implementação anterior")
+    args = parser.parse_args()
+
+    print(f"{'registros':>10} {'anterior (s)':>13} {'hash (s)':>10}")
+
+    for size in args.sizes:
+        new_records, old_records = build_records(size=size)
+
+        hashed = measure(utils.list_difference, new_records, old_records)
+
+        if size <= args.legacy_limit:
+            legacy = f"{measure(legacy_list_difference, new_records, old_records):13.3f}"
+        else:
+            legacy = f"{'-':>13}"
+
+        print(f"{size:>10} {legacy} {hashed:>10.3f}")
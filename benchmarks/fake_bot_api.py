@@ -0,0 +1,127 @@
+import json
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class FakeBotAPI:
+    """
+    Servidor HTTP local que imita o método sendMessage da Bot API do Telegram, incluindo as respostas 429 com
+    retry_after quando os limites global e por chat são excedidos
+    """
+
+    def __init__(self, global_rate=30.0, chat_rate=1.0, latency=0.0, tolerance=1.1, chat_tolerance=2.0):
+        """
+            Inicializa a classe
+        Args:
+            global_rate (float): Limite de mensagens por segundo para todos os chats
+            chat_rate (float): Limite de mensagens por segundo para um mesmo chat
+            latency (float): Atraso em segundos adicionado a cada resposta, simulando a latência da rede
+            tolerance (float): Folga aplicada ao limite global antes de responder com 429
+            chat_tolerance (float): Folga aplicada ao limite por chat, já que o Telegram permite pequenas rajadas
+        """
+        self.global_rate = global_rate
+        self.chat_rate = chat_rate
+        self.latency = latency
+        self.tolerance = tolerance
+        self.chat_tolerance = chat_tolerance
+
+        self.delivered = 0
+        self.rejected = 0
+        self.window = deque()
+        self.last_by_chat = dict()
+        self._lock = threading.Lock()
+
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            disable_nagle_algorithm = True
+
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+                data = json.loads(body or b"{}")
+
+                if server.latency:
+                    time.sleep(server.latency)
+
+                chat_id = data.get("chat_id")
+
+                if server.accept(chat_id=chat_id):
+                    response = {
+                        "ok": True,
+                        "result": {
+                            "message_id": 1,
+                            "date": int(time.time()),
+                            "chat": {"id": chat_id, "type": "private"},
+                            "text": data.get("text", ""),
+                        },
+                    }
+                    status = 200
+                else:
+                    response = {
+                        "ok": False,
+                        "error_code": 429,
+                        "description": "Too Many Requests: retry after 1",
+                        "parameters": {"retry_after": 1},
+                    }
+                    status = 429
+
+                payload = json.dumps(response).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.httpd.daemon_threads = True
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    def accept(self, chat_id):
+        """
+            Verifica os limites de envio e registra a mensagem
+        Args:
+            chat_id (int): ID do chat de destino
+        Returns:
+            (bool): Se a mensagem foi aceita
+        """
+        with self._lock:
+            now = time.monotonic()
+
+            while self.window and now - self.window[0] > 1.0:
+                self.window.popleft()
+
+            over_global = len(self.window) >= self.global_rate * self.tolerance
+            last = self.last_by_chat.get(chat_id)
+            over_chat = last is not None and (now - last) * self.chat_rate * self.chat_tolerance < 1.0
+
+            if over_global or over_chat:
+                self.rejected += 1
+                return False
+
+            self.window.append(now)
+            self.last_by_chat[chat_id] = now
+            self.delivered += 1
+
+            return True
+
+    @property
+    def base_url(self):
+        """
+        URL base da Bot API, no formato esperado pelo parâmetro base_url do Bot
+        """
+        host, port = self.httpd.server_address
+        return f"http://{host}:{port}/bot"
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.httpd.shutdown()
+        self.httpd.server_close()
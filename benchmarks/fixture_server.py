@@ -0,0 +1,80 @@
+import hashlib
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class FixtureServer:
+    """
+    Servidor HTTP local que responde com páginas pré-definidas, usado nos benchmarks para não acessar os sites reais
+    """
+
+    def __init__(self, pages, latency=0.0, etags=False):
+        """
+            Inicializa a classe
+        Args:
+            pages (dict): Dicionário com o caminho da página como chave e o conteúdo HTML (str) como valor
+            latency (float): Atraso em segundos adicionado a cada resposta, simulando a latência da rede
+            etags (bool): Se verdadeiro, envia ETags e responde requisições condicionais com 304
+        """
+        self.pages = pages
+        self.latency = latency
+        self.etags = etags
+        self.request_count = 0
+        self._lock = threading.Lock()
+
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            disable_nagle_algorithm = True
+
+            def do_GET(self):
+                with server._lock:
+                    server.request_count += 1
+
+                if server.latency:
+                    time.sleep(server.latency)
+
+                body = server.pages.get(self.path)
+                status = 200 if body is not None else 404
+                body = (body or "").encode("utf-8")
+                etag = '"' + hashlib.md5(body).hexdigest() + '"'
+
+                if server.etags and status == 200 and self.headers.get("If-None-Match") == etag:
+                    self.send_response(304)
+                    self.send_header("ETag", etag)
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+                    return
+
+                self.send_response(status)
+                self.send_header("Content-Type", "text/html; charset=utf-8")
+                if server.etags:
+                    self.send_header("ETag", etag)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.httpd.daemon_threads = True
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    @property
+    def base_url(self):
+        """
+        URL base do servidor
+        """
+        host, port = self.httpd.server_address
+        return f"http://{host}:{port}"
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.httpd.shutdown()
+        self.httpd.server_close()
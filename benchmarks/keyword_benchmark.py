@@ -0,0 +1,82 @@
+import os
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+import argparse
+import random
+import string
+import time
+
+from unidecode import unidecode
+
+from Concursobo.keyword_matcher import KeywordMatcher
+
+from pci_fixtures import KEYWORDS, WORDS
+
+
+def legacy_search(text, keywords):
+    """
+    Busca anterior do PCIScraper, com um str.find por palavra-chave
+    """
+    article = unidecode(text.lower())
+    return [keyword for keyword in keywords if article.find(keyword.lower()) != -1]
+
+
+def build_keywords(size, seed=0):
+    """
+        Gera uma lista de palavras-chave com as palavras usadas no bot e palavras aleatórias
+    Args:
+        size (int): Quantidade de palavras-chave
+        seed (int): Semente do gerador de números aleatórios
+    Returns:
+        (list of str): Lista de palavras-chave
+    """
+    rng = random.Random(seed)
+    keywords = list(KEYWORDS[:size])
+
+    while len(keywords) < size:
+        keywords.append("".join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(6, 14))))
+
+    return keywords
+
+
+def build_articles(count, words, seed=0):
+    rng = random.Random(seed)
+    return [" ".join(rng.choice(WORDS) for _ in range(words)) for _ in range(count)]
+
+
+def throughput(func, articles):
+    size = sum(len(article.encode("utf-8")) for article in articles)
+    start = time.perf_counter()
+    for article in articles:
+        func(article)
+    elapsed = time.perf_counter() - start
+
+    return size / elapsed / 1e6
+
+
+if __name__ == "__main__":
+    """
+    Mede a vazão (MB/s) da busca de palavras-chave com 10, 100 e 1000 palavras
+    """
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--keywords", type=int, nargs="+", default=[10, 100, 1000])
+    parser.add_argument("--articles", type=int, default=200)
+    parser.add_argument("--words", type=int, default=1000, help="Palavras por notícia")
+    args = parser.parse_args()
+
+    articles = build_articles(count=args.articles, words=args.words)
+
+    print(f"{'palavras':>9} {'str.find (MB/s)':>16} {'KeywordMatcher (MB/s)':>22} {'busca':>10}")
+
+    for size in args.keywords:
+        keywords = build_keywords(size=size)
+        matcher = KeywordMatcher(keywords=keywords)
+
+        legacy = throughput(lambda article: legacy_search(article, keywords), articles)
+        automaton = throughput(matcher.search, articles)
+
+        mode = "autômato" if size >= KeywordMatcher.FIND_THRESHOLD else "str.find"
+
+        print(f"{size:>9} {legacy:>16.1f} {automaton:>22.1f} {mode:>10}")
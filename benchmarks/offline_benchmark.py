@@ -0,0 +1,465 @@
+import os
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+import argparse
+import json
+import logging
+import platform
+import statistics
+import tempfile
+import time
+from collections import namedtuple
+from datetime import datetime
+
+from bs4 import BeautifulSoup
+
+from Concursobo import utils
+from Concursobo.scrapers.article_parser import extract_article_body
+from Concursobo.scrapers.corridasbr_scraper import CorridasBRScraper
+from Concursobo.scrapers.fundep_scraper import FundepScraper
+from Concursobo.scrapers.marinha_scraper import MarinhaScraper
+from Concursobo.scrapers.marinha_smv_scraper import MarinhaSMVScraper
+from Concursobo.scrapers.pci_scraper import PCIScraper
+from pci_fixtures import IGNORE_WORDS, KEYWORDS
+
+FIXTURES_PATH = os.path.join(os.path.dirname(__file__), "fixtures")
+DATA_PATH = os.path.join(os.path.dirname(__file__), "..", "Concursobo", "data")
+
+# Caso de benchmark de um scraper
+# fixture: página gravada; data_file: estado salvo no repositório, usado como modelo do estado gerado
+# rows: função que retorna os elementos da página replicados na escala; extract: extração dos registros (sem rede)
+# structure: organização dos registros no formato do estado; state: estado do scraper com os registros e alterações
+# diff: comparação entre os registros atuais e os armazenados, como é feita na aquisição
+Case = namedtuple("Case", ["scraper", "fixture", "data_file", "rows", "extract", "structure", "diff", "state"])
+
+
+class RecordedResponse:
+    """
+    Resposta gravada, lida em partes como uma resposta de requests feita com stream=True
+    """
+
+    def __init__(self, text):
+        self.text = text
+        self.encoding = "utf-8"
+
+    def iter_content(self, chunk_size, decode_unicode=False):
+        for start in range(0, len(self.text), chunk_size):
+            yield self.text[start:start + chunk_size]
+
+    def close(self):
+        pass
+
+
+def load_fixture(fixture):
+    with open(file=os.path.join(FIXTURES_PATH, fixture), mode="r", encoding="utf-8") as f:
+        return f.read()
+
+
+def load_template(data_file):
+    with open(file=os.path.join(DATA_PATH, data_file), mode="r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def scale_markup(markup, rows, scale):
+    """
+        Aumenta a página gravada replicando os elementos de cada registro. Os links das cópias recebem um sufixo,
+        para que os registros replicados sejam diferentes dos originais
+    Args:
+        markup (str): Conteúdo HTML da página gravada
+        rows (callable): Função que recebe a árvore da página e retorna os elementos a serem replicados
+        scale (int): Quantidade de cópias de cada elemento, incluindo o original
+    Returns:
+        (str): Conteúdo HTML da página aumentada
+    """
+    if scale == 1:
+        return markup
+
+    soup = BeautifulSoup(markup=markup, features="html.parser")
+
+    for row in rows(soup):
+        copies = list()
+        for copy_index in range(1, scale):
+            copy = BeautifulSoup(markup=str(row), features="html.parser")
+            for link in copy.find_all(name="a", href=True):
+                link["href"] += f"#copia-{copy_index}"
+            copies.append(copy)
+
+        row.insert_after(*copies)
+
+    return str(soup)
+
+
+def previous_records(records, key):
+    """
+        Gera os registros de uma aquisição anterior: 1% dos registros atuais não existia e foi trocado por
+        registros que deixaram de existir
+    Args:
+        records (list of dict): Registros atuais
+        key (str): Campo alterado nos registros que deixaram de existir
+    Returns:
+        (list of dict): Registros da aquisição anterior
+    """
+    changed = max(1, len(records) // 100)
+    removed = [dict(record, **{key: record[key] + "#anterior"}) for record in records[:changed]]
+
+    return removed + records[changed:]
+
+
+def marinha_rows(soup):
+    info_table_config = {"height": "24", "width": "46", "align": "right", "valign": "middle"}
+    return [information.parent for information in soup.find_all(name="td", attrs=info_table_config)]
+
+
+def smv_rows(soup):
+    tables_soup = soup.find_all(name="table", class_="views-table cols-0 table table-hover table-striped")
+    return [row for table_soup in tables_soup for row in table_soup.find_all(name="tr")]
+
+
+def fundep_rows(soup):
+    return soup.find_all("li", {"class": "column column-block"})
+
+
+def corridasbr_rows(soup):
+    return soup.find_all(name="table", attrs={"width": "700"})[1].find_all(name="tr", attrs={"height": "40"})
+
+
+def pci_rows(soup):
+    return [item for listing in soup.find_all("ul", class_="noticias") for item in listing.find_all("li")]
+
+
+def pci_records(scraper, markup, keywords):
+    """
+        Extrai as notícias da página de listagem, com as palavras-chave da notícia gravada
+    """
+    return [
+        {"date": news_date.strftime("%d/%m/%Y"), "title": job["title"], "url": job["url"], "keywords": keywords}
+        for news_date, jobs in scraper.extract_listing(markup=markup)
+        for job in jobs
+    ]
+
+
+def pci_days(records):
+    days = dict()
+    for record in records:
+        days.setdefault(record["date"], list()).append(
+            {"title": record["title"], "url": record["url"], "keywords": record["keywords"]}
+        )
+
+    return [{"date": date, "jobs_list": jobs_list} for date, jobs_list in days.items()]
+
+
+def build_cases(database_dir, parser):
+    """
+        Monta os casos de benchmark de cada scraper. Os estados são gravados em uma pasta temporária, nunca nos
+        arquivos de dados do repositório
+    Args:
+        database_dir (str): Pasta dos estados gerados no benchmark
+        parser (str): Backend do BeautifulSoup
+    Returns:
+        (dict): Nome do scraper como chave e o caso de benchmark (Case) como valor
+    """
+    def database_path(file_name):
+        return os.path.join(database_dir, file_name)
+
+    now = datetime.now().strftime("%d/%m/%Y %H:%M:%S")
+
+    marinha = MarinhaScraper(
+        name="CP-CEM",
+        database_path=database_path("cem2021.json"),
+        url="https://www.inscricao.marinha.mil.br/",
+        parser=parser,
+    )
+    smv = MarinhaSMVScraper(name="SMV", database_path=database_path("smv2022.json"), parser=parser)
+    fundep = FundepScraper(name="Fundep", database_path=database_path("fundep.json"), parser=parser)
+    corridasbr = CorridasBRScraper(
+        name="CorridasBR",
+        database_path=database_path("corridasbr.json"),
+        base_url="http://www.corridasbr.com.br/MG/",
+        table_url="http://www.corridasbr.com.br/MG/por_regiao.asp",
+        max_distance=5,
+        parser=parser,
+    )
+    pci = PCIScraper(
+        name="PCI",
+        database_path=database_path("pci.json"),
+        store_size=7,
+        keywords=KEYWORDS,
+        ignore_words=IGNORE_WORDS,
+        parser=parser,
+    )
+
+    article = extract_article_body(response=RecordedResponse(text=load_fixture(fixture="pci_article.html")))
+    article_keywords = pci.keyword_matcher.search(text=article)
+
+    def flat_diff(current, stored):
+        diff = utils.diff_records(list_A=current, list_B=stored, id_fields=["url"])
+        return diff.added, diff.removed
+
+    return {
+        "MarinhaScraper": Case(
+            scraper=marinha,
+            fixture="marinha.html",
+            data_file="cem2021.json",
+            rows=marinha_rows,
+            extract=lambda markup: marinha.extract_data(markup=markup)["messages"],
+            structure=lambda records: records,
+            diff=flat_diff,
+            state=lambda current, changes: {
+                "messages": current, "last_update": changes[0], "acquisition_date": now, "last_update_date": now
+            },
+        ),
+        "MarinhaSMVScraper": Case(
+            scraper=smv,
+            fixture="smv.html",
+            data_file="smv2022.json",
+            rows=smv_rows,
+            extract=lambda markup: smv.extract_data(markup=markup)["messages"],
+            structure=lambda records: records,
+            diff=flat_diff,
+            state=lambda current, changes: {
+                "messages": current, "last_update": changes[0], "acquisition_date": now, "last_update_date": now
+            },
+        ),
+        "FundepScraper": Case(
+            scraper=fundep,
+            fixture="fundep.html",
+            data_file="fundep.json",
+            rows=fundep_rows,
+            extract=lambda markup: fundep.extract_data(markup=markup)["all_jobs"],
+            structure=lambda records: records,
+            diff=flat_diff,
+            state=lambda current, changes: {
+                "all_jobs": current,
+                "acquisition_date": now,
+                "last_update": {"date": now, "jobs_added": changes[0], "jobs_removed": changes[1]},
+            },
+        ),
+        "CorridasBRScraper": Case(
+            scraper=corridasbr,
+            fixture="corridasbr.html",
+            data_file="corridasbr.json",
+            rows=corridasbr_rows,
+            extract=lambda markup: corridasbr.extract_data(markup=markup)["races"],
+            structure=lambda records: corridasbr.group_races(races_list=records),
+            diff=lambda current, stored: corridasbr.compare_new_with_old(
+                current_data=current, stored_data=stored, id_fields=corridasbr.id_fields
+            ),
+            state=lambda current, changes: {
+                "all_races": current, "acquisition_date": now, "last_update": {"date": now, "races_added": changes}
+            },
+        ),
+        "PCIScraper": Case(
+            scraper=pci,
+            fixture="pci_listing.html",
+            data_file="pci.json",
+            rows=pci_rows,
+            extract=lambda markup: pci_records(scraper=pci, markup=markup, keywords=article_keywords),
+            structure=pci_days,
+            diff=lambda current, stored: pci.compare_new_with_old(
+                current_data=current, stored_data=stored, id_fields=pci.id_fields
+            ),
+            state=lambda current, changes: {
+                "all_jobs": current, "acquisition_date": now, "last_update": {"date": now, "updated_data": changes}
+            },
+        ),
+    }
+
+
+def measure(func, repeat):
+    """
+        Executa a função repetidas vezes e mede a duração de cada execução
+    Args:
+        func (callable): Função medida
+        repeat (int): Quantidade de execuções
+    Returns:
+        result: Retorno da última execução
+        durations (list of float): Duração de cada execução, em segundos
+    """
+    durations = list()
+    result = None
+
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        durations.append(time.perf_counter() - start)
+
+    return result, durations
+
+
+def result_entry(scraper, phase, scale, records, durations):
+    best = min(durations)
+
+    return {
+        "scraper": scraper,
+        "phase": phase,
+        "scale": scale,
+        "records": records,
+        "best_seconds": best,
+        "mean_seconds": statistics.mean(durations),
+        "records_per_second": records / best if best > 0 else None,
+    }
+
+
+def render_views(scraper):
+    """
+        Gera as três visualizações do scraper, descartando as mensagens armazenadas para que sejam geradas de novo
+    Returns:
+        (int): Quantidade de mensagens geradas
+    """
+    messages = 0
+    for view in (scraper.updated_data, scraper.short_data, scraper.complete_data):
+        scraper.view_cache.clear()
+        messages += len(view())
+
+    return messages
+
+
+def run_case(scraper_name, case, scale, repeat):
+    """
+        Mede a extração, a comparação, a geração das mensagens e o agrupamento das mensagens de um scraper com a
+        página gravada aumentada na escala informada
+    Args:
+        scraper_name (str): Nome do scraper
+        case (Case): Caso de benchmark do scraper
+        scale (int): Escala da página gravada
+        repeat (int): Quantidade de execuções de cada etapa
+    Returns:
+        results (list of dict): Resultado de cada etapa
+    """
+    markup = scale_markup(markup=load_fixture(fixture=case.fixture), rows=case.rows, scale=scale)
+
+    results = list()
+
+    records, durations = measure(func=lambda: case.extract(markup), repeat=repeat)
+    results.append(result_entry(scraper_name, "parse", scale, len(records), durations))
+
+    current = case.structure(records)
+    stored = case.structure(previous_records(records=records, key="url"))
+
+    changes, durations = measure(func=lambda: case.diff(current, stored), repeat=repeat)
+    results.append(result_entry(scraper_name, "diff", scale, len(records), durations))
+
+    state = dict(load_template(data_file=case.data_file), **case.state(current, changes))
+    case.scraper.state.replace(state=state)
+
+    _, durations = measure(func=lambda: render_views(scraper=case.scraper), repeat=repeat)
+    results.append(result_entry(scraper_name, "render", scale, len(records), durations))
+
+    message_list = case.scraper.generate_message(message_list=current)
+
+    _, durations = measure(func=lambda: utils.group_messages(message_list=message_list), repeat=repeat)
+    results.append(result_entry(scraper_name, "group_messages", scale, len(message_list), durations))
+
+    return results
+
+
+def run_articles(scraper, count, repeat):
+    """
+        Mede a leitura do corpo das notícias gravadas e a busca das palavras-chave, como é feita para cada notícia
+        da listagem do PCI Concursos
+    Args:
+        scraper (PCIScraper): Scraper do PCI Concursos
+        count (int): Quantidade de notícias lidas
+        repeat (int): Quantidade de execuções
+    Returns:
+        (dict): Resultado da etapa
+    """
+    article = load_fixture(fixture="pci_article.html")
+
+    def match_articles():
+        for _ in range(count):
+            text = extract_article_body(response=RecordedResponse(text=article))
+            scraper.keyword_matcher.search(text=text)
+
+    _, durations = measure(func=match_articles, repeat=repeat)
+
+    return result_entry("PCIScraper", "article_parse", 1, count, durations)
+
+
+def print_results(results, baseline=None):
+    """
+        Exibe os resultados em uma tabela, com a razão entre a vazão atual e a de uma execução anterior
+    Args:
+        results (list of dict): Resultados desta execução
+        baseline (list of dict): Resultados de uma execução anterior
+    """
+    reference = {
+        (entry["scraper"], entry["phase"], entry["scale"]): entry["records_per_second"] for entry in baseline or []
+    }
+
+    print(
+        f"{'scraper':>18} {'etapa':>15} {'escala':>7} {'registros':>10} {'tempo (ms)':>11} {'registros/s':>13}"
+        + (f" {'vs. base':>9}" if baseline else "")
+    )
+
+    for entry in results:
+        line = (
+            f"{entry['scraper']:>18} {entry['phase']:>15} {entry['scale']:>7} {entry['records']:>10} "
+            f"{entry['best_seconds'] * 1000:>11.2f} {entry['records_per_second'] or 0:>13.0f}"
+        )
+
+        if baseline:
+            previous = reference.get((entry["scraper"], entry["phase"], entry["scale"]))
+            current = entry["records_per_second"]
+            line += f" {f'{current / previous:.2f}x' if previous and current else '-':>9}"
+
+        print(line)
+
+
+if __name__ == "__main__":
+    """
+    Mede, sem acessar a rede, a vazão da extração, da comparação com a aquisição anterior, da geração das
+    mensagens e do agrupamento das mensagens de cada scraper, com as páginas gravadas em benchmarks/fixtures no
+    tamanho real e aumentadas. Os resultados podem ser gravados em JSON e comparados com os de outra execução
+    """
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--scales", type=int, nargs="+", default=[1, 100])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--parser", default="html.parser")
+    parser.add_argument("--scrapers", nargs="+", help="Scrapers medidos. Por padrão, todos")
+    parser.add_argument("--output", help="Arquivo JSON onde os resultados são gravados")
+    parser.add_argument("--baseline", help="Arquivo JSON de uma execução anterior, usado na comparação")
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)
+
+    started_at = datetime.now().isoformat(timespec="seconds")
+    results = list()
+
+    with tempfile.TemporaryDirectory() as database_dir:
+        cases = build_cases(database_dir=database_dir, parser=args.parser)
+        selected = args.scrapers or list(cases)
+
+        for scale in args.scales:
+            for scraper_name in selected:
+                results.extend(
+                    run_case(scraper_name=scraper_name, case=cases[scraper_name], scale=scale, repeat=args.repeat)
+                )
+
+        # O custo de cada notícia não depende do tamanho da listagem, então as notícias são medidas apenas na
+        # quantidade da listagem gravada
+        if "PCIScraper" in selected:
+            listing = cases["PCIScraper"].extract(load_fixture(fixture="pci_listing.html"))
+            results.append(run_articles(scraper=cases["PCIScraper"].scraper, count=len(listing), repeat=args.repeat))
+
+    baseline = None
+    if args.baseline:
+        with open(file=args.baseline, mode="r", encoding="utf-8") as f:
+            baseline = json.load(f)["results"]
+
+    print_results(results=results, baseline=baseline)
+
+    if args.output:
+        report = {
+            "started_at": started_at,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "parser": args.parser,
+            "repeat": args.repeat,
+            "results": results,
+        }
+
+        with open(file=args.output, mode="w", encoding="utf-8") as f:
+            json.dump(report, f, indent=4, ensure_ascii=False)
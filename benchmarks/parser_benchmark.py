@@ -0,0 +1,100 @@
+import os
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+import argparse
+import importlib.util
+import logging
+import time
+
+from Concursobo import utils
+from Concursobo.scrapers.corridasbr_scraper import CorridasBRScraper
+from Concursobo.scrapers.fundep_scraper import FundepScraper
+from Concursobo.scrapers.marinha_scraper import MarinhaScraper
+from Concursobo.scrapers.marinha_smv_scraper import MarinhaSMVScraper
+from Concursobo.scrapers.pci_scraper import PCIScraper
+
+FIXTURES_PATH = os.path.join(os.path.dirname(__file__), "fixtures")
+
+
+def build_extractors(parser):
+    """
+        Retorna as funções de extração de cada scraper usando o backend informado
+    Args:
+        parser (str): Backend do BeautifulSoup
+    Returns:
+        (dict): Nome do scraper como chave e uma tupla (arquivo de fixture, função de extração) como valor
+    """
+    return {
+        "MarinhaScraper": (
+            "marinha.html",
+            MarinhaScraper(name="CP-CEM", database_path="", url="", parser=parser).extract_data,
+        ),
+        "MarinhaSMVScraper": (
+            "smv.html",
+            MarinhaSMVScraper(name="SMV", database_path="", parser=parser).extract_data,
+        ),
+        "FundepScraper": (
+            "fundep.html",
+            FundepScraper(name="Fundep", database_path="", parser=parser).extract_data,
+        ),
+        "CorridasBRScraper": (
+            "corridasbr.html",
+            CorridasBRScraper(
+                name="CorridasBR",
+                database_path="",
+                base_url="http://www.corridasbr.com.br/MG/",
+                table_url="",
+                max_distance=5,
+                parser=parser,
+            ).extract_data,
+        ),
+        "PCIScraper": (
+            "pci_listing.html",
+            PCIScraper(
+                name="PCI", database_path="", store_size=7, keywords=[], ignore_words=[], parser=parser
+            ).extract_listing,
+        ),
+    }
+
+
+def available_backends():
+    return [
+        parser
+        for parser, module in utils.PARSER_BACKENDS.items()
+        if module is None or importlib.util.find_spec(module) is not None
+    ]
+
+
+if __name__ == "__main__":
+    """
+    Mede o tempo de extração de cada scraper com cada backend do BeautifulSoup e verifica se os registros
+    extraídos são iguais aos do html.parser
+    """
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)
+
+    backends = available_backends()
+    reference = dict()
+
+    print(f"Backends disponíveis: {', '.join(backends)}")
+    print(f"{'scraper':>18} {'backend':>12} {'tempo (ms)':>11} {'registros iguais':>17}")
+
+    for backend in backends:
+        for scraper_name, (fixture, extract) in build_extractors(parser=backend).items():
+            with open(file=os.path.join(FIXTURES_PATH, fixture), mode="r", encoding="utf-8") as f:
+                markup = f.read()
+
+            start = time.perf_counter()
+            for _ in range(args.repeat):
+                records = extract(markup)
+            elapsed = (time.perf_counter() - start) / args.repeat * 1000
+
+            reference.setdefault(scraper_name, records)
+            equal = records == reference[scraper_name]
+
+            print(f"{scraper_name:>18} {backend:>12} {elapsed:>11.2f} {str(equal):>17}")
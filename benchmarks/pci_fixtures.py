@@ -0,0 +1,97 @@
+import random
+from datetime import datetime, timedelta
+
+WORDS = [
+    "concurso", "edital", "vagas", "salario", "inscricoes", "prefeitura", "municipal", "nivel", "superior",
+    "medio", "fundamental", "cargo", "prova", "objetiva", "titulos", "remuneracao", "beneficios", "banca",
+    "organizadora", "cronograma", "retificacao", "homologacao", "analista", "tecnico", "professor",
+]
+
+KEYWORDS = [
+    "automacao",
+    "eletrica",
+    "eletricidade",
+    "eletronica analogica",
+    "eletronica digital",
+    "eletrotecnica",
+    "engenharia elet",
+    "engenheiro elet",
+    "marinha",
+    "telecom",
+]
+
+IGNORE_WORDS = ["estagio", "estagiario", "aprendiz", "suspens"]
+
+
+def article_page(index, rng, paragraphs=12):
+    """
+        Gera uma página de notícia no formato do PCI Concursos, com cabeçalho, menu lateral e anúncios
+    Args:
+        index (int): Índice da notícia
+        rng (Random): Gerador de números aleatórios
+        paragraphs (int): Quantidade de parágrafos do corpo da notícia
+    Returns:
+        (str): Conteúdo HTML da página
+    """
+    body = list()
+    for _ in range(paragraphs):
+        sentence = " ".join(rng.choice(WORDS) for _ in range(60))
+        if rng.random() < 0.15:
+            sentence += " " + rng.choice(KEYWORDS)
+        body.append(f"<p>{sentence.capitalize()}.</p>")
+
+    menu = "".join(f'<li><a href="/menu/{i}">Menu {i}</a></li>' for i in range(150))
+    ads = "".join(f'<div class="ad"><script>var ad{i} = {i};</script><span>Anúncio {i}</span></div>' for i in range(40))
+
+    return (
+        "<!DOCTYPE html><html><head><title>Notícia</title>"
+        + "".join(f'<meta name="m{i}" content="{i}">' for i in range(30))
+        + "</head><body>"
+        + f'<header><nav><ul class="menu">{menu}</ul></nav></header>'
+        + f'<div id="sidebar">{ads}</div>'
+        + f'<article><h1>Concurso {index}</h1><div itemprop="articleBody">{"".join(body)}</div></article>'
+        + f'<footer><ul class="menu">{menu}</ul></footer>'
+        + "</body></html>"
+    )
+
+
+def build_site(base_url, days=7, jobs_per_day=40, days_per_page=2, seed=0):
+    """
+        Gera as páginas de listagem e as notícias do PCI Concursos para o servidor de fixtures
+    Args:
+        base_url (str): URL base do servidor de fixtures
+        days (int): Quantidade de dias de notícias
+        jobs_per_day (int): Quantidade de notícias por dia
+        days_per_page (int): Quantidade de dias em cada página de listagem
+        seed (int): Semente do gerador de números aleatórios
+    Returns:
+        pages (dict): Dicionário com o caminho e o conteúdo de cada página
+    """
+    rng = random.Random(seed)
+    pages = dict()
+    listing_blocks = list()
+    start_date = datetime(2022, 3, 18)
+
+    for day in range(days):
+        news_date = (start_date - timedelta(days=day)).strftime("%d/%m/%Y")
+        links = list()
+        for job in range(jobs_per_day):
+            index = day * jobs_per_day + job
+            path = f"/noticias/concurso-{index}"
+            title = f"Concurso {index}"
+            if rng.random() < 0.05:
+                title += " - " + rng.choice(IGNORE_WORDS)
+            pages[path] = article_page(index=index, rng=rng)
+            links.append(f'<li><a href="{base_url}{path}" title="{title}">{title}</a></li>')
+
+        listing_blocks.append(
+            f'<h2 class="principal">{news_date}</h2><ul class="noticias">{"".join(links)}</ul>'
+        )
+
+    page_count = 0
+    for page_start in range(0, len(listing_blocks), days_per_page):
+        page_count += 1
+        blocks = "".join(listing_blocks[page_start:page_start + days_per_page])
+        pages[f"/noticias/{page_count}"] = f"<html><body><h1>Notícias</h1>{blocks}</body></html>"
+
+    return pages
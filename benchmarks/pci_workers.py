@@ -0,0 +1,76 @@
+import os
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+import argparse
+import logging
+import shutil
+import tempfile
+import time
+
+from Concursobo import utils
+from Concursobo.http_client import HttpClient
+from Concursobo.scrapers.pci_scraper import PCIScraper
+
+from fixture_server import FixtureServer
+from pci_fixtures import IGNORE_WORDS, KEYWORDS, build_site
+
+
+def run(workers, base_url, database_path, store_size):
+    """
+        Executa uma aquisição completa do PCIScraper contra o servidor de fixtures
+    Args:
+        workers (int): Número de notícias acessadas simultaneamente
+        base_url (str): URL base do servidor de fixtures
+        database_path (str): Caminho para o arquivo de dados temporário
+        store_size (int): Quantidade de dias de notícias
+    Returns:
+        elapsed (float): Tempo de execução em segundos
+    """
+    scraper = PCIScraper(
+        name="PCI Concursos",
+        database_path=database_path,
+        store_size=store_size,
+        keywords=KEYWORDS,
+        ignore_words=IGNORE_WORDS,
+        max_workers=workers,
+        http_client=HttpClient(pool_maxsize=workers),
+    )
+    scraper.url = base_url + "/noticias/"
+
+    start = time.perf_counter()
+    scraper.scrape_page()
+    elapsed = time.perf_counter() - start
+
+    # Aguarda a gravação em segundo plano antes que o arquivo de dados seja restaurado para a próxima medição
+    scraper.state.flush()
+
+    return elapsed
+
+
+if __name__ == "__main__":
+    """
+    Mede o tempo de aquisição de 7 dias de notícias do PCI Concursos com diferentes números de workers
+    """
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--days", type=int, default=7)
+    parser.add_argument("--jobs-per-day", type=int, default=40)
+    parser.add_argument("--latency", type=float, default=0.02, help="Latência simulada por requisição (s)")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 4, 16, 32])
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)
+
+    with tempfile.TemporaryDirectory() as tmp_dir, FixtureServer(pages=dict(), latency=args.latency) as server:
+        server.pages = build_site(base_url=server.base_url, days=args.days, jobs_per_day=args.jobs_per_day)
+        database_path = os.path.join(tmp_dir, "pci.json")
+
+        print(f"{args.days} dias, {args.jobs_per_day} notícias por dia, latência de {args.latency * 1000:.0f} ms")
+        print(f"{'workers':>8} {'tempo (s)':>10} {'requisições':>12}")
+
+        for workers in args.workers:
+            shutil.copy(os.path.join(utils.get_data_path(), "pci.json"), database_path)
+            server.request_count = 0
+            elapsed = run(workers=workers, base_url=server.base_url, database_path=database_path, store_size=args.days)
+            print(f"{workers:>8} {elapsed:>10.2f} {server.request_count:>12}")
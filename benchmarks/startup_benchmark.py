@@ -0,0 +1,133 @@
+import os
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+import argparse
+import json
+import re
+import statistics
+import subprocess
+import time
+
+ROOT_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+BOT_PATH = os.path.join(ROOT_PATH, "Concursobo")
+
+# Executado em um processo novo, da mesma forma que o pm2 executa o bot: importa o módulo principal, constrói o bot
+# e responde a um comando. Imprime o instante em que o comando foi respondido
+FIRST_COMMAND_SCRIPT = """
+import sys, tempfile, os, time
+sys.path.insert(0, {bot_path!r})
+
+import concursobo
+from telegram_bot import TelegramBot
+
+
+class Message:
+    def reply_text(self, text, **kwargs):
+        pass
+
+
+class Update:
+    message = Message()
+
+
+data_path = tempfile.mkdtemp()
+telegram_bot = TelegramBot(
+    token="123:abc",
+    scraper_registry=concursobo.build_registry(),
+    contacts_path=os.path.join(data_path, "contacts_list.json"),
+    outbox_path=os.path.join(data_path, "outbox.db"),
+)
+
+if {eager!r}:
+    telegram_bot.scrapers.items()
+
+telegram_bot.start_handler(update=Update(), context=None)
+telegram_bot.list_scrapers(update=Update(), context=None)
+print(time.time())
+"""
+
+
+def import_profile():
+    """
+        Importa o módulo principal do bot em um processo novo com python -X importtime
+    Returns:
+        total (float): Tempo total de importação, em segundos
+        modules (list of tuple): Módulos de primeiro nível e tempo acumulado, em segundos, do mais lento ao mais rápido
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import sys; sys.path.insert(0, {BOT_PATH!r}); import concursobo"],
+        cwd=ROOT_PATH,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+    cumulative = dict()
+    for line in result.stderr.splitlines():
+        match = re.match(r"import time:\s+\d+ \|\s+(\d+) \| ( *)(\S+)", line)
+
+        # Apenas os módulos importados diretamente pelo interpretador ou pelo módulo principal
+        if match and len(match.group(2)) <= 2:
+            module = match.group(3)
+            cumulative[module] = cumulative.get(module, 0) + int(match.group(1)) / 1e6
+
+    modules = sorted(cumulative.items(), key=lambda item: item[1], reverse=True)
+
+    return cumulative.get("concursobo", 0.0), modules
+
+
+def first_command(eager):
+    """
+        Mede o tempo entre o início de um processo novo e a resposta ao primeiro comando
+    Args:
+        eager (bool): Cria todos os scrapers antes de responder, como na construção anterior do bot
+    Returns:
+        (float): Tempo até o primeiro comando, em segundos
+    """
+    script = FIRST_COMMAND_SCRIPT.format(bot_path=BOT_PATH, eager=eager)
+
+    start = time.time()
+    result = subprocess.run(
+        [sys.executable, "-c", script], cwd=ROOT_PATH, capture_output=True, text=True, check=True
+    )
+
+    return float(result.stdout.split()[-1]) - start
+
+
+if __name__ == "__main__":
+    """
+    Mede a latência de inicialização do bot: tempo de importação do módulo principal e tempo até o primeiro comando,
+    com os scrapers carregados sob demanda e com todos os scrapers criados na inicialização
+    """
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeat", type=int, default=5, help="Número de processos medidos em cada cenário")
+    parser.add_argument("--top", type=int, default=10, help="Número de módulos mais lentos listados")
+    parser.add_argument("--output", default=None, help="Arquivo JSON com os resultados")
+    args = parser.parse_args()
+
+    import_totals = list()
+    for _ in range(args.repeat):
+        total, modules = import_profile()
+        import_totals.append(total)
+
+    lazy = [first_command(eager=False) for _ in range(args.repeat)]
+    eager = [first_command(eager=True) for _ in range(args.repeat)]
+
+    results = {
+        "import_time": statistics.median(import_totals),
+        "heaviest_modules": [{"module": module, "elapsed": elapsed} for module, elapsed in modules[:args.top]],
+        "first_command": {"lazy": statistics.median(lazy), "eager": statistics.median(eager)},
+    }
+
+    print(f"Importação do módulo principal: {results['import_time'] * 1000:.0f} ms")
+    for module in results["heaviest_modules"]:
+        print(f"    {module['module']:<40} {module['elapsed'] * 1000:8.1f} ms")
+
+    print(f"Primeiro comando, scrapers sob demanda: {results['first_command']['lazy'] * 1000:.0f} ms")
+    print(f"Primeiro comando, todos os scrapers:    {results['first_command']['eager'] * 1000:.0f} ms")
+
+    if args.output:
+        with open(file=args.output, mode="w") as f:
+            json.dump(results, f, indent=4)
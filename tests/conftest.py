@@ -0,0 +1,8 @@
+import os
+import sys
+
+# Os módulos do bot são importados pelo pacote (Concursobo.utils) e, pelo telegram_bot.py, diretamente (utils)
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+sys.path.insert(0, os.path.join(ROOT, "Concursobo"))
+sys.path.insert(0, ROOT)
@@ -0,0 +1,55 @@
+import math
+
+import pytest
+
+from Concursobo.adaptive_scheduler import DAY, allocate_intervals
+
+
+def checks_per_day(intervals):
+    return sum(DAY / interval for interval in intervals.values())
+
+
+def test_budget_is_split_by_square_root_of_rates():
+    rates = {"A": 4e-5, "B": 1e-5}
+    limits = {"A": 60.0, "B": 60.0}
+
+    intervals = allocate_intervals(
+        rates=rates, budget=30, min_intervals=limits, max_intervals={"A": DAY, "B": DAY}
+    )
+
+    assert checks_per_day(intervals) == pytest.approx(30)
+    # A frequência é proporcional à raiz quadrada da taxa: o dobro de checagens para o quádruplo da taxa
+    assert intervals["B"] / intervals["A"] == pytest.approx(math.sqrt(rates["A"] / rates["B"]))
+
+
+def test_clamped_scrapers_release_budget_to_the_others():
+    rates = {"A": 1.0, "B": 1e-3, "C": 1e-3}
+    min_intervals = {"A": 3600.0, "B": 60.0, "C": 60.0}
+    max_intervals = {"A": DAY, "B": DAY, "C": DAY}
+
+    intervals = allocate_intervals(rates=rates, budget=50, min_intervals=min_intervals, max_intervals=max_intervals)
+
+    assert intervals["A"] == 3600.0
+    assert intervals["B"] == pytest.approx(intervals["C"])
+    assert checks_per_day(intervals) == pytest.approx(50)
+
+
+def test_intervals_respect_the_limits():
+    rates = {"A": 1e-3, "B": 1e-9}
+    min_intervals = {"A": 600.0, "B": 600.0}
+    max_intervals = {"A": 7200.0, "B": 7200.0}
+
+    intervals = allocate_intervals(rates=rates, budget=10, min_intervals=min_intervals, max_intervals=max_intervals)
+
+    for name, interval in intervals.items():
+        assert min_intervals[name] <= interval <= max_intervals[name]
+
+
+def test_exhausted_budget_uses_the_maximum_interval():
+    rates = {"A": 1.0, "B": 1e-5}
+    min_intervals = {"A": 60.0, "B": 60.0}
+    max_intervals = {"A": 3600.0, "B": 7200.0}
+
+    intervals = allocate_intervals(rates=rates, budget=1, min_intervals=min_intervals, max_intervals=max_intervals)
+
+    assert intervals == {"A": 3600.0, "B": 7200.0}
@@ -0,0 +1,56 @@
+import time
+
+from Concursobo.scrapers.article_cache import ArticleCache
+
+
+def test_canonical_url_ignores_cosmetic_variations():
+    url = "https://www.pciconcursos.com.br/noticias/concurso-x"
+
+    assert ArticleCache.canonical_url(url + "/") == url
+    assert ArticleCache.canonical_url("HTTPS://WWW.PCICONCURSOS.COM.BR:443/noticias/concurso-x") == url
+    assert ArticleCache.canonical_url(url + "?utm_source=feed&b=2&a=1") == url + "?a=1&b=2"
+
+
+def test_entries_depend_on_the_keyword_signature(tmp_path):
+    cache = ArticleCache(cache_path=str(tmp_path / "cache.json"))
+    cache.put(url="https://a/1", signature="v1", keywords=["ti"])
+
+    assert cache.get(url="https://a/1/", signature="v1") == ["ti"]
+    assert cache.get(url="https://a/1", signature="v2") is None
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_entries_expire(tmp_path):
+    cache = ArticleCache(cache_path=str(tmp_path / "cache.json"), ttl=0.05)
+    cache.put(url="https://a/1", signature="v1", keywords=["ti"])
+
+    time.sleep(0.1)
+
+    assert cache.get(url="https://a/1", signature="v1") is None
+
+
+def test_least_recently_used_entry_is_evicted(tmp_path):
+    cache = ArticleCache(cache_path=str(tmp_path / "cache.json"), max_entries=2)
+    cache.put(url="https://a/1", signature="v1", keywords=["1"])
+    cache.put(url="https://a/2", signature="v1", keywords=["2"])
+    cache.get(url="https://a/1", signature="v1")
+    cache.put(url="https://a/3", signature="v1", keywords=["3"])
+
+    assert len(cache) == 2
+    assert cache.get(url="https://a/2", signature="v1") is None
+    assert cache.get(url="https://a/1", signature="v1") == ["1"]
+    assert cache.get(url="https://a/3", signature="v1") == ["3"]
+
+
+def test_saved_cache_is_reloaded_without_expired_entries(tmp_path):
+    cache_path = str(tmp_path / "cache.json")
+    cache = ArticleCache(cache_path=cache_path, ttl=3600)
+    cache.put(url="https://a/1", signature="v1", keywords=["ti"])
+    cache.put(url="https://a/2", signature="v1", keywords=["adm"])
+    cache._entries["https://a/2"]["timestamp"] -= 7200
+    cache.save()
+
+    reloaded = ArticleCache(cache_path=cache_path, ttl=3600)
+
+    assert len(reloaded) == 1
+    assert reloaded.get(url="https://a/1", signature="v1") == ["ti"]
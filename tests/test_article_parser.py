@@ -0,0 +1,87 @@
+import os
+
+import pytest
+from bs4 import BeautifulSoup
+
+from Concursobo.scrapers.article_parser import ArticleBodyParser, extract_article_body
+
+FIXTURE = os.path.join(os.path.dirname(__file__), "..", "benchmarks", "fixtures", "pci_article.html")
+
+MARKUP = (
+    "<html><head><script>var x = '<div itemprop=\"articleBody\">';</script></head><body>"
+    "<div class=\"menu\"><div>Menu</div></div>"
+    "<div itemprop=\"articleBody\"><p>Concurso para T&eacute;cnico</p>"
+    "<div class=\"inner\">Vagas <b>10</b><div/></div>"
+    "<script>ignorado()</script><style>.x {}</style>"
+    "<p>Inscri&ccedil;&otilde;es abertas</p></div>"
+    "<div>Rodapé</div></body></html>"
+)
+
+
+class FakeResponse:
+    """
+    Resposta com o conteúdo dividido em partes, que registra quantas partes foram lidas
+    """
+
+    def __init__(self, text, chunk_size):
+        self.encoding = None
+        self.closed = False
+        self.consumed = 0
+        self.chunks = [text[index:index + chunk_size] for index in range(0, len(text), chunk_size)]
+
+    def iter_content(self, chunk_size, decode_unicode):
+        for chunk in self.chunks:
+            self.consumed += 1
+            yield chunk
+
+    def close(self):
+        self.closed = True
+
+
+def soup_text(markup):
+    soup = BeautifulSoup(markup, "html.parser")
+    for tag in soup.find_all(["script", "style", "template"]):
+        tag.decompose()
+    return soup.find(name="div", attrs={"itemprop": "articleBody"}).get_text()
+
+
+def test_text_matches_beautifulsoup():
+    parser = ArticleBodyParser()
+    parser.feed(MARKUP)
+
+    assert parser.done
+    assert parser.text == soup_text(markup=MARKUP)
+    assert "ignorado" not in parser.text
+    assert "Rodapé" not in parser.text
+
+
+@pytest.mark.parametrize("chunk_size", [1, 7, 64, 100000])
+def test_chunk_boundaries_do_not_change_the_text(chunk_size):
+    response = FakeResponse(text=MARKUP, chunk_size=chunk_size)
+
+    assert extract_article_body(response=response, chunk_size=chunk_size) == soup_text(markup=MARKUP)
+    assert response.closed
+
+
+def test_recorded_article_matches_beautifulsoup():
+    with open(file=FIXTURE, mode="r", encoding="utf-8") as f:
+        markup = f.read()
+
+    response = FakeResponse(text=markup, chunk_size=8192)
+
+    assert extract_article_body(response=response) == soup_text(markup=markup)
+
+
+def test_reading_stops_after_the_body():
+    markup = MARKUP + "<p>" + "x" * 100000 + "</p>"
+    response = FakeResponse(text=markup, chunk_size=1024)
+
+    extract_article_body(response=response, chunk_size=1024, drain_limit=4096)
+
+    assert response.consumed < len(response.chunks) // 10
+
+
+def test_missing_body_returns_none():
+    response = FakeResponse(text="<html><body><div>Sem notícia</div></body></html>", chunk_size=16)
+
+    assert extract_article_body(response=response) is None
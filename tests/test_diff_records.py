@@ -0,0 +1,72 @@
+from Concursobo import utils
+
+
+def test_added_and_removed_keep_input_order():
+    old = [{"url": "a", "title": "A"}, {"url": "b", "title": "B"}, {"url": "c", "title": "C"}]
+    new = [{"url": "d", "title": "D"}, {"url": "a", "title": "A"}, {"url": "e", "title": "E"}]
+
+    diff = utils.diff_records(list_A=new, list_B=old)
+
+    assert diff.added == [new[0], new[2]]
+    assert diff.removed == [old[1], old[2]]
+    assert diff.changed == []
+
+
+def test_cosmetic_differences_are_ignored():
+    old = [{"url": "a", "title": "Edital  de abertura"}]
+    new = [{"title": "Edital de abertura ", "url": "a"}]
+
+    diff = utils.diff_records(list_A=new, list_B=old)
+
+    assert diff == utils.DiffResult(added=[], removed=[], changed=[])
+
+
+def test_edited_records_are_paired_by_id_fields():
+    old = [{"url": "a", "title": "Edital"}, {"url": "b", "title": "Resultado"}]
+    new = [{"url": "a", "title": "Edital retificado"}, {"url": "c", "title": "Convocação"}]
+
+    diff = utils.diff_records(list_A=new, list_B=old, id_fields=["url"])
+
+    assert diff.added == [new[1]]
+    assert diff.removed == [old[1]]
+    assert diff.changed == [(new[0], old[0])]
+
+
+def test_without_id_fields_edits_are_added_and_removed():
+    old = [{"url": "a", "title": "Edital"}]
+    new = [{"url": "a", "title": "Edital retificado"}]
+
+    diff = utils.diff_records(list_A=new, list_B=old)
+
+    assert diff.added == new
+    assert diff.removed == old
+    assert diff.changed == []
+
+
+def test_records_without_identity_are_not_paired():
+    old = [{"url": None, "title": "Vaga"}]
+    new = [{"url": None, "title": "Vaga alterada"}]
+
+    diff = utils.diff_records(list_A=new, list_B=old, id_fields=["url"])
+
+    assert diff.added == new
+    assert diff.removed == old
+    assert diff.changed == []
+
+
+def test_each_removed_record_is_paired_once():
+    old = [{"url": "a", "title": "1"}, {"url": "a", "title": "2"}]
+    new = [{"url": "a", "title": "3"}]
+
+    diff = utils.diff_records(list_A=new, list_B=old, id_fields=["url"])
+
+    assert diff.changed == [(new[0], old[0])]
+    assert diff.removed == [old[1]]
+    assert diff.added == []
+
+
+def test_list_difference_returns_added_and_removed():
+    added, removed = utils.list_difference(list_A=[{"id": 1}, {"id": 2}], list_B=[{"id": 2}, {"id": 3}])
+
+    assert added == [{"id": 1}]
+    assert removed == [{"id": 3}]
@@ -0,0 +1,69 @@
+import pytest
+
+from Concursobo.keyword_matcher import KeywordMatcher
+
+
+def naive_search(text, keywords):
+    text = KeywordMatcher.fold(text)
+    return [keyword for keyword in keywords if KeywordMatcher.fold(keyword) in text]
+
+
+@pytest.fixture(params=[False, True], ids=["str.find", "automato"])
+def use_automaton(request):
+    return request.param
+
+
+def build_matcher(keywords, use_automaton):
+    matcher = KeywordMatcher(keywords=keywords)
+    # Força o caminho de busca, independentemente da quantidade de palavras-chave
+    matcher._use_automaton = use_automaton
+    return matcher
+
+
+def test_accents_and_case_are_ignored(use_automaton):
+    matcher = build_matcher(keywords=["Técnico", "engenharia"], use_automaton=use_automaton)
+
+    assert matcher.search(text="Concurso para TECNICO em Engenharia") == ["Técnico", "engenharia"]
+
+
+def test_overlapping_keywords_are_all_found(use_automaton):
+    keywords = ["he", "she", "his", "hers"]
+    matcher = build_matcher(keywords=keywords, use_automaton=use_automaton)
+
+    assert matcher.search(text="ushers") == ["he", "she", "hers"]
+
+
+def test_results_follow_keyword_order(use_automaton):
+    keywords = ["marinha", "aeronáutica", "exército"]
+    matcher = build_matcher(keywords=keywords, use_automaton=use_automaton)
+
+    assert matcher.search(text="Exército e Marinha abrem vagas") == ["marinha", "exército"]
+
+
+def test_contains_any(use_automaton):
+    matcher = build_matcher(keywords=["analista", "professor"], use_automaton=use_automaton)
+
+    assert matcher.contains_any(text="Vagas para Professor de matemática")
+    assert not matcher.contains_any(text="Vagas para médico")
+
+
+def test_automaton_matches_str_find():
+    keywords = ["ti", "tic", "tica", "informática", "analista de sistemas", "sistemas", "a"] + [
+        f"palavra{index}" for index in range(200)
+    ]
+    texts = [
+        "Analista de Sistemas e Técnico em Informática",
+        "palavra17 palavra170 palavra9",
+        "nenhuma correspondência aqui",
+        "",
+    ]
+    matcher = KeywordMatcher(keywords=keywords)
+
+    assert matcher._use_automaton
+    for text in texts:
+        assert matcher.search(text=text) == naive_search(text=text, keywords=keywords)
+
+
+def test_threshold_selects_search_path():
+    assert not KeywordMatcher(keywords=["a"] * (KeywordMatcher.FIND_THRESHOLD - 1))._use_automaton
+    assert KeywordMatcher(keywords=["a"] * KeywordMatcher.FIND_THRESHOLD)._use_automaton
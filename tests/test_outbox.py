@@ -0,0 +1,155 @@
+import sqlite3
+import threading
+import time
+
+import pytest
+from telegram.error import Unauthorized
+
+from Concursobo.outbox import MessageStatus, Outbox
+
+
+class FakeEngine:
+    """
+    Motor de envio que registra as mensagens em vez de enviá-las ao Telegram
+    """
+
+    def __init__(self, fail=None, max_workers=4):
+        self.sent = list()
+        self.fail = fail or dict()
+        self.max_workers = max_workers
+        self.lock = threading.Lock()
+
+    def send_message(self, chat_id, message, parse_mode):
+        failure = self.fail.get((chat_id, message))
+        if isinstance(failure, Exception):
+            raise failure
+        if failure is False:
+            return False
+
+        with self.lock:
+            self.sent.append((chat_id, message))
+        return True
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    return str(tmp_path / "outbox.db")
+
+
+def statuses(outbox):
+    return dict(outbox.connection.execute("SELECT text || '@' || chat_id, status FROM messages").fetchall())
+
+
+def test_enqueue_is_idempotent(db_path):
+    outbox = Outbox(db_path=db_path, broadcast_engine=FakeEngine())
+
+    batch_id = outbox.enqueue(chat_ids=[1, 2], message_list=["a", "b"])
+    outbox.enqueue(chat_ids=[1, 2], message_list=["a", "b"], batch_id=batch_id)
+
+    assert outbox.pending_count() == 4
+
+
+def test_deliver_sends_each_message_once_in_order(db_path):
+    engine = FakeEngine()
+    outbox = Outbox(db_path=db_path, broadcast_engine=engine)
+    batch_id = outbox.enqueue(chat_ids=[1, 2, 3], message_list=["a", "b", "c"])
+
+    report = outbox.deliver(batch_id=batch_id)
+
+    assert report["sent"] == 9
+    assert report["unsent"] == 0
+    assert outbox.pending_count() == 0
+    for chat_id in [1, 2, 3]:
+        assert [message for chat, message in engine.sent if chat == chat_id] == ["a", "b", "c"]
+
+    assert outbox.deliver(batch_id=batch_id)["sent"] == 0
+    assert len(engine.sent) == 9
+
+
+def test_claimed_messages_are_not_claimed_again(db_path):
+    first = Outbox(db_path=db_path, broadcast_engine=FakeEngine())
+    second = Outbox(db_path=db_path, broadcast_engine=FakeEngine())
+    first.enqueue(chat_ids=[1], message_list=["a", "b"])
+
+    _, rows = first.claim()
+    _, other_rows = second.claim()
+
+    assert len(rows) == 2
+    assert other_rows == []
+
+
+def test_expired_claim_is_taken_over_and_stale_token_rejected(db_path):
+    first = Outbox(db_path=db_path, broadcast_engine=FakeEngine(), lease=0.05)
+    second = Outbox(db_path=db_path, broadcast_engine=FakeEngine(), lease=0.05)
+    first.enqueue(chat_ids=[1], message_list=["a"])
+
+    stale_token, rows = first.claim()
+    time.sleep(0.1)
+    token, taken_over = second.claim()
+
+    assert [row[0] for row in taken_over] == [rows[0][0]]
+    assert not first.mark_sent(message_id=rows[0][0], claim_token=stale_token)
+    assert second.mark_sent(message_id=rows[0][0], claim_token=token)
+
+
+def test_renew_keeps_the_claim(db_path):
+    first = Outbox(db_path=db_path, broadcast_engine=FakeEngine(), lease=0.2)
+    second = Outbox(db_path=db_path, broadcast_engine=FakeEngine(), lease=0.2)
+    first.enqueue(chat_ids=[1], message_list=["a"])
+
+    token, _ = first.claim()
+    time.sleep(0.15)
+    first.renew(claim_token=token)
+    time.sleep(0.1)
+
+    assert second.claim()[1] == []
+
+
+def test_blocked_chat_discards_its_remaining_messages(db_path):
+    engine = FakeEngine(fail={(1, "a"): Unauthorized("Forbidden: bot was blocked by the user")})
+    outbox = Outbox(db_path=db_path, broadcast_engine=engine)
+    outbox.enqueue(chat_ids=[1, 2], message_list=["a", "b"])
+
+    report = outbox.deliver()
+
+    assert report["sent"] == 2
+    assert statuses(outbox) == {
+        "a@1": MessageStatus.FAILED,
+        "b@1": MessageStatus.FAILED,
+        "a@2": MessageStatus.SENT,
+        "b@2": MessageStatus.SENT,
+    }
+
+
+def test_network_failure_requeues_the_chat(db_path):
+    engine = FakeEngine(fail={(1, "b"): False})
+    outbox = Outbox(db_path=db_path, broadcast_engine=engine, backoff=60.0)
+    outbox.enqueue(chat_ids=[1], message_list=["a", "b", "c"])
+
+    report = outbox.deliver()
+
+    assert report["sent"] == 1
+    assert statuses(outbox) == {
+        "a@1": MessageStatus.SENT,
+        "b@1": MessageStatus.PENDING,
+        "c@1": MessageStatus.PENDING,
+    }
+    # As mensagens só voltam a ser enviadas após o tempo de espera
+    assert outbox.claim()[1] == []
+
+
+def test_old_database_is_migrated(db_path):
+    connection = sqlite3.connect(db_path)
+    connection.execute(
+        "CREATE TABLE messages (id INTEGER PRIMARY KEY AUTOINCREMENT, idempotency_key TEXT NOT NULL UNIQUE, "
+        "batch_id TEXT NOT NULL, chat_id INTEGER NOT NULL, text TEXT NOT NULL, parse_mode TEXT, "
+        "status TEXT NOT NULL, attempts INTEGER NOT NULL DEFAULT 0, next_attempt REAL NOT NULL, claimed_at REAL, "
+        "created_at REAL NOT NULL, last_error TEXT)"
+    )
+    connection.commit()
+    connection.close()
+
+    outbox = Outbox(db_path=db_path, broadcast_engine=FakeEngine())
+    outbox.enqueue(chat_ids=[1], message_list=["a"])
+
+    assert outbox.deliver()["sent"] == 1
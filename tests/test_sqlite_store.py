@@ -0,0 +1,105 @@
+import json
+
+import pytest
+
+from Concursobo.scrapers.sqlite_store import SQLiteStateStore, assign_positions, flatten_records, unflatten_records
+from Concursobo.scrapers.state_store import RecordField
+
+NESTED = [
+    {
+        "month": "Janeiro",
+        "cities": [
+            {"city": "Niterói", "races_list": [{"url": "a", "distance": 5}, {"url": "b", "distance": 10}]},
+            {"city": "Maricá", "races_list": list()},
+        ],
+    },
+    {"month": "Fevereiro", "cities": list()},
+]
+
+
+def test_assign_positions_keeps_existing_positions():
+    positions = assign_positions(keys=["a", "x", "b", "c"], old_positions={"a": 1.0, "b": 2.0, "c": 3.0})
+
+    assert positions[0] == 1.0
+    assert 1.0 < positions[1] < 2.0
+    assert positions[2:] == [2.0, 3.0]
+
+
+def test_assign_positions_handles_reordering_and_edges():
+    keys = ["new_first", "c", "a", "new_last"]
+    positions = assign_positions(keys=keys, old_positions={"a": 1.0, "c": 3.0})
+
+    assert positions == sorted(positions)
+    assert positions[1] == 3.0
+    assert len(set(positions)) == len(positions)
+
+
+def test_assign_positions_without_previous_positions():
+    assert assign_positions(keys=["a", "b", "c"], old_positions=dict()) == [0.0, 1.0, 2.0]
+
+
+def test_flatten_and_unflatten_round_trip():
+    path = ["cities", "races_list"]
+
+    rows = list(flatten_records(items=NESTED, path=path))
+
+    assert [record for _, record in rows] == [{"url": "a", "distance": 5}, {"url": "b", "distance": 10}, None, None]
+    assert unflatten_records(rows=rows, path=path) == NESTED
+
+
+@pytest.fixture
+def store_factory(tmp_path):
+    db_path = str(tmp_path / "scrapers.db")
+    record_fields = {"all_races": RecordField(table="races", path=["cities", "races_list"])}
+
+    def factory(source="CorridasBR", json_path=None):
+        return SQLiteStateStore(db_path=db_path, source=source, record_fields=record_fields, json_path=json_path)
+
+    return factory
+
+
+def test_state_round_trip(store_factory):
+    state = {"acquisition_date": "01/01/2022 10:00:00", "all_races": NESTED}
+    store_factory()._persist(state=state)
+
+    assert store_factory()._read() == state
+
+
+def test_only_changed_records_are_written(store_factory):
+    store = store_factory()
+    store._persist(state={"acquisition_date": "1", "all_races": NESTED})
+
+    edited = json.loads(json.dumps(NESTED))
+    edited[0]["cities"][0]["races_list"][1]["distance"] = 21
+    store._persist(state={"acquisition_date": "2", "all_races": edited})
+
+    added, removed = store.connection.execute(
+        "SELECT added, removed FROM acquisitions WHERE source = ?", ("CorridasBR",)
+    ).fetchone()
+    assert (added, removed) == (1, 1)
+    assert store_factory()._read()["all_races"] == edited
+
+
+def test_only_the_latest_acquisition_is_kept(store_factory):
+    store = store_factory()
+    other = store_factory(source="Outro")
+
+    for index in range(5):
+        store._persist(state={"acquisition_date": str(index), "all_races": NESTED})
+        other._persist(state={"acquisition_date": str(index), "all_races": list()})
+
+    rows = store.connection.execute("SELECT source, document FROM acquisitions ORDER BY source").fetchall()
+
+    assert [(source, json.loads(document)) for source, document in rows] == [
+        ("CorridasBR", {"acquisition_date": "4"}),
+        ("Outro", {"acquisition_date": "4"}),
+    ]
+
+
+def test_json_file_is_migrated(store_factory, tmp_path):
+    json_path = tmp_path / "corridasbr.json"
+    state = {"acquisition_date": "01/01/2022 10:00:00", "all_races": NESTED}
+    json_path.write_text(json.dumps(state))
+
+    assert store_factory(json_path=str(json_path))._read() == state
+    assert store_factory()._read() == state